@@ -4,6 +4,10 @@
  * Handles different API formats and parameter mapping
  */
 
+const fs = require('fs');
+const path = require('path');
+const crypto = require('crypto');
+
 // Load the endpoints mapping (will be generated by doc analysis)
 let endpointsMapping = null;
 
@@ -19,16 +23,68 @@ function loadEndpointsMapping() {
   }
 }
 
+// Precomputed modelId -> endpoint index (written next to the mapping by lookup_index.py)
+const ENDPOINTS_INDEX_FILE = path.join(__dirname, '..', 'api-endpoints-index.json');
+const ENDPOINTS_INDEX_RETRY_MS = 60 * 1000;
+let endpointsIndex = null;
+let endpointsIndexFailedAt = null;
+
+/**
+ * Same digest as lookup_index.endpoints_digest: SHA-256 of the compact JSON of
+ * [endpoint, modelIds] pairs, with DEL (U+007F) and non-ASCII characters escaped like
+ * Python's json.dumps (ensure_ascii escapes everything outside space..~)
+ */
+function endpointsDigest(endpoints) {
+  const keys = endpoints.map(ep => [ep.endpoint === undefined ? null : ep.endpoint, ep.modelIds || []]);
+  const json = JSON.stringify(keys).replace(/[\u007f-\uffff]/g,
+    c => '\\u' + c.charCodeAt(0).toString(16).padStart(4, '0'));
+  return crypto.createHash('sha256').update(json, 'utf8').digest('hex');
+}
+
+function loadEndpointsIndex(mapping) {
+  if (endpointsIndex) return endpointsIndex;
+  // A missing or mismatched index is retried after a delay, not on every request
+  if (endpointsIndexFailedAt !== null && Date.now() - endpointsIndexFailedAt < ENDPOINTS_INDEX_RETRY_MS) {
+    return null;
+  }
+  try {
+    const index = JSON.parse(fs.readFileSync(ENDPOINTS_INDEX_FILE, 'utf8'));
+    // An index built for another mapping is ignored
+    if (index.endpoint_count !== mapping.endpoints.length ||
+        index.endpoints_sha256 !== endpointsDigest(mapping.endpoints)) {
+      console.warn('⚠️ Endpoints index does not match the mapping, using linear search');
+      endpointsIndexFailedAt = Date.now();
+      return null;
+    }
+    endpointsIndex = index;
+    endpointsIndexFailedAt = null;
+  } catch (error) {
+    endpointsIndexFailedAt = Date.now();
+  }
+  return endpointsIndex;
+}
+
 /**
  * Find endpoint configuration for a given model ID
  */
 function findEndpointForModel(modelId) {
   const mapping = loadEndpointsMapping();
+  const index = loadEndpointsIndex(mapping);
+
+  let endpoint;
+  if (index && Object.prototype.hasOwnProperty.call(index.model_ids, modelId)) {
+    endpoint = mapping.endpoints[index.model_ids[modelId]];
+    if (!endpoint || !endpoint.modelIds || !endpoint.modelIds.includes(modelId)) {
+      endpoint = undefined;
+    }
+  }
 
   // Search through all endpoints to find one that supports this modelId
-  const endpoint = mapping.endpoints.find(ep =>
-    ep.modelIds && ep.modelIds.includes(modelId)
-  );
+  if (!endpoint) {
+    endpoint = mapping.endpoints.find(ep =>
+      ep.modelIds && ep.modelIds.includes(modelId)
+    );
+  }
 
   if (!endpoint) {
     console.warn(`⚠️ No endpoint configuration found for model: ${modelId}`);
@@ -227,5 +283,6 @@ module.exports = {
   routeRequest,
   findEndpointForModel,
   calculateCreditsCost,
-  loadEndpointsMapping
+  loadEndpointsMapping,
+  endpointsDigest
 };
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Mode batch de search_endpoints.py : beaucoup de requêtes, un seul catalogue chargé et indexé.
+Chaque ligne d'entrée est une requête, au format de la ligne de commande ("model kling/v2-1-pro")
+ou en JSON ({"command": "model", "query": "...", "id": ...}) ; chaque requête donne une ligne
+JSONL en sortie, écrite au fil de l'eau. Les requêtes répétées réutilisent le résultat déjà
+sérialisé. Le débit (requêtes/s) est affiché sur stderr à la fin.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+MAPPING_FILE = Path(__file__).parent / 'api-endpoints-mapping.json'
+COMPACT = (',', ':')
+
+# Champs d'un endpoint écrits dans les résultats (tous avec --full)
+SUMMARY_FIELDS = ('name', 'endpoint', 'method', 'category')
+
+def parse_query(line):
+    """(commande, requête, id) d'une ligne ; None pour une ligne vide ou un commentaire."""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        request = json.loads(line)
+        return str(request.get('command', '')).lower(), str(request.get('query', '')), request.get('id')
+    command, _, query = line.partition(' ')
+    return command.lower(), query.strip(), None
+
+def _summary(ep, full):
+    if full:
+        return ep
+    return {field: ep.get(field) for field in SUMMARY_FIELDS}
+
+def run_batch(data, lines, out, commands, full=False):
+    """Exécute les requêtes de lines sur data et écrit une ligne JSON par requête dans out.
+
+    commands associe chaque commande à sa fonction de recherche, appelée comme fonction(data, requête).
+    Retourne les statistiques (requêtes, erreurs, réutilisations, secondes).
+    """
+    cache = {}
+    stats = {"queries": 0, "errors": 0, "cache_hits": 0}
+    start = time.perf_counter()
+    for number, line in enumerate(lines, 1):
+        try:
+            parsed = parse_query(line)
+        except ValueError as e:
+            parsed = ('', '', None)
+            error = f"invalid JSON: {e}"
+        else:
+            error = None
+        if parsed is None:
+            continue
+        command, query, request_id = parsed
+        stats["queries"] += 1
+
+        head = {"line": number}
+        if request_id is not None:
+            head["id"] = request_id
+        head["command"] = command
+        head["query"] = query
+
+        if error is None and command not in commands:
+            error = f"unknown command: {command!r} (expected {', '.join(commands)})"
+        if error is None and not query:
+            error = "empty query"
+        if error is not None:
+            stats["errors"] += 1
+            head["error"] = error
+            out.write(json.dumps(head, ensure_ascii=False, separators=COMPACT) + '\n')
+            continue
+
+        key = (command, query)
+        body = cache.get(key)
+        if body is None:
+            try:
+                results = commands[command](data, query)
+            except (ValueError, RuntimeError, OSError) as e:
+                # Expression de filtre invalide, erreur renvoyée par le serveur ou connexion perdue :
+                # une ligne d'erreur, le batch continue
+                stats["errors"] += 1
+                head["error"] = str(e)
+                out.write(json.dumps(head, ensure_ascii=False, separators=COMPACT) + '\n')
+                continue
+            if command == 'search':
+                items = [dict(_summary(ep, full), score=round(score, 4)) for ep, score in results]
+            else:
+                items = [_summary(ep, full) for ep in results]
+            body = cache[key] = f'"count":{len(items)},"results":{json.dumps(items, ensure_ascii=False, separators=COMPACT)}'
+        else:
+            stats["cache_hits"] += 1
+        out.write(json.dumps(head, ensure_ascii=False, separators=COMPACT)[:-1] + ',' + body + '}\n')
+
+    out.flush()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+def print_stats(stats, file=sys.stderr):
+    """Débit du batch, sur stderr pour ne pas se mêler au JSONL."""
+    rate = stats["queries"] / stats["seconds"] if stats["seconds"] else 0
+    print(f"✓ {stats['queries']} queries ({stats['errors']} errors, {stats['cache_hits']} repeated) "
+          f"in {stats['seconds']:.2f} s: {rate:,.0f} queries/s", file=file)
+
+def query_line(command, query):
+    """Ligne de requête : forme courte, ou JSON si la requête ne tient pas sur une ligne de texte."""
+    if query != query.strip() or any(c in query for c in '\r\n'):
+        return json.dumps({"command": command, "query": query}, ensure_ascii=False)
+    return f"{command} {query}"
+
+def sample_queries(data, count, seed=0):
+    """count requêtes mêlées (modelIds exacts, en casse différente, inconnus ; catégories, noms, paramètres)."""
+    rng = random.Random(seed)
+    endpoints = data['endpoints']
+    model_ids = sorted({m for ep in endpoints for m in ep.get('modelIds') or []})
+    categories = sorted({ep['category'] for ep in endpoints if ep.get('category')})
+    parameters = sorted({name for ep in endpoints for group in ('required', 'optional')
+                         for name in (ep.get('parameters') or {}).get(group, {})})
+    names = [ep['name'] for ep in endpoints if ep.get('name')]
+
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            model_id = rng.choice(model_ids)
+            roll = rng.random()
+            if roll < 0.1:
+                model_id = model_id.upper()
+            elif roll < 0.2:
+                model_id = f"{model_id}-unknown-{rng.randrange(1000)}"
+            queries.append(query_line('model', model_id))
+        elif kind < 0.7:
+            queries.append(query_line('category', rng.choice(categories)))
+        elif kind < 0.85:
+            words = rng.choice(names).split()
+            start = rng.randrange(len(words))
+            queries.append(query_line('name', ' '.join(words[start:start + rng.randint(1, 3)])))
+        else:
+            queries.append(query_line('param', rng.choice(parameters)))
+    return queries
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Generate a query file for search_endpoints.py batch")
+    parser.add_argument('count', type=int, help="nombre de requêtes")
+    parser.add_argument('--mapping', type=Path, default=MAPPING_FILE, help="mapping dont les requêtes sont tirées")
+    parser.add_argument('--seed', type=int, default=0, help="seed du tirage")
+    parser.add_argument('--output', type=Path, default=None, help="fichier de requêtes (stdout par défaut)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+    with open(args.mapping, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    text = '\n'.join(sample_queries(data, args.count, args.seed)) + '\n'
+    if args.output:
+        args.output.write_text(text, encoding='utf-8')
+        print(f"✓ {args.count} queries -> {args.output}")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Format binaire compact du mapping des endpoints KIE API, lu par mmap sans tout décoder.
+Toutes les chaînes (clés et valeurs) sont internées dans une table triée ; chaque objet et
+chaque liste commence par une table d'offsets de largeur fixe, ce qui permet de lire un seul
+endpoint, ou un seul champ d'un endpoint, sans parser le reste du fichier. Plusieurs processus
+qui ouvrent le même catalogue partagent ses pages en mémoire. L'en-tête enregistre la taille,
+le st_mtime_ns et le SHA-256 du mapping JSON converti (voir source_stamp).
+
+Disposition du fichier (little-endian) :
+    en-tête | offsets des chaînes (u32 * (n+1)) | octets UTF-8 des chaînes | valeurs | offsets des endpoints (u32 * n)
+Valeurs : un octet de type, suivi de
+    int (i64), float (f64), chaîne (u32 : id de la chaîne),
+    liste (u32 : nombre, puis u32 * nombre : position de chaque élément),
+    objet (u32 : nombre, puis (u32 id de clé, u32 position) * nombre).
+"""
+
+import os
+import json
+import mmap
+import time
+import struct
+import argparse
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+import mapping_layout
+import source_stamp
+
+MAGIC = b'KCAT'
+FORMAT_VERSION = 2
+CATALOG_SUFFIX = '.kcat'
+
+# ..., puis taille (u64), st_mtime_ns (i64) et SHA-256 (32 octets) du mapping source, à zéro s'il est inconnu
+HEADER = struct.Struct('<4sHHIIIIIIQq32s')
+U32 = struct.Struct('<I')
+U32_PAIR = struct.Struct('<II')
+
+# Types des valeurs
+T_NULL, T_FALSE, T_TRUE, T_INT, T_FLOAT, T_STR, T_LIST, T_DICT, T_BIGINT, T_ENDPOINTS = range(10)
+
+# Groupes by_category/by_capability stockés comme index dans endpoints (copies complètes dans le JSON)
+FLAG_EXPANDED_GROUPS = 1
+
+def _collect_strings(value, strings):
+    if isinstance(value, str):
+        strings.add(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            strings.add(key)
+            _collect_strings(item, strings)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_strings(item, strings)
+    elif isinstance(value, int) and not isinstance(value, bool) and not -2**63 <= value < 2**63:
+        strings.add(str(value))
+
+class _Encoder:
+    def __init__(self, string_ids, base):
+        self.string_ids = string_ids
+        self.base = base
+        self.out = bytearray()
+
+    def encode(self, value):
+        """Écrit value et retourne sa position dans le fichier."""
+        out = self.out
+        pos = self.base + len(out)
+        if value is None:
+            out.append(T_NULL)
+        elif value is True:
+            out.append(T_TRUE)
+        elif value is False:
+            out.append(T_FALSE)
+        elif isinstance(value, int):
+            if -2**63 <= value < 2**63:
+                out += struct.pack('<Bq', T_INT, value)
+            else:
+                out += struct.pack('<BI', T_BIGINT, self.string_ids[str(value)])
+        elif isinstance(value, float):
+            out += struct.pack('<Bd', T_FLOAT, value)
+        elif isinstance(value, str):
+            out += struct.pack('<BI', T_STR, self.string_ids[value])
+        elif isinstance(value, list):
+            out += struct.pack('<BI', T_LIST, len(value))
+            table = len(out)
+            out += bytes(4 * len(value))
+            for i, item in enumerate(value):
+                U32.pack_into(out, table + 4 * i, self.encode(item))
+        elif isinstance(value, dict):
+            out += struct.pack('<BI', T_DICT, len(value))
+            table = len(out)
+            out += bytes(8 * len(value))
+            for i, (key, item) in enumerate(value.items()):
+                U32_PAIR.pack_into(out, table + 8 * i, self.string_ids[key], self.encode(item))
+        else:
+            raise TypeError(f"cannot encode {type(value).__name__} in a catalog")
+        return pos
+
+def _expanded_groups(data):
+    """Index des groupes si ce sont des copies des endpoints (disposition "full"), sinon None."""
+    names = [name for name in mapping_layout.GROUPS if name in data]
+    if not names or mapping_layout.layout_of(data) != mapping_layout.LAYOUT_FULL:
+        return None
+    try:
+        rebuilt = mapping_layout.build_groups(data['endpoints'], mapping_layout.LAYOUT_FULL)
+        indexed = mapping_layout.build_groups(data['endpoints'], mapping_layout.LAYOUT_INDEXED)
+    except KeyError:
+        return None
+    # Ordre des clés compris : les groupes reconstruits doivent être identiques à ceux du fichier
+    if any(json.dumps(rebuilt[name]) != json.dumps(data[name]) for name in names):
+        return None
+    return {name: indexed[name] for name in names}
+
+def encode_catalog(data, source=None):
+    """Encode un mapping JSON (dict avec une liste "endpoints") en octets de catalogue.
+
+    source est l'empreinte du fichier de mapping (source_stamp.stamp), enregistrée dans l'en-tête.
+    """
+    flags = 0
+    root = dict(data)
+    groups = _expanded_groups(data)
+    if groups is not None:
+        flags |= FLAG_EXPANDED_GROUPS
+        root.update(groups)
+    endpoints = root['endpoints']
+    root['endpoints'] = None  # remplacé par T_ENDPOINTS, à la même place dans l'ordre des clés
+
+    strings = set()
+    _collect_strings(root, strings)
+    for ep in endpoints:
+        _collect_strings(ep, strings)
+    # Chaînes triées par octets : recherche d'une clé par dichotomie sans décoder la table
+    ordered = sorted(strings, key=lambda s: s.encode('utf-8'))
+    string_ids = {s: i for i, s in enumerate(ordered)}
+    encoded = [s.encode('utf-8') for s in ordered]
+
+    offsets = [0]
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    strings_offset = HEADER.size
+    blob_offset = strings_offset + 4 * len(offsets)
+    values_offset = blob_offset + offsets[-1]
+
+    encoder = _Encoder(string_ids, values_offset)
+    endpoint_positions = [encoder.encode(ep) for ep in endpoints]
+    root_position = encoder.encode(root)
+    # T_ENDPOINTS à la place du null écrit pour la clé "endpoints" de la racine
+    root_table = root_position - values_offset + 5
+    for i in range(len(root)):
+        key_id, value_pos = U32_PAIR.unpack_from(encoder.out, root_table + 8 * i)
+        if key_id == string_ids['endpoints']:
+            encoder.out[value_pos - values_offset] = T_ENDPOINTS
+    endpoints_offset = values_offset + len(encoder.out)
+
+    source = source or {"size": 0, "mtime_ns": 0, "sha256": '0' * 64}
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(ordered), len(endpoints),
+                         strings_offset, blob_offset, endpoints_offset, root_position,
+                         source["size"], source["mtime_ns"], bytes.fromhex(source["sha256"]))
+    return b''.join([
+        header,
+        struct.pack(f'<{len(offsets)}I', *offsets),
+        b''.join(encoded),
+        bytes(encoder.out),
+        struct.pack(f'<{len(endpoint_positions)}I', *endpoint_positions),
+    ])
+
+def write_catalog(data, path, source=None):
+    """Écrit le catalogue d'un mapping et retourne sa taille ; le fichier est remplacé d'un coup."""
+    path = Path(path)
+    payload = encode_catalog(data, source)
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+    return len(payload)
+
+class EndpointList(Sequence):
+    """Endpoints d'un catalogue, décodés un par un à la première lecture."""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+        self._cache = {}
+
+    def __len__(self):
+        return self._catalog.endpoint_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("endpoint index out of range")
+        endpoint = self._cache.get(index)
+        if endpoint is None:
+            endpoint = self._cache[index] = self._catalog.decode(self._catalog.endpoint_position(index))
+        return endpoint
+
+    def field(self, index, name, default=None):
+        """Un seul champ d'un endpoint, sans décoder les autres."""
+        return self._catalog.field(self._catalog.endpoint_position(index), name, default)
+
+class Catalog(Mapping):
+    """Catalogue ouvert par mmap ; se lit comme le dict du mapping JSON.
+
+    catalog['endpoints'] est une EndpointList ; les groupes d'un mapping "full" sont des
+    mapping_layout.LazyGroups ; les autres clés sont décodées à chaque accès.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is empty or truncated")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._buf = self._mmap
+        (magic, version, self.flags, self.string_count, self.endpoint_count, self._strings_offset,
+         self._blob_offset, self._endpoints_offset, self._root_position,
+         source_size, source_mtime_ns, source_sha256) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} KIE catalog")
+        # La table des endpoints est écrite en dernier : un fichier plus court est incomplet
+        if len(buf) != self._endpoints_offset + 4 * self.endpoint_count:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        self.source = None
+        if any(source_sha256):
+            self.source = {"size": source_size, "mtime_ns": source_mtime_ns, "sha256": source_sha256.hex()}
+        self._strings = [None] * self.string_count
+        self._ids = {}
+        self.endpoints = EndpointList(self)
+        self._root = self._dict_table(self._root_position)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # Chaînes internées
+    def string(self, string_id):
+        text = self._strings[string_id]
+        if text is None:
+            start, end = U32_PAIR.unpack_from(self._buf, self._strings_offset + 4 * string_id)
+            text = self._strings[string_id] = self._buf[self._blob_offset + start:self._blob_offset + end].decode('utf-8')
+        return text
+
+    def _string_bytes(self, string_id):
+        start, end = U32_PAIR.unpack_from(self._buf, self._strings_offset + 4 * string_id)
+        return self._buf[self._blob_offset + start:self._blob_offset + end]
+
+    def string_id(self, text):
+        """Id d'une chaîne internée, ou None si le catalogue ne la contient pas."""
+        if text in self._ids:
+            return self._ids[text]
+        string_id = self._ids[text] = self._search_string(text.encode('utf-8'))
+        return string_id
+
+    def _search_string(self, key):
+        lo, hi = 0, self.string_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.string_count and self._string_bytes(lo) == key:
+            return lo
+        return None
+
+    # Valeurs
+    def endpoint_position(self, index):
+        return U32.unpack_from(self._buf, self._endpoints_offset + 4 * index)[0]
+
+    def _dict_table(self, pos):
+        """[(id de clé, position)] d'un objet."""
+        count = U32.unpack_from(self._buf, pos + 1)[0]
+        flat = struct.unpack_from(f'<{2 * count}I', self._buf, pos + 5)
+        return list(zip(flat[0::2], flat[1::2]))
+
+    def decode(self, pos):
+        """Décode complètement la valeur à la position pos."""
+        buf = self._buf
+        tag = buf[pos]
+        if tag == T_STR:
+            return self.string(U32.unpack_from(buf, pos + 1)[0])
+        if tag == T_DICT:
+            count = U32.unpack_from(buf, pos + 1)[0]
+            flat = struct.unpack_from(f'<{2 * count}I', buf, pos + 5)
+            return {self.string(flat[i]): self.decode(flat[i + 1]) for i in range(0, 2 * count, 2)}
+        if tag == T_LIST:
+            count = U32.unpack_from(buf, pos + 1)[0]
+            return [self.decode(p) for p in struct.unpack_from(f'<{count}I', buf, pos + 5)]
+        if tag == T_INT:
+            return struct.unpack_from('<q', buf, pos + 1)[0]
+        if tag == T_FLOAT:
+            return struct.unpack_from('<d', buf, pos + 1)[0]
+        if tag == T_NULL:
+            return None
+        if tag == T_TRUE:
+            return True
+        if tag == T_FALSE:
+            return False
+        if tag == T_BIGINT:
+            return int(self.string(U32.unpack_from(buf, pos + 1)[0]))
+        if tag == T_ENDPOINTS:
+            return self.endpoints
+        raise ValueError(f"corrupt catalog: unknown value type {tag} at {pos}")
+
+    def field(self, pos, name, default=None):
+        """Valeur de la clé name de l'objet à la position pos, sans décoder les autres clés."""
+        key_id = self.string_id(name)
+        if key_id is not None:
+            count = U32.unpack_from(self._buf, pos + 1)[0]
+            flat = struct.unpack_from(f'<{2 * count}I', self._buf, pos + 5)
+            for i in range(0, 2 * count, 2):
+                if flat[i] == key_id:
+                    return self.decode(flat[i + 1])
+        return default
+
+    # Mapping de la racine
+    def __getitem__(self, key):
+        value = self.field(self._root_position, key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        if self.flags & FLAG_EXPANDED_GROUPS and key in mapping_layout.GROUPS:
+            return mapping_layout.LazyGroups(self.endpoints, value)
+        return value
+
+    def __iter__(self):
+        return (self.string(key_id) for key_id, _ in self._root)
+
+    def __len__(self):
+        return len(self._root)
+
+    def to_mapping(self):
+        """Décode tout le catalogue en un dict identique au mapping JSON d'origine."""
+        endpoints = [self.decode(self.endpoint_position(i)) for i in range(self.endpoint_count)]
+        data = {}
+        for key_id, pos in self._root:
+            key = self.string(key_id)
+            value = self.decode(pos)
+            if value is self.endpoints:
+                value = endpoints
+            elif self.flags & FLAG_EXPANDED_GROUPS and key in mapping_layout.GROUPS:
+                value = {group: [endpoints[i] for i in indices] for group, indices in value.items()}
+            data[key] = value
+        return data
+
+_MISSING = object()
+
+def catalog_path(mapping_file):
+    """Chemin du catalogue associé à un fichier de mapping JSON."""
+    return Path(mapping_file).with_suffix(CATALOG_SUFFIX)
+
+def open_fresh(catalog_file, mapping_file):
+    """Catalogue ouvert s'il est complet et construit à partir du mapping actuel, sinon None."""
+    try:
+        catalog = Catalog(catalog_file)
+    except (OSError, ValueError):
+        return None
+    if source_stamp.matches(catalog.source, mapping_file):
+        return catalog
+    catalog.close()
+    return None
+
+def is_fresh(catalog_file, mapping_file):
+    """True si le catalogue existe, est complet et correspond au contenu du mapping JSON."""
+    catalog = open_fresh(catalog_file, mapping_file)
+    if catalog is None:
+        return False
+    catalog.close()
+    return True
+
+def load_mapping(mapping_file):
+    """Ouvre le catalogue d'un mapping s'il est à jour ; sinon charge le JSON et reconstruit le catalogue."""
+    catalog_file = catalog_path(mapping_file)
+    catalog = open_fresh(catalog_file, mapping_file)
+    if catalog is not None:
+        return catalog
+    # Empreinte prise avant la lecture : un mapping modifié entre-temps rendra le catalogue périmé
+    source = source_stamp.stamp(mapping_file)
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    try:
+        write_catalog(data, catalog_file, source)
+    except OSError:
+        pass  # dossier en lecture seule : le JSON suffit
+    return data
+
+def _serialize(data):
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+def benchmark(mapping_file, catalog_file, repeat=20):
+    """Compare json.load et l'ouverture du catalogue (entier, un endpoint, un champ par endpoint)."""
+    def best(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def json_load():
+        with open(mapping_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def open_one():
+        with Catalog(catalog_file) as catalog:
+            return catalog['endpoints'][len(catalog.endpoints) // 2]['name']
+
+    def open_field():
+        with Catalog(catalog_file) as catalog:
+            endpoints = catalog.endpoints
+            return [endpoints.field(i, 'endpoint') for i in range(len(endpoints))]
+
+    def open_all():
+        with Catalog(catalog_file) as catalog:
+            return catalog.to_mapping()
+
+    rows = [
+        ("json.load (whole mapping)", best(json_load)),
+        ("catalog: one endpoint", best(open_one)),
+        ("catalog: one field of each", best(open_field)),
+        ("catalog: whole mapping", best(open_all)),
+    ]
+    base = rows[0][1]
+    print(f"{'='*60}")
+    print(f"JSON {Path(mapping_file).stat().st_size / 1024:.1f} KB, "
+          f"catalog {Path(catalog_file).stat().st_size / 1024:.1f} KB")
+    for label, seconds in rows:
+        print(f"{label:<30}{seconds * 1000:>9.3f} ms {base / seconds:>8.2f}x")
+    print(f"{'='*60}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API binary endpoint catalog")
+    sub = parser.add_subparsers(dest='command', required=True)
+    to_binary = sub.add_parser('to-binary', help="convertit un mapping JSON en catalogue")
+    to_binary.add_argument('mapping', type=Path)
+    to_binary.add_argument('catalog', type=Path, nargs='?', help=f"défaut : mapping avec le suffixe {CATALOG_SUFFIX}")
+    to_json = sub.add_parser('to-json', help="reconvertit un catalogue en mapping JSON")
+    to_json.add_argument('catalog', type=Path)
+    to_json.add_argument('mapping', type=Path)
+    bench = sub.add_parser('benchmark', help="compare json.load et la lecture du catalogue")
+    bench.add_argument('mapping', type=Path)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+
+    if args.command == 'to-binary':
+        catalog_file = args.catalog or catalog_path(args.mapping)
+        source = source_stamp.stamp(args.mapping)
+        with open(args.mapping, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        size = write_catalog(data, catalog_file, source)
+        with Catalog(catalog_file) as catalog:
+            identical = _serialize(catalog.to_mapping()) == _serialize(data)
+        print(f"✓ {len(data['endpoints'])} endpoints -> {catalog_file} ({size / 1024:.1f} KB)")
+        if not identical:
+            print("✗ Round trip differs from the JSON mapping")
+            return 1
+        print("✓ Round trip identical to the JSON mapping")
+        return 0
+
+    if args.command == 'to-json':
+        with Catalog(args.catalog) as catalog:
+            args.mapping.write_text(_serialize(catalog.to_mapping()), encoding='utf-8')
+        print(f"✓ {args.catalog} -> {args.mapping}")
+        return 0
+
+    catalog_file = catalog_path(args.mapping)
+    if not is_fresh(catalog_file, args.mapping):
+        print(f"✗ {catalog_file} is missing, truncated or built from another {args.mapping}: run to-binary first")
+        return 1
+    benchmark(args.mapping, catalog_file)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
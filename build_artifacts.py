@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Variantes minifiées et précompressées des fichiers de mapping et de catalogue KIE API.
+Pour chaque fichier JSON publié (mapping des endpoints, catalogues de modèles), écrit une
+version minifiée, sa version gzip et, si le module brotli est installé, sa version brotli,
+puis un manifeste avec l'empreinte SHA-256 et la taille de chaque variante. Le backend et
+l'application comparent l'empreinte du contenu pour éviter un téléchargement inutile et
+choisissent l'encodage le plus petit qu'ils savent lire.
+"""
+
+import gzip
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+SOURCE_DIR = Path(__file__).parent
+OUTPUT_DIR = SOURCE_DIR / 'dist'
+MANIFEST_FILE = 'manifest.json'
+
+ARTIFACT_FILES = [
+    'api-endpoints-mapping.json',
+    'api-endpoints-index.json',
+    'image-models.json',
+    'video-models.json',
+    'audio-models.json',
+    'chat-models.json',
+    'avatar-models.json',
+    'enhancement-models.json',
+    'models-catalog-hardcoded.json',
+]
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+def minify(text):
+    """JSON compact, même contenu que text (les caractères non ASCII restent en UTF-8)."""
+    return json.dumps(json.loads(text), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def encode_variants(minified):
+    """Retourne {encodage: (suffixe, octets)} des variantes d'un fichier minifié."""
+    variants = {
+        'identity': ('.min.json', minified),
+        # mtime=0 : la même entrée donne toujours les mêmes octets, donc la même empreinte
+        'gzip': ('.min.json.gz', gzip.compress(minified, compresslevel=9, mtime=0)),
+    }
+    if HAS_BROTLI:
+        variants['br'] = ('.min.json.br', brotli.compress(minified, quality=11))
+    return variants
+
+def load_manifest(output_dir):
+    path = output_dir / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def variant_matches(output_dir, variant):
+    """True si le fichier d'une variante existe avec la taille et l'empreinte du manifeste."""
+    path = output_dir / variant["path"]
+    if not path.exists():
+        return False
+    data = path.read_bytes()
+    return len(data) == variant["bytes"] and sha256(data) == variant["sha256"]
+
+def is_current(entry, content_hash, output_dir):
+    """True si les variantes du manifeste correspondent au contenu et sont intactes sur le disque."""
+    if not entry or entry.get("content_sha256") != content_hash:
+        return False
+    if 'br' not in entry["variants"] and HAS_BROTLI:
+        return False
+    return all(variant_matches(output_dir, variant) for variant in entry["variants"].values())
+
+def build_artifact(source, output_dir, previous=None):
+    """Écrit les variantes d'un fichier source et retourne (entrée du manifeste, réécrit ?)."""
+    raw = source.read_bytes()
+    minified = minify(raw.decode('utf-8'))
+    content_hash = sha256(minified)
+    if is_current(previous, content_hash, output_dir):
+        return previous, False
+
+    stem = source.name[:-len('.json')]
+    entry_variants = {}
+    for encoding, (suffix, data) in encode_variants(minified).items():
+        path = output_dir / (stem + suffix)
+        path.write_bytes(data)
+        entry_variants[encoding] = {"path": path.name, "bytes": len(data), "sha256": sha256(data)}
+
+    entry = {
+        "source_bytes": len(raw),
+        # Empreinte du contenu minifié : elle ne change pas avec l'indentation du fichier source
+        "content_sha256": content_hash,
+        "variants": entry_variants,
+        "smallest": min(entry_variants, key=lambda encoding: entry_variants[encoding]["bytes"]),
+    }
+    return entry, True
+
+def build_artifacts(source_dir=SOURCE_DIR, output_dir=OUTPUT_DIR, files=ARTIFACT_FILES):
+    """Construit toutes les variantes et le manifeste ; retourne (manifeste, fichiers réécrits)."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    old_manifest = load_manifest(output_dir)
+    previous = old_manifest.get("files", {})
+
+    entries = {}
+    rebuilt = []
+    for name in files:
+        source = source_dir / name
+        if not source.exists():
+            print(f"⚠️  Missing source file, skipped: {source}")
+            continue
+        entries[name], changed = build_artifact(source, output_dir, previous.get(name))
+        if changed:
+            rebuilt.append(name)
+
+    # Date inchangée si rien n'a changé : le manifeste reste alors identique octet pour octet
+    generated_at = old_manifest.get("generated_at")
+    if rebuilt or entries.keys() != previous.keys() or generated_at is None:
+        generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    manifest = {
+        "version": 1,
+        "generated_at": generated_at,
+        "encodings": ['identity', 'gzip'] + (['br'] if HAS_BROTLI else []),
+        "files": entries,
+    }
+    with open(output_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest, rebuilt
+
+def check_artifacts(output_dir=OUTPUT_DIR):
+    """Vérifie que chaque variante du manifeste existe avec la taille et l'empreinte annoncées."""
+    if not (output_dir / MANIFEST_FILE).exists():
+        return [f"{output_dir / MANIFEST_FILE} is missing (run build_artifacts.py first)"]
+    errors = []
+    for name, entry in load_manifest(output_dir).get("files", {}).items():
+        for encoding, variant in entry["variants"].items():
+            if not (output_dir / variant["path"]).exists():
+                errors.append(f"{name} [{encoding}]: {variant['path']} is missing")
+            elif not variant_matches(output_dir, variant):
+                errors.append(f"{name} [{encoding}]: {variant['path']} does not match the manifest")
+    return errors
+
+def print_summary(manifest, rebuilt):
+    print(f"{'='*70}")
+    print(f"{'File':<32}{'Source':>9}{'Min':>9}{'Gzip':>9}{'Brotli':>9}")
+    for name, entry in manifest["files"].items():
+        variants = entry["variants"]
+        sizes = [variants[e]["bytes"] / 1024 if e in variants else None for e in ('identity', 'gzip', 'br')]
+        cells = ''.join(f"{size:>8.1f}K" if size is not None else f"{'-':>9}" for size in sizes)
+        mark = '*' if name in rebuilt else ' '
+        print(f"{mark}{name[:31]:<31}{entry['source_bytes'] / 1024:>8.1f}K{cells}")
+    print(f"{'='*70}")
+    print(f"{len(rebuilt)} rebuilt (*), {len(manifest['files']) - len(rebuilt)} unchanged")
+    if not HAS_BROTLI:
+        print("Brotli variants skipped: install the 'brotli' package to emit them")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Minified and precompressed KIE API mapping artifacts")
+    parser.add_argument('--source-dir', type=Path, default=SOURCE_DIR,
+                        help="dossier des fichiers JSON sources")
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR,
+                        help="dossier des variantes et du manifeste")
+    parser.add_argument('--check', action='store_true',
+                        help="vérifie les variantes existantes contre le manifeste sans rien écrire")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+
+    if args.check:
+        errors = check_artifacts(args.output_dir)
+        for error in errors:
+            print(f"✗ {error}")
+        if not errors:
+            print(f"✓ All artifacts in {args.output_dir} match {MANIFEST_FILE}")
+        return 1 if errors else 0
+
+    manifest, rebuilt = build_artifacts(args.source_dir, args.output_dir)
+    print_summary(manifest, rebuilt)
+    print(f"Manifest: {args.output_dir / MANIFEST_FILE}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
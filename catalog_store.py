@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Base SQLite indexée du mapping des endpoints KIE API (module sqlite3 de la bibliothèque standard).
+Tables endpoints, model_ids et parameters avec leurs index, plus un index plein texte FTS5
+(tokenizer trigram) sur les noms, les descriptions et les modelIds. search_endpoints.py
+l'utilise avec --backend sqlite : chaque requête lit les lignes qui correspondent au lieu de
+charger tout le JSON et de parcourir tous les endpoints. Les résultats sont les mêmes que
+ceux des recherches sur le JSON, dans le même ordre. La table meta enregistre l'empreinte du
+mapping converti (voir source_stamp) ; la base est reconstruite quand le mapping change.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path
+
+import filter_query
+import source_stamp
+
+STORE_VERSION = 1
+STORE_SUFFIX = '.sqlite'
+MAPPING_FILE = Path(__file__).parent / 'api-endpoints-mapping.json'
+
+# Le tokenizer trigram ne trouve que les sous-chaînes d'au moins 3 caractères
+FTS_MIN_QUERY = 3
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE endpoints (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    endpoint TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE model_ids (
+    endpoint_id INTEGER NOT NULL REFERENCES endpoints(id),
+    model_id TEXT NOT NULL,
+    model_lower TEXT NOT NULL
+);
+CREATE TABLE parameters (
+    endpoint_id INTEGER NOT NULL REFERENCES endpoints(id),
+    name TEXT NOT NULL,
+    required INTEGER NOT NULL
+);
+CREATE INDEX endpoints_category ON endpoints(category, id);
+CREATE INDEX model_ids_endpoint ON model_ids(endpoint_id);
+CREATE INDEX model_ids_model ON model_ids(model_id);
+CREATE INDEX parameters_name ON parameters(name, endpoint_id);
+CREATE VIRTUAL TABLE endpoints_text USING fts5(name, description, model_ids, tokenize='trigram case_sensitive 1');
+"""
+
+def store_path(mapping_file):
+    """Chemin de la base associée à un fichier de mapping JSON."""
+    return Path(mapping_file).with_suffix(STORE_SUFFIX)
+
+def endpoint_description(ep):
+    """Texte décrivant un endpoint : sa description s'il en a une, puis celles de ses paramètres."""
+    parts = [ep.get('description') or '']
+    for group in ('required', 'optional'):
+        for info in (ep.get('parameters') or {}).get(group, {}).values():
+            if isinstance(info, dict) and info.get('description'):
+                parts.append(info['description'])
+    return '\n'.join(part for part in parts if part)
+
+def _phrase(query):
+    """Requête FTS5 qui cherche query comme une phrase (donc comme une sous-chaîne en trigram)."""
+    return '"' + query.replace('"', '""') + '"'
+
+def build_store(data, path, source=None):
+    """Écrit la base d'un mapping chargé ; le fichier est remplacé d'un coup, jamais à moitié écrit.
+
+    source est l'empreinte du fichier de mapping (source_stamp.stamp), enregistrée dans meta.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        header = {key: value for key, value in data.items() if key != 'endpoints'}
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ('version', str(STORE_VERSION)),
+            ('mapping', json.dumps(header, ensure_ascii=False)),
+            ('source', json.dumps(source)),
+        ])
+        for i, ep in enumerate(data.get('endpoints', [])):
+            model_ids = ep.get('modelIds') or []
+            parameters = ep.get('parameters') or {}
+            conn.execute("INSERT INTO endpoints VALUES (?, ?, ?, ?, ?)",
+                         (i, ep.get('name', ''), ep.get('category'), ep.get('endpoint'),
+                          json.dumps(ep, ensure_ascii=False, separators=(',', ':'))))
+            conn.executemany("INSERT INTO model_ids VALUES (?, ?, ?)",
+                             [(i, model_id, model_id.lower()) for model_id in model_ids])
+            conn.executemany("INSERT INTO parameters VALUES (?, ?, ?)",
+                             [(i, name, group == 'required')
+                              for group in ('required', 'optional') for name in parameters.get(group, {})])
+            # Texte en minuscules (str.lower) : les recherches comparent comme search_endpoints
+            conn.execute("INSERT INTO endpoints_text(rowid, name, description, model_ids) VALUES (?, ?, ?, ?)",
+                         (i, ep.get('name', '').lower(), endpoint_description(ep).lower(),
+                          '\n'.join(model_id.lower() for model_id in model_ids)))
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+def is_fresh(path, mapping_file):
+    """True si la base existe, est lisible, a la version courante et correspond au contenu du mapping."""
+    path = Path(path)
+    if not path.exists():
+        return False
+    try:
+        with CatalogStore(path) as store:
+            return store.version == STORE_VERSION and source_stamp.matches(store.source, mapping_file)
+    except sqlite3.DatabaseError:
+        return False
+
+class CatalogStore(Mapping):
+    """Base ouverte en lecture seule ; se lit comme le mapping (store['total_endpoints'], ...)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path.resolve().as_uri() + '?mode=ro', uri=True)
+        self._meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+        self.version = int(self._meta.get('version', 0))
+        self.source = json.loads(self._meta.get('source', 'null'))
+        self._header = None
+        self._filter = None
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def header(self):
+        """Champs du mapping autres que endpoints (décodés à la première lecture)."""
+        if self._header is None:
+            self._header = json.loads(self._meta.get('mapping', '{}'))
+        return self._header
+
+    def _endpoints(self, sql, params=()):
+        return [json.loads(data) for (data,) in self.conn.execute(sql, params)]
+
+    def _where_ids(self, ids_sql, params=()):
+        """Endpoints dont l'id est retourné par ids_sql, dans l'ordre du mapping."""
+        return self._endpoints(f"SELECT data FROM endpoints WHERE id IN ({ids_sql}) ORDER BY id", params)
+
+    def _text_ids(self, column, query):
+        """Requête des ids dont la colonne (en minuscules) contient query, en passant par FTS5."""
+        query = query.lower()
+        # instr confirme la sous-chaîne ; la requête MATCH ne sert qu'à utiliser l'index
+        if len(query) >= FTS_MIN_QUERY:
+            return (f"SELECT rowid FROM endpoints_text WHERE {column} MATCH ? AND instr({column}, ?) > 0",
+                    (_phrase(query), query))
+        return f"SELECT rowid FROM endpoints_text WHERE instr({column}, ?) > 0", (query,)
+
+    def search_by_category(self, category):
+        return self._endpoints("SELECT data FROM endpoints WHERE category = ? ORDER BY id", (category.lower(),))
+
+    def search_by_model(self, model_query):
+        ids_sql, params = self._text_ids('model_ids', model_query)
+        # Les modelIds sont séparés par des retours à la ligne dans FTS5 : la table model_ids tranche
+        return self._where_ids(f"SELECT endpoint_id FROM model_ids WHERE endpoint_id IN ({ids_sql})"
+                               f" AND instr(model_lower, ?) > 0", params + (model_query.lower(),))
+
+    def search_by_name(self, name_query):
+        return self._where_ids(*self._text_ids('name', name_query))
+
+    def search_by_text(self, query):
+        name_sql, name_params = self._text_ids('name', query)
+        text_sql, text_params = self._text_ids('description', query)
+        return self._where_ids(f"{name_sql} UNION {text_sql}", name_params + text_params)
+
+    def search_by_parameter(self, param_name):
+        return self._where_ids("SELECT endpoint_id FROM parameters WHERE name = ?", (param_name,))
+
+    def endpoints_at(self, ids):
+        """Endpoints d'une liste d'ids, dans l'ordre de la liste."""
+        ids = list(ids)
+        rows = dict(self.conn.execute(f"SELECT id, data FROM endpoints WHERE id IN ({','.join('?' * len(ids))})", ids))
+        return [json.loads(rows[i]) for i in ids]
+
+    def filter_index(self):
+        """Index du langage de filtres, construit une fois depuis les endpoints de la base."""
+        if self._filter is None:
+            self._filter = filter_query.FilterIndex(self['endpoints'])
+        return self._filter
+
+    def list_all_models(self):
+        return [model_id for (model_id,) in self.conn.execute("SELECT DISTINCT model_id FROM model_ids ORDER BY model_id")]
+
+    def list_all_parameters(self):
+        return [name for (name,) in self.conn.execute("SELECT DISTINCT name FROM parameters ORDER BY name")]
+
+    def __getitem__(self, key):
+        if key == 'endpoints':
+            return self._endpoints("SELECT data FROM endpoints ORDER BY id")
+        return self.header[key]
+
+    def __iter__(self):
+        yield from self.header
+        yield 'endpoints'
+
+    def __len__(self):
+        return len(self.header) + 1
+
+def open_store(mapping_file):
+    """Ouvre la base d'un mapping, reconstruite d'abord si elle manque ou est périmée."""
+    path = store_path(mapping_file)
+    if not is_fresh(path, mapping_file):
+        source = source_stamp.stamp(mapping_file)
+        with open(mapping_file, 'r', encoding='utf-8') as f:
+            build_store(json.load(f), path, source)
+    return CatalogStore(path)
+
+def scale_mapping(data, factor):
+    """Mapping de factor fois plus d'endpoints : copies numérotées (noms et modelIds suffixés)."""
+    endpoints = []
+    for copy in range(factor):
+        for ep in data['endpoints']:
+            ep = json.loads(json.dumps(ep))
+            if copy:
+                ep['name'] = f"{ep['name']} #{copy}"
+                ep['modelIds'] = [f"{model_id}-{copy}" for model_id in ep.get('modelIds') or []]
+            endpoints.append(ep)
+    scaled = dict(data)
+    scaled['endpoints'] = endpoints
+    scaled['total_endpoints'] = len(endpoints)
+    return scaled
+
+# (commande, fonction de search_endpoints et méthode de CatalogStore, argument) mesurées par le benchmark
+BENCHMARK_QUERIES = [
+    ('category', 'search_by_category', 'video'),
+    ('model', 'search_by_model', 'wan'),
+    ('name', 'search_by_name', 'image to video'),
+    ('name', 'search_by_name', 'timestamped lyrics'),
+    ('model', 'search_by_model', 'V4'),
+    ('param', 'search_by_parameter', 'prompt'),
+]
+
+def benchmark(mapping_file, scales=(1, 10, 100), repeat=5):
+    """Latence des requêtes de search_endpoints sur le JSON et sur la base, à plusieurs tailles."""
+    import search_endpoints
+
+    def best(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for factor in scales:
+            data = scale_mapping(base, factor)
+            json_file = Path(tmp) / f'mapping-x{factor}.json'
+            json_file.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+            db_file = store_path(json_file)
+            build_store(data, db_file)
+
+            def json_cold(function, arg):
+                # Une invocation de search_endpoints : chargement du JSON puis recherche
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    return function(json.load(f), arg)
+
+            def store_cold(name, arg):
+                with CatalogStore(db_file) as store:
+                    return getattr(store, name)(arg)
+
+            with CatalogStore(db_file) as store:
+                for command, name, arg in BENCHMARK_QUERIES:
+                    function = getattr(search_endpoints, name)
+                    method = getattr(store, name)
+                    expected = function(data, arg)
+                    rows.append({
+                        "scale": factor,
+                        "endpoints": len(data['endpoints']),
+                        "query": f"{command} {arg}",
+                        "results": len(expected),
+                        "same_results": method(arg) == expected,
+                        "json_cold": best(lambda: json_cold(function, arg)),
+                        "json_warm": best(lambda: function(data, arg)),
+                        "sqlite_cold": best(lambda: store_cold(name, arg)),
+                        "sqlite_warm": best(lambda: method(arg)),
+                    })
+    return rows
+
+def print_benchmark(rows):
+    """Tableau du benchmark, en millisecondes ; cold = ouverture du fichier comprise."""
+    print(f"{'='*96}")
+    print(f"{'Scale':>6}{'Endpoints':>10}  {'Query':<22}{'Results':>8}"
+          f"{'JSON cold':>11}{'JSON warm':>11}{'SQL cold':>10}{'SQL warm':>10}{'cold gain':>11}")
+    for row in rows:
+        line = (f"{row['scale']:>5}x{row['endpoints']:>10}  {row['query'][:21]:<22}{row['results']:>8}"
+                f"{row['json_cold'] * 1000:>11.2f}{row['json_warm'] * 1000:>11.2f}"
+                f"{row['sqlite_cold'] * 1000:>10.2f}{row['sqlite_warm'] * 1000:>10.2f}"
+                f"{row['json_cold'] / row['sqlite_cold']:>10.1f}x")
+        if not row['same_results']:
+            line += "  ✗ results differ"
+        print(line)
+    print(f"{'='*96}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API endpoint catalog in SQLite (FTS5)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="construit la base d'un mapping JSON")
+    build.add_argument('mapping', type=Path, nargs='?', default=MAPPING_FILE)
+    build.add_argument('store', type=Path, nargs='?', help=f"défaut : mapping avec le suffixe {STORE_SUFFIX}")
+    bench = sub.add_parser('benchmark', help="compare la latence des requêtes JSON et SQLite")
+    bench.add_argument('mapping', type=Path, nargs='?', default=MAPPING_FILE)
+    bench.add_argument('--scales', default='1,10,100', help="tailles du catalogue, en multiples du mapping")
+    bench.add_argument('--repeat', type=int, default=5, help="mesures par requête (la meilleure est gardée)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        path = args.store or store_path(args.mapping)
+        source = source_stamp.stamp(args.mapping)
+        with open(args.mapping, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        size = build_store(data, path, source)
+        print(f"✓ {len(data['endpoints'])} endpoints -> {path} ({size / 1024:.1f} KB)")
+        return 0
+
+    rows = benchmark(args.mapping, [int(scale) for scale in args.scales.split(',')], max(1, args.repeat))
+    print_benchmark(rows)
+    return 0 if all(row['same_results'] for row in rows) else 1
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Index bitmap des endpoints KIE API.
+Chaque endpoint a un id entier (sa position dans le mapping) et chaque valeur distincte d'un
+champ (paramètre, catégorie, capability, méthode, modelId) un id interné. Chaque valeur a le
+bitmap des endpoints qui l'ont : un int Python dont le bit i est l'endpoint i. Intersections (&),
+unions (|), différences (& ~) et comptes (bit_count) se font sur ces entiers, sans relire les
+dicts des endpoints ; seuls les endpoints du résultat sont lus, à la fin.
+"""
+
+import json
+import time
+import argparse
+from pathlib import Path
+
+MAPPING_FILE = Path(__file__).parent / 'api-endpoints-mapping.json'
+
+# Champs indexés ; model_lower sert aux recherches sans casse, param_type aux couples (paramètre, type)
+FIELDS = ('category', 'capability', 'method', 'model', 'model_lower',
+          'param', 'required', 'optional', 'param_type')
+
+def bits(ids):
+    """Bitmap d'une suite d'ids d'endpoints (ordre et doublons sans importance)."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, 'little')
+
+def members(bitmap):
+    """Ids d'un bitmap, dans l'ordre croissant."""
+    # Écriture binaire retournée : le caractère i est le bit i
+    text = bin(bitmap)[:1:-1]
+    ids = []
+    i = text.find('1')
+    while i >= 0:
+        ids.append(i)
+        i = text.find('1', i + 1)
+    return ids
+
+def count(bitmap):
+    """Nombre d'endpoints d'un bitmap."""
+    return bitmap.bit_count()
+
+def endpoint_entries(ep):
+    """(champ, valeur) indexés d'un endpoint, valeurs normalisées comme dans les recherches."""
+    for field in ('category', 'capability'):
+        if ep.get(field) is not None:
+            yield field, str(ep[field]).lower()
+    if ep.get('method'):
+        yield 'method', ep['method'].upper()
+    for model_id in ep.get('modelIds') or []:
+        yield 'model', model_id
+        yield 'model_lower', model_id.lower()
+    parameters = ep.get('parameters') or {}
+    for group in ('required', 'optional'):
+        for name, info in parameters.get(group, {}).items():
+            yield 'param', name
+            yield group, name
+            ptype = info.get('type') if isinstance(info, dict) else None
+            if ptype:
+                yield 'param_type', (name, str(ptype).lower())
+
+class BitmapIndex:
+    """Bitmaps par valeur de chaque champ de FIELDS, pour une liste d'endpoints."""
+
+    def __init__(self, endpoints):
+        self.size = len(endpoints)
+        self.all = (1 << self.size) - 1
+        self.ids = {field: {} for field in FIELDS}
+        self.values = {field: [] for field in FIELDS}
+        owners = {field: [] for field in FIELDS}
+
+        for i, ep in enumerate(endpoints):
+            for field, value in endpoint_entries(ep):
+                ids = self.ids[field]
+                value_id = ids.get(value)
+                if value_id is None:
+                    value_id = ids[value] = len(ids)
+                    self.values[field].append(value)
+                    owners[field].append([])
+                owners[field][value_id].append(i)
+
+        # Listes d'ids converties une fois en bitmaps (un |= par endpoint serait quadratique)
+        self.bitmaps = {field: [bits(ids) for ids in owners[field]] for field in FIELDS}
+
+    def value_id(self, field, value):
+        """Id interné d'une valeur, None si aucun endpoint ne l'a."""
+        return self.ids[field].get(value)
+
+    def bitmap(self, field, value):
+        """Bitmap des endpoints qui ont la valeur (0 si aucun)."""
+        value_id = self.ids[field].get(value)
+        return 0 if value_id is None else self.bitmaps[field][value_id]
+
+    def any_of(self, field, values):
+        """Union des bitmaps de plusieurs valeurs."""
+        result = 0
+        for value in values:
+            result |= self.bitmap(field, value)
+        return result
+
+    def matching(self, field, test):
+        """Union des bitmaps des valeurs pour lesquelles test(valeur) est vrai."""
+        result = 0
+        for value, bitmap in zip(self.values[field], self.bitmaps[field]):
+            if test(value):
+                result |= bitmap
+        return result
+
+    def count(self, field, value):
+        return count(self.bitmap(field, value))
+
+    def counts(self, field):
+        """{valeur: nombre d'endpoints}, dans l'ordre de première apparition."""
+        return {value: count(bitmap) for value, bitmap in zip(self.values[field], self.bitmaps[field])}
+
+    def distinct(self, field):
+        """Valeurs distinctes d'un champ, triées."""
+        return sorted(self.values[field])
+
+# --- Benchmark : mêmes questions en parcourant les dicts et sur les bitmaps ---
+
+def _walk_questions(endpoints):
+    accept = [ep for ep in endpoints
+              if 'aspect_ratio' in ep['parameters']['required'] or 'aspect_ratio' in ep['parameters']['optional']]
+    image = [ep for ep in endpoints if ep['category'] == 'image'
+             and ('negative_prompt' in ep['parameters']['required'] or 'negative_prompt' in ep['parameters']['optional'])]
+    stats = {}
+    for ep in endpoints:
+        for name in dict.fromkeys([*ep['parameters']['required'], *ep['parameters']['optional']]):
+            stats[name] = stats.get(name, 0) + 1
+    params = sorted(stats)
+    return len(accept), len(image), sorted(stats.items(), key=lambda x: x[1], reverse=True)[:20], params
+
+def _bitmap_questions(index):
+    accept = index.bitmap('param', 'aspect_ratio')
+    image = index.bitmap('category', 'image') & index.bitmap('param', 'negative_prompt')
+    stats = index.counts('param')
+    params = index.distinct('param')
+    return count(accept), count(image), sorted(stats.items(), key=lambda x: x[1], reverse=True)[:20], params
+
+def benchmark(data, scales, repeat=5):
+    """Lignes (échelle, endpoints, construction ms, parcours ms, bitmaps ms, gain) ; vérifie l'égalité."""
+    import catalog_store
+
+    rows = []
+    for scale in scales:
+        endpoints = catalog_store.scale_mapping(data, scale)['endpoints'] if scale > 1 else data['endpoints']
+        start = time.perf_counter()
+        index = BitmapIndex(endpoints)
+        build = time.perf_counter() - start
+
+        timings = []
+        for run in (lambda: _walk_questions(endpoints), lambda: _bitmap_questions(index)):
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                answer = run()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append((best, answer))
+        (walk, expected), (bitmap, answer) = timings
+        if answer != expected:
+            raise AssertionError(f"bitmap answers differ from the dict walk at scale {scale}")
+        rows.append((scale, len(endpoints), build * 1000, walk * 1000, bitmap * 1000, walk / bitmap))
+    return rows
+
+def print_benchmark(rows):
+    print(f"\n{'='*70}")
+    print("Bitmap index vs dict walk (aspect_ratio, image + negative_prompt, parameter counts)")
+    print(f"{'='*70}")
+    print(f"{'Scale':>6} {'Endpoints':>10} {'Build ms':>10} {'Walk ms':>10} {'Bitmap ms':>10} {'Speedup':>9}")
+    for scale, size, build, walk, bitmap, speedup in rows:
+        print(f"{scale:>5}x {size:>10} {build:>10.2f} {walk:>10.3f} {bitmap:>10.3f} {speedup:>8.1f}x")
+    print(f"{'='*70}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Bitmap indexes over the KIE API endpoint mapping")
+    parser.add_argument('command', choices=('counts', 'benchmark'),
+                        help="counts : nombre d'endpoints par valeur d'un champ ; benchmark : bitmaps vs parcours")
+    parser.add_argument('--mapping', type=Path, default=MAPPING_FILE, help="mapping à indexer")
+    parser.add_argument('--field', choices=FIELDS, default='param', help="champ compté par counts")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100], help="copies du catalogue (benchmark)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+    with open(args.mapping, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if args.command == 'benchmark':
+        print_benchmark(benchmark(data, args.scales))
+        return 0
+
+    index = BitmapIndex(data['endpoints'])
+    stats = sorted(index.counts(args.field).items(), key=lambda x: x[1], reverse=True)
+    print(f"{len(stats)} distinct values of {args.field} over {index.size} endpoints:")
+    for value, total in stats:
+        label = '.'.join(value) if isinstance(value, tuple) else str(value)
+        print(f"  {label[:40]:40s} : {total:5d} endpoints")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
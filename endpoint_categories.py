@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Catégorisation des endpoints KIE API à partir d'une table déclarative unique.
+Toutes les règles (catégorie et capacité des endpoints du mapping, catégorie d'un fichier
+docskie, catégorie d'un chemin d'API) sont décrites dans categorization-rules.json, chargé et
+compilé une seule fois. Un index précalculé des modelIds et chemins d'endpoint exacts répond
+en O(1) ; les règles par mots-clés ne servent qu'en secours. L'index porte l'empreinte des
+règles dont il est issu : s'il ne correspond plus aux règles, il est ignoré.
+"""
+
+import sys
+import json
+import time
+import hashlib
+import argparse
+from collections import defaultdict
+from pathlib import Path
+
+from keyword_rules import RuleSet, kw, any_of, all_of, not_, join_values
+
+RULES_FILE = Path(__file__).parent / 'categorization-rules.json'
+MAPPING_FILE = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+
+INDEX_KEYS = ('category', 'capability')
+
+def parse_condition(data):
+    """Convertit une condition JSON : ["champ", "mot"], {"any": [...]}, {"all": [...]}, {"not": ...}."""
+    if isinstance(data, list):
+        field, keyword = data
+        return kw(field, keyword)
+    (op, value), = data.items()
+    if op == 'any':
+        return any_of(*map(parse_condition, value))
+    if op == 'all':
+        return all_of(*map(parse_condition, value))
+    if op == 'not':
+        return not_(parse_condition(value))
+    raise ValueError(f"unknown condition operator: {op!r}")
+
+def rules_digest(rule_sets):
+    """SHA-256 des règles (JSON canonique), enregistré avec l'index construit à partir d'elles."""
+    canonical = json.dumps(rule_sets, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class RuleTable:
+    """Table chargée : RuleSet compilés par nom, et index des valeurs exactes.
+
+    L'index n'est utilisé que si son empreinte correspond aux règles chargées ; sinon (règle
+    modifiée sans --build-index) il est ignoré avec un avertissement et les règles répondent seules.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.rule_sets = {
+            name: RuleSet(spec["fields"],
+                          [(result, parse_condition(condition)) for result, condition in spec["rules"]],
+                          spec["default"])
+            for name, spec in data["rule_sets"].items()
+        }
+        index = data.get("index", {})
+        self.index_stale = bool(index) and index.get("rules_sha256") != rules_digest(data["rule_sets"])
+        if self.index_stale:
+            print("⚠️  categorization index was built from other rules; ignoring it "
+                  "(run endpoint_categories.py --build-index)", file=sys.stderr)
+            index = {}
+        self.model_index = index.get("model_ids", {})
+        self.endpoint_index = index.get("endpoints", {})
+
+    def __getitem__(self, name):
+        return self.rule_sets[name]
+
+def load_rule_table(path=RULES_FILE):
+    """Charge et compile la table de règles."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return RuleTable(json.load(f))
+
+def dump_rule_table(data):
+    """Sérialise la table avec une règle, et une entrée d'index, par ligne."""
+    def one(value):
+        return json.dumps(value, ensure_ascii=False)
+
+    def block(items, indent):
+        return [f'{indent}{item}' + (',' if i < len(items) - 1 else '') for i, item in enumerate(items)]
+
+    lines = ['{', f'  "version": {one(data["version"])},', '  "rule_sets": {']
+    rule_sets = list(data["rule_sets"].items())
+    for i, (name, spec) in enumerate(rule_sets):
+        lines.append(f'    {one(name)}: {{')
+        for key in ("description", "fields", "default"):
+            lines.append(f'      {one(key)}: {one(spec[key])},')
+        lines.append('      "rules": [')
+        lines.extend(block([one(rule) for rule in spec["rules"]], '        '))
+        lines.append('      ]')
+        lines.append('    }' + (',' if i < len(rule_sets) - 1 else ''))
+    lines.append('  },')
+    lines.append('  "index": {')
+    lines.append(f'    "rules_sha256": {one(data["index"]["rules_sha256"])},')
+    for i, key in enumerate(("model_ids", "endpoints")):
+        lines.append(f'    {one(key)}: {{')
+        lines.extend(block([f'{one(k)}: {one(v)}' for k, v in data["index"][key].items()], '      '))
+        lines.append('    }' + (',' if i == 0 else ''))
+    lines.append('  }')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+RULES = load_rule_table()
+
+def endpoint_fields(endpoint_info):
+    """Champs (endpoint, name, models, source) d'un endpoint du mapping, en minuscules."""
+    return (
+        endpoint_info.get('endpoint', '').lower(),
+        endpoint_info.get('name', '').lower(),
+        join_values(endpoint_info.get('modelIds', [])).lower(),
+        endpoint_info.get('source_file', '').lower(),
+    )
+
+def lookup_index(endpoint_info, key, table=RULES):
+    """Valeur de key donnée par l'index (modelIds exacts, puis chemin exact), ou None."""
+    for model_id in endpoint_info.get('modelIds', []):
+        entry = table.model_index.get(model_id)
+        if entry is not None and key in entry:
+            return entry[key]
+    entry = table.endpoint_index.get(endpoint_info.get('endpoint'))
+    if entry is not None and key in entry:
+        return entry[key]
+    return None
+
+def categorize_endpoint(endpoint_info, use_index=True):
+    """Catégorie d'un endpoint du mapping : index exact, sinon règles endpoint_category."""
+    if use_index:
+        category = lookup_index(endpoint_info, 'category')
+        if category is not None:
+            return category
+    return RULES['endpoint_category'].classify(*endpoint_fields(endpoint_info))
+
+def get_capability(endpoint_info, use_index=True):
+    """Capacité d'un endpoint du mapping : index exact, sinon règles capability."""
+    if use_index:
+        capability = lookup_index(endpoint_info, 'capability')
+        if capability is not None:
+            return capability
+    return RULES['capability'].classify(*endpoint_fields(endpoint_info))
+
+def categorize_many(endpoints, use_index=True):
+    """Retourne [(catégorie, capacité)] de tous les endpoints d'un mapping en une passe.
+
+    L'index répond d'abord ; les endpoints restants sont dédoublonnés par champs, puis chaque
+    RuleSet est appliqué colonne par colonne avec map() sur les combinaisons distinctes.
+    """
+    results = []
+    pending = {}
+    for i, endpoint_info in enumerate(endpoints):
+        category = lookup_index(endpoint_info, 'category') if use_index else None
+        capability = lookup_index(endpoint_info, 'capability') if use_index else None
+        results.append((category, capability))
+        if category is None or capability is None:
+            pending.setdefault(endpoint_fields(endpoint_info), []).append(i)
+
+    if pending:
+        keys = list(pending)
+        columns = list(zip(*keys))
+        categories = map(RULES['endpoint_category'].classify, *columns)
+        capabilities = map(RULES['capability'].classify, *columns)
+        for key, category, capability in zip(keys, categories, capabilities):
+            for i in pending[key]:
+                indexed_category, indexed_capability = results[i]
+                results[i] = (indexed_category if indexed_category is not None else category,
+                              indexed_capability if indexed_capability is not None else capability)
+    return results
+
+def categorize_file(file_path):
+    """Catégorie grossière (audio, video, image, chat, other) d'un fichier docskie."""
+    return RULES['file_category'].classify(str(file_path).lower())
+
+def categorize_path(endpoint, name):
+    """Catégorie d'un chemin d'API trouvé dans une page ('' si aucune règle ne s'applique)."""
+    return RULES['path_category'].classify(endpoint, name.lower())
+
+def build_index(endpoints):
+    """Construit l'index exact des modelIds et chemins d'un mapping.
+
+    Une valeur n'est indexée que si les règles la donnent à tous les endpoints qui portent ce
+    modelId (ou ce chemin) : sur ce mapping, l'index donne donc les mêmes résultats que les règles.
+    """
+    seen = {"model_ids": defaultdict(lambda: defaultdict(set)),
+            "endpoints": defaultdict(lambda: defaultdict(set))}
+    for endpoint_info in endpoints:
+        values = {
+            'category': categorize_endpoint(endpoint_info, use_index=False),
+            'capability': get_capability(endpoint_info, use_index=False),
+        }
+        keys = [("model_ids", model_id) for model_id in endpoint_info.get('modelIds', [])]
+        if endpoint_info.get('endpoint'):
+            keys.append(("endpoints", endpoint_info['endpoint']))
+        for section, key in keys:
+            for name, value in values.items():
+                seen[section][key][name].add(value)
+
+    index = {}
+    for section, entries in seen.items():
+        index[section] = {}
+        for key in sorted(entries):
+            entry = {name: next(iter(entries[key][name])) for name in INDEX_KEYS
+                     if len(entries[key][name]) == 1}
+            if entry:
+                index[section][key] = entry
+    return index
+
+def load_endpoints(mapping_file):
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get('endpoints', [])
+
+def benchmark(endpoints, count=100000):
+    """Compare les appels par endpoint à categorize_many, avec et sans index."""
+    workload = (endpoints * (count // max(len(endpoints), 1) + 1))[:count]
+
+    print(f"{'='*70}")
+    print(f"Endpoint categorisation ({len(workload):,} endpoints from {len(endpoints)} distinct)")
+    print(f"{'='*70}")
+
+    start = time.perf_counter()
+    expected = [(categorize_endpoint(ep, use_index=False), get_capability(ep, use_index=False))
+                for ep in workload]
+    rules_time = time.perf_counter() - start
+    print(f"Rules, per endpoint:         {rules_time:7.3f}s")
+
+    start = time.perf_counter()
+    [(categorize_endpoint(ep), get_capability(ep)) for ep in workload]
+    elapsed = time.perf_counter() - start
+    print(f"Index + rules, per endpoint: {elapsed:7.3f}s ({rules_time / elapsed:.2f}x)")
+
+    for label, use_index in (("categorize_many, rules:", False), ("categorize_many, index:", True)):
+        start = time.perf_counter()
+        results = categorize_many(workload, use_index)
+        elapsed = time.perf_counter() - start
+        status = "✓ identical" if results == expected else "✗ differs from the rules"
+        print(f"{label:<29}{elapsed:7.3f}s ({rules_time / elapsed:.2f}x)  {status}")
+
+    hits = sum(1 for ep in endpoints
+               if lookup_index(ep, 'category') is not None and lookup_index(ep, 'capability') is not None)
+    print(f"Index hits:                  {hits}/{len(endpoints)} endpoints "
+          f"({len(RULES.model_index)} model IDs, {len(RULES.endpoint_index)} paths indexed)")
+    print(f"{'='*70}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API endpoint categorisation table")
+    parser.add_argument('mapping', nargs='?', type=Path, default=MAPPING_FILE,
+                        help="mapping JSON dont les endpoints sont utilisés")
+    parser.add_argument('--build-index', action='store_true',
+                        help="reconstruit l'index exact de categorization-rules.json depuis le mapping")
+    parser.add_argument('--count', type=int, default=100000,
+                        help="nombre d'endpoints classés par le benchmark")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale : reconstruit l'index ou lance le benchmark."""
+    args = parse_args(argv)
+    endpoints = load_endpoints(args.mapping)
+
+    if args.build_index:
+        index = dict(rules_sha256=rules_digest(RULES.data["rule_sets"]), **build_index(endpoints))
+        data = dict(RULES.data, index=index)
+        RULES_FILE.write_text(dump_rule_table(data), encoding='utf-8')
+        print(f"✓ Index rebuilt from {len(endpoints)} endpoints: {len(data['index']['model_ids'])} model IDs, "
+              f"{len(data['index']['endpoints'])} paths -> {RULES_FILE}")
+        return 0
+
+    benchmark(endpoints, args.count)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
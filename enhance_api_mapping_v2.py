@@ -4,204 +4,49 @@ Enhanced categorization for API endpoints mapping.
 """
 
 import json
+import argparse
 from pathlib import Path
-from typing import Dict
-
-def categorize_endpoint(endpoint_info: Dict) -> str:
-    """Determine the category based on endpoint path, model IDs, and name."""
-    endpoint = endpoint_info.get('endpoint', '').lower()
-    name = endpoint_info.get('name', '').lower()
-    models = [m.lower() for m in endpoint_info.get('modelIds', [])]
-    source = endpoint_info.get('source_file', '').lower()
-
-    # Check source file path first
-    if 'runway' in source:
-        if 'aleph' in name:
-            return 'runway-aleph'
-        return 'runway'
-    elif '4oimage' in source or 'gpt4o-image' in endpoint:
-        return '4o-image'
-    elif 'suno' in source:
-        return 'suno'
-    elif 'veo3.1' in source or 'veo' in endpoint:
-        return 'veo'
-    elif 'luma' in source or 'luma' in endpoint or '/modify/' in endpoint:
-        return 'luma'
-    elif 'flux' in source or '/flux/' in endpoint or any('flux' in m for m in models):
-        return 'flux'
-
-    # Check by name patterns for market models
-    if 'claude' in name:
-        return 'market-chat-claude'
-    elif 'gemini' in name:
-        return 'market-chat-gemini'
-    elif 'sora' in name or any('sora' in m for m in models):
-        return 'market-video-sora'
-    elif 'kling' in name or any('kling' in m for m in models):
-        return 'market-video-kling'
-    elif 'wan' in name or any('wan/' in m for m in models):
-        return 'market-video-wan'
-    elif 'hailuo' in name or any('hailuo' in m for m in models):
-        return 'market-video-hailuo'
-    elif 'seedream' in name or any('seedream' in m for m in models):
-        return 'market-image-seedream'
-    elif 'seedance' in name or any('seedance' in m for m in models):
-        return 'market-video-bytedance'
-    elif 'bytedance' in name or any('bytedance' in m for m in models):
-        if 'video' in name or 'v1' in str(models):
-            return 'market-video-bytedance'
-        return 'market-image-bytedance'
-    elif 'elevenlabs' in name or any('elevenlabs' in m for m in models):
-        return 'market-music-elevenlabs'
-    elif 'grok' in name or any('grok' in m for m in models):
-        if 'video' in name:
-            return 'market-video-grok'
-        return 'market-image-grok'
-    elif 'topaz' in name or any('topaz' in m for m in models):
-        if 'video' in name:
-            return 'market-video-topaz'
-        return 'market-image-topaz'
-    elif 'imagen' in name or 'nano-banana' in name or any('imagen' in m or 'nano-banana' in m for m in models):
-        return 'market-image-google'
-    elif 'gpt image' in name or 'gpt-image' in name or any('gpt-image' in m for m in models):
-        return 'market-image-gpt'
-    elif 'ideogram' in name or any('ideogram' in m for m in models):
-        return 'market-image-ideogram'
-    elif 'qwen' in name or any('qwen' in m for m in models):
-        return 'market-image-qwen'
-    elif 'recraft' in name or any('recraft' in m for m in models):
-        return 'market-image-recraft'
-    elif 'infinitalk' in name or any('infinitalk' in m for m in models):
-        return 'market-video-infinitalk'
-    elif 'z-image' in name or any('z-image' in m for m in models):
-        return 'market-image-zimage'
-    elif any('flux-2' in m for m in models):
-        return 'market-image-flux2'
-
-    # Common APIs
-    if 'common' in source or '/chat/credit' in endpoint or '/common/' in endpoint:
-        return 'common'
-    elif 'file upload' in source or ('upload' in name.lower() and 'file' in source):
-        return 'file-upload'
-    elif 'callback' in name.lower() or 'webhook' in name.lower():
-        return 'callbacks'
-    elif 'getting started' in name or 'quickstart' in name:
-        return 'documentation'
-    elif 'market' in source and '/jobs/' in endpoint:
-        return 'market-general'
-
-    return 'other'
-
-def get_capability(endpoint_info: Dict) -> str:
-    """Determine the capability/type of the endpoint."""
-    name = endpoint_info.get('name', '').lower()
-    endpoint = endpoint_info.get('endpoint', '').lower()
-    models = [m.lower() for m in endpoint_info.get('modelIds', [])]
-
-    # Check models first for more accurate detection
-    if any('text-to-image' in m for m in models):
-        return 'text-to-image'
-    elif any('image-to-image' in m for m in models):
-        return 'image-to-image'
-    elif any('text-to-video' in m for m in models):
-        return 'text-to-video'
-    elif any('image-to-video' in m for m in models):
-        return 'image-to-video'
-
-    # Check name
-    if 'text-to-image' in name or 'text to image' in name:
-        return 'text-to-image'
-    elif 'image-to-image' in name or 'image to image' in name:
-        return 'image-to-image'
-    elif 'text-to-video' in name or 'text to video' in name:
-        return 'text-to-video'
-    elif 'image-to-video' in name or 'image to video' in name:
-        return 'image-to-video'
-    elif 'video-to-video' in name or 'video to video' in name:
-        return 'video-to-video'
-    elif 'speech-to-video' in name or 'audio' in name and 'video' in name:
-        return 'audio-to-video'
-    elif 'upscale' in name:
-        return 'upscale'
-    elif 'motion-control' in name or 'animate' in name:
-        return 'motion-control'
-    elif 'character' in name and not 'edit' in name:
-        return 'character-generation'
-    elif 'reframe' in name:
-        return 'reframe'
-    elif ('generate' in name or 'create' in name) and 'music' in name:
-        return 'generate-music'
-    elif ('generate' in name or 'create' in name) and 'lyrics' in name:
-        return 'generate-lyrics'
-    elif 'text-to-speech' in name or 'tts' in name:
-        return 'text-to-speech'
-    elif 'text-to-dialogue' in name:
-        return 'text-to-dialogue'
-    elif 'speech-to-text' in name or 'stt' in name:
-        return 'speech-to-text'
-    elif 'sound-effect' in name or 'audio-isolation' in name:
-        return 'audio-effect'
-    elif 'extend' in name:
-        return 'extend'
-    elif 'edit' in name or 'modify' in name:
-        return 'edit'
-    elif 'cover' in name:
-        return 'cover'
-    elif 'remix' in name:
-        return 'remix'
-    elif 'remove-background' in name or 'background' in name:
-        return 'remove-background'
-    elif 'watermark' in name:
-        return 'remove-watermark'
-    elif 'midi' in name:
-        return 'audio-to-midi'
-    elif 'wav' in name:
-        return 'audio-convert'
-    elif 'vocal' in name or 'stem' in name or 'separation' in name:
-        return 'audio-separation'
-    elif 'record-info' in endpoint or ('get' in name and 'details' in name):
-        return 'get-status'
-    elif 'download' in name or 'download' in endpoint:
-        return 'get-download'
-    elif 'callback' in name:
-        return 'callback'
-    elif 'credit' in endpoint or 'credit' in name:
-        return 'get-credits'
-    elif 'webhook' in name:
-        return 'webhook'
-    elif 'chat' in name or any('claude' in m or 'gemini' in m for m in models):
-        return 'chat'
-
-    return 'other'
-
-def main():
-    json_file = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
-
-    # Load existing data
+
+import build_artifacts
+import lookup_index
+import mapping_layout
+from endpoint_categories import categorize_endpoint, get_capability, categorize_many
+
+MAPPING_FILE = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Enhanced categorization for the API endpoints mapping")
+    parser.add_argument('--mapping', type=Path, default=MAPPING_FILE,
+                        help="mapping file enhanced in place")
+    parser.add_argument('--layout', choices=mapping_layout.LAYOUTS, default=mapping_layout.LAYOUT_FULL,
+                        help="'full' copies endpoints into by_category/by_capability; "
+                             "'indexed' stores their indices in the endpoints list (see mapping_layout.load_mapping)")
+    parser.add_argument('--artifacts', action='store_true',
+                        help="also write minified/gzip/brotli variants and their manifest (see build_artifacts)")
+    parser.add_argument('--report', action='store_true',
+                        help="print the file size and parse time of both layouts")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    json_file = args.mapping
+
+    # Load existing data (groups of an indexed mapping are rebuilt below, so they are not rehydrated)
     with open(json_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
     endpoints = data.get('endpoints', [])
 
-    # Enhance each endpoint
-    for ep in endpoints:
-        ep['category'] = categorize_endpoint(ep)
-        ep['capability'] = get_capability(ep)
-
-    # Group by category
-    by_category = {}
-    by_capability = {}
-    for ep in endpoints:
-        cat = ep['category']
-        cap = ep['capability']
+    # Enhance every endpoint in one pass
+    for ep, (category, capability) in zip(endpoints, categorize_many(endpoints)):
+        ep['category'] = category
+        ep['capability'] = capability
 
-        if cat not in by_category:
-            by_category[cat] = []
-        by_category[cat].append(ep)
-
-        if cap not in by_capability:
-            by_capability[cap] = []
-        by_capability[cap].append(ep)
+    # Group by category and capability (endpoint copies, or indices into endpoints)
+    groups = mapping_layout.build_groups(endpoints, args.layout)
+    by_category = groups['by_category']
+    by_capability = groups['by_capability']
 
     # Collect all unique model IDs
     all_models = sorted(set(m for ep in endpoints for m in ep.get('modelIds', [])))
@@ -216,6 +61,8 @@ def main():
         "endpoints_with_models": sum(1 for ep in endpoints if ep.get('modelIds')),
         "all_model_ids": all_models
     }
+    if args.layout == mapping_layout.LAYOUT_INDEXED:
+        metadata["layout"] = mapping_layout.LAYOUT_INDEXED
 
     # Create enhanced structure
     enhanced_data = {
@@ -227,9 +74,9 @@ def main():
 
     # Save enhanced data
     with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(enhanced_data, f, indent=2, ensure_ascii=False)
+        f.write(mapping_layout.serialize(enhanced_data))
 
-    print(f"Enhanced {len(endpoints)} endpoints")
+    print(f"Enhanced {len(endpoints)} endpoints ({args.layout} layout)")
     print(f"\n{'='*60}")
     print(f"Categories: {len(by_category)}")
     for cat, count in sorted(metadata['by_category_count'].items()):
@@ -243,5 +90,24 @@ def main():
     print(f"\n{'='*60}")
     print(f"Total unique model IDs: {len(all_models)}")
 
+    # Model ID / path lookup index, written before the artifacts so it is published with them
+    index = lookup_index.write_lookup_index(json_file, endpoints)
+    duplicates = index['duplicates']['model_ids']
+    print(f"Lookup index: {len(index['model_ids'])} model IDs, {len(index['paths'])} paths -> {lookup_index.index_path(json_file)}")
+    if duplicates:
+        print(f"⚠️  {len(duplicates)} model IDs map to several endpoints (the first one is routed):")
+        for model_id, indices in duplicates.items():
+            print(f"  {model_id:35s}: endpoints {indices}")
+
+    if args.artifacts:
+        # The catalog files live next to the mapping
+        output_dir = json_file.parent / 'dist'
+        manifest, rebuilt = build_artifacts.build_artifacts(json_file.parent, output_dir)
+        print(f"\nArtifacts: {len(rebuilt)} rebuilt, {len(manifest['files']) - len(rebuilt)} unchanged -> {output_dir}")
+
+    if args.report:
+        print(f"\nLayout report ({len(endpoints)} endpoints):")
+        mapping_layout.print_layout_report(mapping_layout.layout_report(enhanced_data))
+
 if __name__ == '__main__':
     main()
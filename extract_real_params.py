@@ -6,9 +6,35 @@ Filtre tout le bruit JavaScript et ne garde que les paramètres d'API réels.
 
 import json
 import re
+import argparse
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+from functools import partial
+
+import endpoint_categories
+import keyword_rules
+import page_access
+import page_regions
+import pipeline
+import stage_timing
+import token_scanner
+from endpoint_bitmaps import BitmapIndex
+from extraction_cache import open_cache
+
+DOCSKIE_PATH = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie')
+OUTPUT_FILE = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+
+# Motifs de l'endpoint, lus par le token scanner (kind, pattern, flags, premiers caractères)
+ENDPOINT_TOKEN_SPECS = [
+    ('url', r'https://api\.kie\.ai(/api/v\d+/[a-zA-Z0-9/_-]+)', 0, 'h'),
+    ('method', r'--request\s+GET|"GET"', re.IGNORECASE, r'"\-'),
+    ('credit', r'(\d+)\s*credits?', re.IGNORECASE, '0-9'),
+]
+ENDPOINT_TOKENS = token_scanner.TokenScanner(ENDPOINT_TOKEN_SPECS, overlapping=['method'])
+
+# Paramètres classés comme requis
+REQUIRED_PARAMS = ['model', 'prompt', 'text', 'input', 'image']
 
 # Liste des paramètres d'API courants à chercher
 VALID_API_PARAMS = {
@@ -32,10 +58,21 @@ VALID_API_PARAMS = {
 def extract_params_from_html(html_file):
     """Extrait les vrais paramètres d'API depuis un fichier HTML."""
     try:
-        with open(html_file, 'r', encoding='utf-8', errors='ignore') as f:
-            # Lire seulement les premiers 500KB (partie de contenu)
-            content = f.read(500000)
+        content = page_access.read_text(html_file, errors='ignore')
+    except Exception as e:
+        print(f"Error: {e}")
+        return {}, []
+
+    return extract_params_from_content(content)
+
+def extract_params_from_content(content, start=0, end=None):
+    """Extrait les vrais paramètres d'API depuis le contenu d'une page.
 
+    Avec start/end, seules les correspondances qui commencent dans [start, end) sont gardées
+    (zone propre d'un morceau, voir page_access.iter_chunks).
+    """
+    end = len(content) if end is None else end
+    try:
         params_found = {}
         models_found = set()
 
@@ -45,6 +82,10 @@ def extract_params_from_html(html_file):
         matches = re.finditer(json_param_pattern, content, re.IGNORECASE)
 
         for match in matches:
+            if match.start() < start:
+                continue
+            if match.start() >= end:
+                break
             param_name = match.group(1).strip()
             param_value = match.group(2).strip().strip('"\'')
 
@@ -88,25 +129,11 @@ def extract_params_from_html(html_file):
         return {}, []
 
 def categorize_file(file_path):
-    """Détermine la catégorie du fichier."""
-    path_lower = str(file_path).lower()
-
-    if 'suno' in path_lower or 'elevenlabs' in path_lower or '/music' in path_lower:
-        return 'audio'
-    elif 'runway' in path_lower or 'luma' in path_lower or 'veo' in path_lower or 'kling' in path_lower or 'wan' in path_lower or 'sora' in path_lower or 'hailuo' in path_lower or 'bytedance' in path_lower or 'infinitalk' in path_lower or '/video' in path_lower:
-        return 'video'
-    elif '4oimage' in path_lower or 'flux' in path_lower or 'grok' in path_lower or 'ideogram' in path_lower or 'seedream' in path_lower or 'recraft' in path_lower or 'qwen' in path_lower or '/image' in path_lower or 'topaz' in path_lower:
-        return 'image'
-    elif 'claude' in path_lower or 'gemini' in path_lower or '/chat' in path_lower:
-        return 'chat'
-    else:
-        return 'other'
-
-def extract_endpoint_url(content, file_name):
-    """Extrait l'URL de l'endpoint."""
-    # Chercher les URLs d'API
-    api_urls = re.findall(r'https://api\.kie\.ai(/api/v\d+/[a-zA-Z0-9/_-]+)', content)
+    """Détermine la catégorie du fichier (règles file_category de endpoint_categories)."""
+    return endpoint_categories.categorize_file(file_path)
 
+def extract_endpoint_url(api_urls):
+    """Extrait l'URL de l'endpoint parmi les chemins d'API trouvés."""
     if api_urls:
         # Filtrer et prendre la première URL valide
         for url_path in api_urls:
@@ -115,9 +142,151 @@ def extract_endpoint_url(content, file_name):
 
     return None, None
 
-def main():
+def extract_endpoint(html_file, regions_only=False, chunked=False, data=None):
+    """Extrait l'endpoint d'un fichier HTML, ou None si aucune URL d'API n'est trouvée.
+
+    Le fichier est projeté en mémoire (sauf si data contient déjà ses octets) et lu une seule
+    fois, en entier. Avec regions_only, seules ses régions utiles sont décodées et scannées ;
+    avec chunked, il est scanné par morceaux qui se chevauchent au lieu d'être décodé d'un bloc.
+    """
+    with stage_timing.page(html_file, None if data is None else len(data)), \
+            page_access.open_page(html_file, data) as page:
+        # Préfiltre sur les octets : une page sans api.kie.ai n'est jamais décodée
+        with stage_timing.span('prefilter'):
+            has_reference = page_regions.has_api_reference(page.data)
+        if not has_reference:
+            return None
+
+        if regions_only:
+            with stage_timing.span('decode'):
+                content = page_regions.regions_text(page.data)
+        elif chunked:
+            # Le décodage des morceaux n'est compté que dans le temps total de la page
+            return extract_endpoint_from_chunks(html_file, page.iter_chunks(errors='ignore'))
+        else:
+            with stage_timing.span('decode'):
+                content = page.text(errors='ignore')
+        return extract_endpoint_from_chunks(html_file, [page_access.Chunk(0, content, 0, len(content))])
+
+def extract_endpoint_from_chunks(html_file, chunks):
+    """Extrait l'endpoint à partir des morceaux d'une page (un seul morceau hors mode chunked)."""
+    name = None
+    api_urls = []
+    method = "POST"  # Par défaut
+    valid_credits = []
+    params = {}
+    models = set()
+
+    for chunk in chunks:
+        content = chunk.text
+
+        # URLs, méthode et crédits en tokens typés, limités à la zone propre du morceau
+        with stage_timing.span('endpoint_tokens'):
+            tokens = {kind: [t for t in kind_tokens if chunk.start <= t.start < chunk.end]
+                      for kind, kind_tokens in ENDPOINT_TOKENS.collect(content).items()}
+        stage_timing.count_tokens(tokens)
+
+        # Extraire le titre
+        if name is None:
+            with stage_timing.span('title'):
+                title_match = re.search(r'<title[^>]*>(.*?)</title>', content, re.IGNORECASE)
+            if title_match:
+                name = re.sub(r'<[^>]+>', '', title_match.group(1))
+                name = name.replace(' - KIE API', '').replace('KIE API', '').strip()
+
+        api_urls.extend(token_scanner.values(content, tokens['url']))
+
+        # Méthode
+        if tokens['method']:
+            method = "GET"
+
+        # Credits
+        credits_matches = token_scanner.values(content, tokens['credit'])
+        valid_credits.extend(int(c) for c in credits_matches if 1 <= int(c) <= 10000)
+
+        # Paramètres (le premier trouvé l'emporte, comme dans extract_params_from_content)
+        with stage_timing.span('params'):
+            chunk_params, chunk_models = extract_params_from_content(content, chunk.start, chunk.end)
+        stage_timing.count('param', len(chunk_params))
+        for param_name, param_info in chunk_params.items():
+            params.setdefault(param_name, param_info)
+        models.update(chunk_models)
+
+    if name is None:
+        name = "Unknown"
+
+    # Catégorie
+    category = categorize_file(html_file)
+
+    # Endpoint URL
+    full_url, endpoint = extract_endpoint_url(api_urls)
+
+    if not endpoint:
+        return None
+
+    credits = min(valid_credits) if valid_credits else None
+    models = sorted(models)
+
+    # Créer l'endpoint info
+    endpoint_info = {
+        "name": name,
+        "category": category,
+        "endpoint": endpoint,
+        "full_url": full_url,
+        "method": method,
+        "modelIds": models,
+        "parameters": {
+            "required": {},
+            "optional": {}
+        },
+        "pricing": {
+            "credits": credits
+        }
+    }
+
+    # Classer les paramètres
+    for param_name, param_info in params.items():
+        if param_name in REQUIRED_PARAMS:
+            endpoint_info["parameters"]["required"][param_name] = param_info
+        else:
+            endpoint_info["parameters"]["optional"][param_name] = param_info
+
+    return endpoint_info
+
+def extract_page_bytes(html_file, data, regions_only=False, chunked=False):
+    """Étape d'analyse du pipeline : extrait l'endpoint d'une page déjà lue."""
+    return extract_endpoint(html_file, regions_only, chunked, data)
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API Real Parameters Extractor")
+    parser.add_argument('--docskie', type=Path, default=DOCSKIE_PATH,
+                        help="dossier des pages HTML de la documentation")
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE,
+                        help="fichier du mapping généré")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore le cache d'extraction et re-parse toutes les pages")
+    parser.add_argument('--regions', action='store_true',
+                        help="scanne le titre, l'article, le code et les tables au lieu de la page entière")
+    parser.add_argument('--chunked', action='store_true',
+                        help="scanne chaque page par morceaux qui se chevauchent (très grosses pages)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="lit les pages dans un thread pendant que les workers analysent les précédentes")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="workers d'analyse du pipeline (plus de 1 = processus)")
+    parser.add_argument('--queue-depth', type=int, default=pipeline.QUEUE_DEPTH,
+                        help="pages lues d'avance par le pipeline")
+    parser.add_argument('--timing-report', type=Path, metavar='FILE',
+                        help="écrit le temps de chaque étape et les pages les plus lentes dans FILE (JSON) ; "
+                             "les pages en cache ne sont pas analysées, à combiner avec --no-cache")
+    parser.add_argument('--timing-top', type=int, default=stage_timing.TOP_PAGES, metavar='N',
+                        help="nombre de pages les plus lentes listées dans le rapport de timing")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Fonction principale."""
-    docskie_path = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie')
+    args = parse_args(argv)
+    docskie_path = args.docskie
 
     print("="*70)
     print("KIE API Real Parameters Extractor")
@@ -129,86 +298,66 @@ def main():
 
     all_endpoints = []
     category_stats = defaultdict(int)
-    param_stats = defaultdict(int)
 
-    for i, html_file in enumerate(html_files, 1):
+    cache = None
+    if not args.no_cache:
+        cache_name = 'extract_real_params'
+        if args.regions:
+            cache_name += '-regions'
+        elif args.chunked:
+            cache_name += '-chunked'
+        cache = open_cache(cache_name, __file__, endpoint_categories.__file__, endpoint_categories.RULES_FILE,
+                           keyword_rules.__file__, page_access.__file__, page_regions.__file__,
+                           token_scanner.__file__)
+
+    workers = max(1, args.workers)
+    if args.timing_report:
+        stage_timing.enable()
+        if args.pipeline and workers > 1:
+            # Les mesures sont enregistrées dans ce processus : workers en threads
+            print(f"Timing report: {workers} pipeline workers run as threads\n")
+
+    runner = None
+    if args.pipeline:
+        runner = pipeline.Pipeline(partial(extract_page_bytes, regions_only=args.regions, chunked=args.chunked),
+                                   workers=workers, queue_depth=args.queue_depth,
+                                   processes=workers > 1 and not args.timing_report)
+    extract = partial(extract_endpoint, regions_only=args.regions, chunked=args.chunked)
+    results = pipeline.run_extractions(html_files, extract, cache, runner)
+
+    for i, (html_file, endpoint_info, error) in enumerate(results, 1):
         print(f"[{i:3d}/{len(html_files)}] {html_file.name[:65]:<65}", end=" ")
 
-        # Lire le fichier
-        try:
-            with open(html_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(500000)  # Premiers 500KB
-        except:
+        if error is not None:
+            if not isinstance(error, OSError):
+                raise error
             print("✗ error")
             continue
 
-        # Extraire le titre
-        title_match = re.search(r'<title[^>]*>(.*?)</title>', content, re.IGNORECASE)
-        name = "Unknown"
-        if title_match:
-            name = re.sub(r'<[^>]+>', '', title_match.group(1))
-            name = name.replace(' - KIE API', '').replace('KIE API', '').strip()
-
-        # Catégorie
-        category = categorize_file(html_file)
-
-        # Endpoint URL
-        full_url, endpoint = extract_endpoint_url(content, html_file.name)
-
         # Skip si pas d'endpoint trouvé
-        if not endpoint:
+        if endpoint_info is None:
             print("✗ no endpoint")
             continue
 
-        # Méthode
-        method = "POST"  # Par défaut
-        if re.search(r'--request\s+GET|"GET"', content, re.IGNORECASE):
-            method = "GET"
-
-        # Paramètres
-        params, models = extract_params_from_html(html_file)
-
-        # Credits
-        credits_matches = re.findall(r'(\d+)\s*credits?', content, re.IGNORECASE)
-        credits = None
-        if credits_matches:
-            valid_credits = [int(c) for c in credits_matches if 1 <= int(c) <= 10000]
-            if valid_credits:
-                credits = min(valid_credits)
-
-        # Créer l'endpoint info
-        endpoint_info = {
-            "name": name,
-            "category": category,
-            "endpoint": endpoint,
-            "full_url": full_url,
-            "method": method,
-            "modelIds": models,
-            "parameters": {
-                "required": {},
-                "optional": {}
-            },
-            "pricing": {
-                "credits": credits
-            }
-        }
-
-        # Classer les paramètres
-        required_params = ['model', 'prompt', 'text', 'input', 'image']
-        for param_name, param_info in params.items():
-            if param_name in required_params:
-                endpoint_info["parameters"]["required"][param_name] = param_info
-            else:
-                endpoint_info["parameters"]["optional"][param_name] = param_info
-
         all_endpoints.append(endpoint_info)
-        category_stats[category] += 1
+        category_stats[endpoint_info["category"]] += 1
+
+        params = list(endpoint_info["parameters"]["required"]) + list(endpoint_info["parameters"]["optional"])
+        print(f"✓ ({len(params)} params, {len(endpoint_info['modelIds'])} models)")
 
-        param_count = len(params)
-        for p in params:
-            param_stats[p] += 1
+    if cache is not None:
+        cache.prune(html_files)
+        cache.save()
+    if runner is not None:
+        print()
+        runner.report()
+    if args.timing_report:
+        print()
+        stage_timing.print_summary(stage_timing.write_report(args.timing_report, args.timing_top))
+        print(f"Timing report saved to: {args.timing_report}")
 
-        print(f"✓ ({param_count} params, {len(models)} models)")
+    # Nombre d'endpoints par paramètre : bitmaps comptés, sans reparcourir les paramètres
+    param_stats = BitmapIndex(all_endpoints).counts('param')
 
     # Créer le JSON final
     output = {
@@ -222,7 +371,7 @@ def main():
     }
 
     # Sauvegarder
-    output_file = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+    output_file = args.output
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
 
@@ -239,6 +388,8 @@ def main():
     print(f"Endpoints with models:        {endpoints_with_models}")
     print(f"Endpoints with pricing:       {endpoints_with_pricing}")
     print(f"Categories:                   {dict(category_stats)}")
+    if cache is not None:
+        print(f"Extraction cache:             {cache.summary()}")
     print(f"Output file:                  {output_file}")
     print(f"{'='*70}\n")
 
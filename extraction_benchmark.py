@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark des extracteurs KIE API sur un corpus docskie (réel ou généré par synthetic_corpus).
+Chaque extracteur tourne dans son propre processus, sans cache, avec --docskie et --output
+pointés sur le corpus et un fichier temporaire. Le temps, le débit (fichiers/s, Mo/s) et la
+mémoire maximale (RSS) de chaque exécution sont écrits dans un fichier de résultats JSON
+comparable d'une exécution à l'autre.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+import synthetic_corpus
+
+SCRIPT_DIR = Path(__file__).parent
+RESULTS_FILE = Path('benchmark-results.json')
+
+# (nom, script, arguments) ; --docskie et --output sont ajoutés à chaque exécution
+BENCHMARKS = [
+    ('final', 'parse_api_docs_final.py', ['--no-cache']),
+    ('final-regions', 'parse_api_docs_final.py', ['--no-cache', '--regions']),
+    ('final-pipeline', 'parse_api_docs_final.py', ['--no-cache', '--pipeline']),
+    ('real-params', 'extract_real_params.py', ['--no-cache']),
+    ('real-params-chunked', 'extract_real_params.py', ['--no-cache', '--chunked']),
+    ('real-params-regions', 'extract_real_params.py', ['--no-cache', '--regions']),
+    ('html-docs-v2', 'parse_html_docs_v2.py', ['--no-cache']),
+    ('engine', 'extraction_engine.py', []),
+]
+
+def corpus_stats(corpus_dir):
+    """Nombre de pages et taille totale du corpus (avec le manifeste du générateur s'il existe)."""
+    html_files = list(corpus_dir.rglob('*.html'))
+    stats = {
+        "path": str(corpus_dir),
+        "files": len(html_files),
+        "total_bytes": sum(f.stat().st_size for f in html_files),
+    }
+    manifest = corpus_dir / synthetic_corpus.MANIFEST_FILE
+    if manifest.exists():
+        stats["manifest"] = json.loads(manifest.read_text(encoding='utf-8'))
+    return stats
+
+def endpoints_digest(output_file):
+    """Nombre d'endpoints du mapping produit et empreinte de leur contenu (sans les dates)."""
+    with open(output_file, 'r', encoding='utf-8') as f:
+        endpoints = json.load(f).get('endpoints', [])
+    digest = hashlib.md5(json.dumps(endpoints, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    return len(endpoints), digest
+
+def run_once(script, args, corpus_dir, output_file):
+    """Lance un extracteur et retourne (secondes, RSS maximal en octets)."""
+    command = [sys.executable, str(SCRIPT_DIR / script), *args, '--docskie', str(corpus_dir), '--output', str(output_file)]
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=SCRIPT_DIR, stdout=subprocess.DEVNULL, stderr=stderr)
+        # wait4 donne l'usage des ressources de ce processus seulement
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"{script} exited with {process.returncode}:\n"
+                               f"{stderr.read().decode('utf-8', 'replace')[-2000:]}")
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    peak_rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return elapsed, peak_rss
+
+def run_benchmark(name, script, args, corpus, repeat):
+    """Meilleur temps de repeat exécutions, avec le RSS maximal de toutes les exécutions."""
+    corpus_dir = Path(corpus["path"])
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = Path(tmp) / 'mapping.json'
+        runs = [run_once(script, args, corpus_dir, output_file) for _ in range(repeat)]
+        endpoints, digest = endpoints_digest(output_file)
+
+    seconds = min(elapsed for elapsed, _ in runs)
+    return {
+        "name": name,
+        "command": ' '.join([script] + args),
+        "runs": [round(elapsed, 4) for elapsed, _ in runs],
+        "seconds": round(seconds, 4),
+        "files_per_sec": round(corpus["files"] / seconds, 1),
+        "mb_per_sec": round(corpus["total_bytes"] / seconds / 1e6, 2),
+        "peak_rss_mb": round(max(rss for _, rss in runs) / 1e6, 1),
+        "endpoints": endpoints,
+        "endpoints_digest": digest,
+    }
+
+def print_results(results, previous=None):
+    """Tableau des résultats, avec le speedup par rapport à un fichier de résultats précédent."""
+    previous = {r["name"]: r for r in (previous or {}).get("results", [])}
+    print(f"\n{'='*70}")
+    print(f"{'Extractor':<22}{'Seconds':>9}{'Files/s':>10}{'MB/s':>8}{'Peak MB':>9}{'Endpoints':>11}"
+          + (f"{'vs prev':>9}" if previous else ''))
+    for r in results:
+        line = (f"{r['name']:<22}{r['seconds']:>9.2f}{r['files_per_sec']:>10.1f}{r['mb_per_sec']:>8.2f}"
+                f"{r['peak_rss_mb']:>9.1f}{r['endpoints']:>11}")
+        before = previous.get(r["name"])
+        if before:
+            line += f"{before['seconds'] / r['seconds']:>8.2f}x"
+            if before["endpoints_digest"] != r["endpoints_digest"]:
+                line += "  ✗ output changed"
+        print(line)
+    print(f"{'='*70}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API extraction benchmark suite")
+    parser.add_argument('corpus_dir', type=Path, help="dossier docskie à extraire")
+    parser.add_argument('--generate', type=int, metavar='COUNT',
+                        help="génère d'abord un corpus synthétique de COUNT pages dans corpus_dir (vide)")
+    parser.add_argument('--seed', type=int, default=0, help="seed du corpus généré")
+    parser.add_argument('--noise-kb', type=int, default=64, help="JavaScript inline par page généré, en Ko")
+    parser.add_argument('--only', default=None,
+                        help=f"benchmarks à exécuter, séparés par des virgules ({','.join(b[0] for b in BENCHMARKS)})")
+    parser.add_argument('--repeat', type=int, default=1, help="exécutions par benchmark (le meilleur temps est gardé)")
+    parser.add_argument('--results', type=Path, default=RESULTS_FILE, help="fichier de résultats JSON")
+    parser.add_argument('--compare', type=Path, default=None, help="fichier de résultats précédent à comparer")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+
+    if args.generate:
+        if args.corpus_dir.exists() and any(args.corpus_dir.iterdir()):
+            print(f"✗ {args.corpus_dir} is not empty: generate the corpus in a new directory")
+            return 1
+        print(f"Generating {args.generate} pages in {args.corpus_dir}...")
+        synthetic_corpus.generate_corpus(args.corpus_dir, args.generate, args.seed, args.noise_kb)
+
+    names = args.only.split(',') if args.only else [b[0] for b in BENCHMARKS]
+    unknown = [name for name in names if name not in {b[0] for b in BENCHMARKS}]
+    if unknown:
+        print(f"✗ Unknown benchmarks: {', '.join(unknown)}")
+        return 1
+
+    corpus = corpus_stats(args.corpus_dir)
+    print(f"{'='*70}")
+    print(f"Extraction benchmark: {corpus['files']} files, {corpus['total_bytes'] / 1e6:.1f} MB in {args.corpus_dir}")
+    print(f"{'='*70}")
+
+    results = []
+    for name, script, script_args in BENCHMARKS:
+        if name not in names:
+            continue
+        print(f"  {name:<22}", end=" ", flush=True)
+        result = run_benchmark(name, script, script_args, corpus, max(1, args.repeat))
+        results.append(result)
+        print(f"{result['seconds']:.2f}s, {result['files_per_sec']:.1f} files/s, {result['peak_rss_mb']:.1f} MB peak")
+
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    print_results(results, previous)
+
+    output = {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "corpus": corpus,
+        "results": results,
+    }
+    with open(args.results, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+    print(f"Results saved to: {args.results}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
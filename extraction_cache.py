@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Cache persistant des résultats d'extraction, indexé par le hash du contenu des fichiers HTML.
+Une page déjà analysée avec la même version de l'extracteur n'est jamais re-parsée.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+CACHE_FORMAT = 1
+CACHE_DIR = Path(__file__).parent / '.extraction-cache'
+
+def file_digest(path):
+    """Retourne le hash BLAKE2b du contenu d'un fichier."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def extractor_version(*source_files):
+    """Calcule la version d'un extracteur à partir du code source de ses modules."""
+    h = hashlib.blake2b(digest_size=12)
+    h.update(str(CACHE_FORMAT).encode())
+    for source_file in source_files:
+        h.update(Path(source_file).read_bytes())
+    return h.hexdigest()
+
+class ExtractionCache:
+    """Cache sur disque {chemin: (hash du contenu, résultat)} pour une version d'extracteur."""
+
+    def __init__(self, cache_file, version):
+        self.cache_file = Path(cache_file)
+        self.version = version
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = False
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # Le code de l'extracteur a changé : tout le cache est invalide
+        if data.get("version") != self.version:
+            self.invalidated = True
+            self._dirty = True
+            return
+
+        self.entries = data.get("entries", {})
+
+    def lookup(self, path):
+        """Retourne (digest, trouvé, résultat) pour un fichier."""
+        digest = file_digest(path)
+        entry = self.entries.get(str(path))
+        if entry is not None and entry["hash"] == digest:
+            self.hits += 1
+            return digest, True, entry["result"]
+        self.misses += 1
+        return digest, False, None
+
+    def store(self, path, digest, result):
+        """Enregistre le résultat d'extraction d'un fichier."""
+        self.entries[str(path)] = {"hash": digest, "result": result}
+        self._dirty = True
+
+    def prune(self, paths):
+        """Supprime les entrées des fichiers qui n'existent plus dans le corpus."""
+        keep = {str(p) for p in paths}
+        stale = [key for key in self.entries if key not in keep]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._dirty = True
+        return len(stale)
+
+    def save(self):
+        """Écrit le cache de façon atomique."""
+        if not self._dirty:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.version, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+        self._dirty = False
+
+    def summary(self):
+        """Résumé des compteurs hit/miss."""
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        note = " (invalidated: extractor changed)" if self.invalidated else ""
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate){note}"
+
+def open_cache(name, *source_files):
+    """Ouvre le cache d'un extracteur dans le dossier .extraction-cache."""
+    return ExtractionCache(CACHE_DIR / f'{name}.json', extractor_version(*source_files))
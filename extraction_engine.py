@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Moteur d'extraction unifié pour la documentation KIE API.
+Chaque page est lue une seule fois dans un objet partagé, puis les stratégies enregistrées
+(tables, exemples de requête, liste blanche VALID_API_PARAMS, BeautifulSoup en secours)
+s'exécutent dessus. Une seule passe sur le corpus produit un mapping fusionné, avec le
+temps passé dans chaque stratégie.
+"""
+
+import json
+import time
+import argparse
+from collections import defaultdict, namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import extract_real_params
+import parse_api_docs_final
+
+try:
+    from bs4 import BeautifulSoup
+    import parse_api_docs
+    HAS_BS4 = True
+except ImportError:
+    HAS_BS4 = False
+
+DOCSKIE_PATH = parse_api_docs_final.DOCSKIE_PATH
+OUTPUT_FILE = parse_api_docs_final.OUTPUT_FILE
+
+# fallback : la stratégie ne s'exécute que si aucune stratégie précédente n'a trouvé de paramètre
+Strategy = namedtuple('Strategy', ['name', 'func', 'fallback'])
+
+# Stratégies de paramètres, par ordre de priorité (le premier qui définit un paramètre l'emporte)
+STRATEGIES = {}
+
+def register_strategy(name, fallback=False):
+    """Décorateur : enregistre func(page) -> {nom: {"info", "required"}} comme stratégie."""
+    def decorator(func):
+        STRATEGIES[name] = Strategy(name, func, fallback)
+        return func
+    return decorator
+
+class ParsedPage:
+    """Page lue une seule fois, partagée par toutes les stratégies.
+
+    Les résultats intermédiaires coûteux (arbre BeautifulSoup...) sont mémorisés par memo().
+    """
+
+    def __init__(self, path, content):
+        self.path = Path(path)
+        self.content = content
+        self._memo = {}
+
+    def memo(self, key, build):
+        """Retourne build(self), calculé une seule fois par page."""
+        if key not in self._memo:
+            self._memo[key] = build(self)
+        return self._memo[key]
+
+@register_strategy('table_params')
+def table_params(page):
+    return parse_api_docs_final.extract_table_params(page.content)
+
+@register_strategy('request_example_params')
+def request_example_params(page):
+    return parse_api_docs_final.guess_required(parse_api_docs_final.extract_request_params(page.content))
+
+@register_strategy('whitelist_params')
+def whitelist_params(page):
+    params, _ = extract_real_params.extract_params_from_content(page.content)
+    return {
+        param_name: {
+            "info": param_info,
+            "required": param_name in extract_real_params.REQUIRED_PARAMS
+        }
+        for param_name, param_info in params.items()
+    }
+
+if HAS_BS4:
+    @register_strategy('bs4_table_params', fallback=True)
+    def bs4_table_params(page):
+        soup = page.memo('soup', lambda p: BeautifulSoup(p.content, 'html.parser'))
+        params = {}
+        for param_name, param_info, is_required in parse_api_docs.extract_soup_table_params(soup):
+            params[param_name] = {"info": param_info, "required": is_required}
+        return params
+
+class ExtractionEngine:
+    """Exécute les stratégies sur chaque page et mesure le temps de chaque étape."""
+
+    def __init__(self, strategies=None, regions_only=False):
+        names = list(STRATEGIES) if strategies is None else strategies
+        self.strategies = [STRATEGIES[name] for name in names]
+        self.regions_only = regions_only
+        self.timings = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.contributed = defaultdict(int)
+
+    def _timed(self, name, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.timings[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def extract(self, html_file):
+        """Extrait l'endpoint d'une page, ou None si elle n'en décrit aucun."""
+        content = self._timed('read', parse_api_docs_final.read_page_content, html_file, self.regions_only)
+        if content is None:
+            return None
+        page = ParsedPage(html_file, content)
+
+        endpoint_info = self._timed('fields', parse_api_docs_final.extract_endpoint_fields, html_file, content)
+        if not endpoint_info["endpoint"]:
+            return None
+
+        all_params = {}
+        for strategy in self.strategies:
+            if strategy.fallback and all_params:
+                continue
+            found = self._timed(strategy.name, strategy.func, page)
+            for param_name, param_data in found.items():
+                if param_name not in all_params:
+                    all_params[param_name] = param_data
+                    self.contributed[strategy.name] += 1
+
+        parse_api_docs_final.fill_parameters(endpoint_info, all_params)
+        return endpoint_info
+
+    def run(self, html_files, verbose=True):
+        """Parcourt le corpus une seule fois et retourne le mapping fusionné."""
+        endpoints = []
+        category_stats = defaultdict(int)
+        param_stats = defaultdict(int)
+
+        for i, html_file in enumerate(html_files, 1):
+            try:
+                endpoint_info = self.extract(html_file)
+            except Exception as e:
+                endpoint_info = None
+                if verbose:
+                    print(f"Error: {html_file.name}: {e}")
+
+            if endpoint_info is None:
+                if verbose:
+                    print(f"[{i:3d}/{len(html_files)}] {html_file.name[:60]:<60} ✗ skipped")
+                continue
+
+            param_names = list(endpoint_info["parameters"]["required"]) + list(endpoint_info["parameters"]["optional"])
+            if verbose:
+                print(f"[{i:3d}/{len(html_files)}] {html_file.name[:60]:<60} ✓ ({len(param_names)} params)")
+            endpoints.append(endpoint_info)
+            category_stats[endpoint_info["category"]] += 1
+            for param_name in param_names:
+                param_stats[param_name] += 1
+
+        return {
+            "version": "2.0.0",
+            "extracted_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "description": "Merged mapping of KIE API endpoints produced by the unified extraction engine",
+            "strategies": [strategy.name for strategy in self.strategies],
+            "total_endpoints": len(endpoints),
+            "categories": dict(category_stats),
+            "most_common_parameters": dict(sorted(param_stats.items(), key=lambda x: x[1], reverse=True)[:20]),
+            "endpoints": endpoints
+        }
+
+    def timing_report(self):
+        """Affiche le temps total et moyen de chaque étape et stratégie."""
+        print(f"{'='*70}")
+        print(f"{'Stage':<26}{'Calls':>8}{'Total (s)':>12}{'Avg (ms)':>12}{'Params':>10}")
+        print(f"{'='*70}")
+        for name in ['read', 'fields'] + [strategy.name for strategy in self.strategies]:
+            calls = self.calls.get(name, 0)
+            total = self.timings.get(name, 0.0)
+            avg = total / calls * 1000 if calls else 0.0
+            params = self.contributed.get(name, '') if name not in ('read', 'fields') else ''
+            print(f"{name:<26}{calls:>8}{total:>12.3f}{avg:>12.3f}{params:>10}")
+        print(f"{'='*70}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API unified extraction engine")
+    parser.add_argument('--strategies', default=None,
+                        help=f"stratégies à exécuter, séparées par des virgules (défaut : {','.join(STRATEGIES)})")
+    parser.add_argument('--regions', action='store_true',
+                        help="scanne le titre, l'article, le code et les tables au lieu des pages entières")
+    parser.add_argument('--docskie', type=Path, default=DOCSKIE_PATH,
+                        help="dossier des pages HTML de la documentation")
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE,
+                        help="fichier du mapping fusionné")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+    strategies = args.strategies.split(',') if args.strategies else None
+    unknown = [name for name in strategies or [] if name not in STRATEGIES]
+    if unknown:
+        print(f"✗ Unknown strategies: {', '.join(unknown)} (available: {', '.join(STRATEGIES)})")
+        return 1
+
+    html_files = sorted(args.docskie.rglob('*.html'))
+
+    print(f"{'='*70}")
+    print("KIE API Unified Extraction Engine")
+    print(f"{'='*70}")
+    print(f"Found {len(html_files)} HTML files")
+
+    engine = ExtractionEngine(strategies, args.regions)
+    print(f"Strategies: {', '.join(strategy.name for strategy in engine.strategies)}\n")
+
+    output = engine.run(html_files)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✓ {output['total_endpoints']} endpoints, categories: {output['categories']}")
+    print(f"✓ Output saved to: {args.output}\n")
+    engine.timing_report()
+
+if __name__ == "__main__":
+    exit(main() or 0)
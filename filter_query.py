@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Langage de filtres composés sur le catalogue des endpoints KIE API, avec un planificateur.
+
+    category = video and param = image_url and param = duration and credits < 100 sort by credits
+    (model ~ kling or model ~ hailuo) and not required = image_url limit 5
+    param.duration = number and method = POST
+
+Champs : category, capability, method, model (= exact, ~ sous-chaîne sans casse), param,
+required, optional (présence du paramètre), param.<nom> (type du paramètre), credits
+(pricing.credits : = != < <= > >=) et name (~ sous-chaîne, = exact). Opérateurs : = != ~ < <= > >=
+et "in (a, b)" ; and, or, not et parenthèses ; puis "sort by <champ> [asc|desc]" et "limit N".
+
+Chaque champ sauf name a un bitmap par valeur (endpoint_bitmaps.py), credits une liste triée.
+Pour un "and", le planificateur estime la taille de chaque index, part du plus sélectif,
+intersecte les autres dans l'ordre, retire les "not", et ne lit les endpoints qu'ensuite, pour
+les prédicats sans index (name) puis pour le résultat. explain() montre ce plan avec les tailles estimées et obtenues.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+from endpoint_bitmaps import BitmapIndex, bits, members, count
+
+INDEXED_FIELDS = ('category', 'capability', 'method', 'model', 'param', 'required', 'optional', 'credits')
+RECORD_FIELDS = ('name',)
+SORT_FIELDS = ('credits', 'name', 'category', 'capability', 'method')
+
+OPERATORS = {
+    'category': ('=', '!=', 'in'),
+    'capability': ('=', '!=', 'in'),
+    'method': ('=', '!=', 'in'),
+    'model': ('=', '!=', '~', 'in'),
+    'param': ('=', '!=', 'in'),
+    'required': ('=', '!=', 'in'),
+    'optional': ('=', '!=', 'in'),
+    'param.': ('=', '!=', 'in'),
+    'credits': ('=', '!=', '<', '<=', '>', '>=', 'in'),
+    'name': ('=', '!=', '~'),
+}
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)(?![\w./:-])
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op><=|>=|!=|=|<|>|~|\(|\)|,)
+      | (?P<word>[\w./:-]+)
+    )""", re.VERBOSE)
+
+class FilterError(ValueError):
+    """Expression de filtre invalide."""
+
+def tokenize(text):
+    """Liste de (genre, texte, position) ; genre : number, string, op, word."""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            raise FilterError(f"unexpected character {text[position:].lstrip()[:1]!r} at {position}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        tokens.append((kind, value, match.start(kind)))
+        position = match.end()
+    return tokens
+
+# --- Arbre de l'expression ---
+
+class Predicate:
+    def __init__(self, field, op, values, param=None):
+        self.field = field
+        self.op = op
+        self.values = values
+        self.param = param
+
+    @property
+    def indexed(self):
+        return self.field not in RECORD_FIELDS
+
+    def __str__(self):
+        field = f"param.{self.param}" if self.field == 'param.' else self.field
+        if self.op == 'in':
+            return f"{field} in ({', '.join(map(str, self.values))})"
+        return f"{field} {self.op} {self.values[0]}"
+
+class Not:
+    def __init__(self, item):
+        self.item = item
+
+    @property
+    def indexed(self):
+        return self.item.indexed
+
+    def __str__(self):
+        return f"not {_grouped(self.item)}"
+
+class And:
+    def __init__(self, items):
+        self.items = items
+
+    @property
+    def indexed(self):
+        return all(item.indexed for item in self.items)
+
+    def __str__(self):
+        return ' and '.join(_grouped(item) for item in self.items)
+
+class Or:
+    def __init__(self, items):
+        self.items = items
+
+    @property
+    def indexed(self):
+        return all(item.indexed for item in self.items)
+
+    def __str__(self):
+        return ' or '.join(_grouped(item) for item in self.items)
+
+def _grouped(node):
+    return f"({node})" if isinstance(node, (And, Or)) else str(node)
+
+class Query:
+    """Expression analysée : filtre (None = tout le catalogue), tri et limite."""
+
+    def __init__(self, where, sort=None, descending=False, limit=None):
+        self.where = where
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+
+# --- Analyse ---
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None, len(self.text))
+
+    def keyword(self, *words):
+        kind, value, _ = self.peek()
+        if kind == 'word' and value.lower() in words:
+            self.position += 1
+            return value.lower()
+        return None
+
+    def expect(self, kind, value=None):
+        token = self.peek()
+        if token[0] != kind or (value is not None and token[1] != value):
+            wanted = repr(value) if value is not None else kind
+            found = repr(token[1]) if token[0] else 'end of expression'
+            raise FilterError(f"expected {wanted} at {token[2]}, found {found}")
+        self.position += 1
+        return token
+
+    def parse(self):
+        where = None
+        if self.peek()[0] and not self._at_clause():
+            where = self.parse_or()
+        sort, descending, limit = None, False, None
+        if self.keyword('sort', 'order'):
+            self.keyword('by')
+            _, field, position = self.expect('word')
+            if field.lower() not in SORT_FIELDS:
+                raise FilterError(f"cannot sort by {field!r} at {position} (expected {', '.join(SORT_FIELDS)})")
+            sort = field.lower()
+            descending = self.keyword('asc', 'desc') == 'desc'
+        if self.keyword('limit'):
+            _, value, position = self.expect('number')
+            if not value.isdigit():
+                raise FilterError(f"limit must be a positive integer at {position}")
+            limit = int(value)
+        if self.peek()[0]:
+            _, value, position = self.peek()
+            raise FilterError(f"unexpected {value!r} at {position}")
+        return Query(where, sort, descending, limit)
+
+    def _at_clause(self):
+        kind, value, _ = self.peek()
+        return kind == 'word' and value.lower() in ('sort', 'order', 'limit')
+
+    def parse_or(self):
+        items = [self.parse_and()]
+        while self.keyword('or'):
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else Or(items)
+
+    def parse_and(self):
+        items = [self.parse_not()]
+        while self.keyword('and'):
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else And(items)
+
+    def parse_not(self):
+        if self.keyword('not'):
+            return Not(self.parse_not())
+        if self.peek()[:2] == ('op', '('):
+            self.position += 1
+            node = self.parse_or()
+            self.expect('op', ')')
+            return node
+        return self.parse_predicate()
+
+    def parse_predicate(self):
+        _, name, position = self.expect('word')
+        field, param = name.lower(), None
+        if field.startswith('param.'):
+            if len(name) == len('param.'):
+                raise FilterError(f"missing parameter name after 'param.' at {position}")
+            field, param = 'param.', name[len('param.'):]
+        if field not in OPERATORS:
+            raise FilterError(f"unknown field {name!r} at {position}")
+
+        kind, op, position = self.peek()
+        if kind == 'word' and op.lower() == 'in':
+            op = 'in'
+        elif kind != 'op' or op in '(),':
+            raise FilterError(f"expected an operator after {name!r} at {position}")
+        if op not in OPERATORS[field]:
+            raise FilterError(f"operator {op!r} is not supported for {name!r} at {position}")
+        self.position += 1
+
+        if op == 'in':
+            self.expect('op', '(')
+            values = [self.parse_value(field)]
+            while self.peek()[:2] == ('op', ','):
+                self.position += 1
+                values.append(self.parse_value(field))
+            self.expect('op', ')')
+        else:
+            values = [self.parse_value(field)]
+
+        if op == '!=':
+            return Not(Predicate(field, '=', values, param))
+        return Predicate(field, op, values, param)
+
+    def parse_value(self, field):
+        kind, value, position = self.peek()
+        if kind not in ('number', 'string', 'word'):
+            raise FilterError(f"expected a value at {position}")
+        self.position += 1
+        if field == 'credits':
+            if kind != 'number':
+                raise FilterError(f"credits must be compared to a number at {position}")
+            return float(value) if '.' in value else int(value)
+        return value
+
+def parse(text):
+    """Analyse une expression de filtre ; lève FilterError avec la position de l'erreur."""
+    return _Parser(text).parse()
+
+# --- Index et exécution ---
+
+def _credits(ep):
+    credits = (ep.get('pricing') or {}).get('credits')
+    return credits if isinstance(credits, (int, float)) and not isinstance(credits, bool) else None
+
+def _sort_value(value):
+    return None if value is None else str(value).lower()
+
+class FilterIndex:
+    """Index des champs filtrables d'une liste d'endpoints ; run() et explain() exécutent une expression."""
+
+    def __init__(self, endpoints, bitmaps=None):
+        self.endpoints = endpoints
+        # Bitmaps partagés avec l'index qui les a déjà construits (CatalogIndex du serveur)
+        self.bitmaps = bitmaps if bitmaps is not None else BitmapIndex(endpoints)
+        self.universe = self.bitmaps.all
+        credits = sorted((_credits(ep), i) for i, ep in enumerate(endpoints) if _credits(ep) is not None)
+        self.credit_keys = [value for value, _ in credits]
+        self.credit_ids = [i for _, i in credits]
+        self.credit_of = {i: value for value, i in credits}
+
+    # Prédicats : ids par l'index, taille estimée sans construire l'ensemble, test sur un endpoint
+
+    def _credit_range(self, op, value):
+        keys = self.credit_keys
+        return {
+            '=': (bisect_left(keys, value), bisect_right(keys, value)),
+            '<': (0, bisect_left(keys, value)),
+            '<=': (0, bisect_right(keys, value)),
+            '>': (bisect_right(keys, value), len(keys)),
+            '>=': (bisect_left(keys, value), len(keys)),
+        }[op]
+
+    def _key(self, pred, value):
+        if pred.field in ('category', 'capability'):
+            return value.lower()
+        if pred.field == 'method':
+            return value.upper()
+        if pred.field == 'param.':
+            return (pred.param, value.lower())
+        return value
+
+    def _bitmap_field(self, pred):
+        return 'param_type' if pred.field == 'param.' else pred.field
+
+    def _ids(self, pred):
+        """Bitmap des endpoints d'un prédicat indexé."""
+        if pred.field == 'credits':
+            ops = [('=', value) for value in pred.values] if pred.op == 'in' else [(pred.op, pred.values[0])]
+            ids = []
+            for op, value in ops:
+                start, end = self._credit_range(op, value)
+                ids.extend(self.credit_ids[start:end])
+            return bits(ids)
+        if pred.field == 'model' and pred.op == '~':
+            query = pred.values[0].lower()
+            return self.bitmaps.matching('model_lower', lambda model: query in model)
+        field = self._bitmap_field(pred)
+        return self.bitmaps.any_of(field, [self._key(pred, value) for value in pred.values])
+
+    def estimate(self, node):
+        """Taille estimée du résultat d'un nœud, calculée sans lire les endpoints."""
+        if isinstance(node, Predicate):
+            if not node.indexed:
+                return self.bitmaps.size
+            if node.field == 'credits':
+                ops = [('=', value) for value in node.values] if node.op == 'in' else [(node.op, node.values[0])]
+                return sum(end - start for start, end in (self._credit_range(op, value) for op, value in ops))
+            if node.field == 'model' and node.op == '~':
+                return count(self._ids(node))
+            field = self._bitmap_field(node)
+            return sum(self.bitmaps.count(field, self._key(node, value)) for value in node.values)
+        if isinstance(node, Not):
+            return self.bitmaps.size - self.estimate(node.item)
+        if isinstance(node, And):
+            return min(self.estimate(item) for item in node.items)
+        return min(self.bitmaps.size, sum(self.estimate(item) for item in node.items))
+
+    def matches(self, node, ep):
+        """Évalue un nœud sur un endpoint (prédicats sans index et vérification)."""
+        if isinstance(node, Not):
+            return not self.matches(node.item, ep)
+        if isinstance(node, And):
+            return all(self.matches(item, ep) for item in node.items)
+        if isinstance(node, Or):
+            return any(self.matches(item, ep) for item in node.items)
+        field, op, values = node.field, node.op, node.values
+        if field == 'name':
+            name = ep.get('name') or ''
+            return values[0].lower() in name.lower() if op == '~' else name == values[0]
+        if field == 'credits':
+            credits = _credits(ep)
+            if credits is None:
+                return False
+            if op == 'in':
+                return credits in values
+            return {'=': credits == values[0], '<': credits < values[0], '<=': credits <= values[0],
+                    '>': credits > values[0], '>=': credits >= values[0]}[op]
+        if field == 'model' and op == '~':
+            return any(values[0].lower() in model.lower() for model in ep.get('modelIds') or [])
+        if field == 'model':
+            return any(model in values for model in ep.get('modelIds') or [])
+        parameters = ep.get('parameters') or {}
+        if field in ('param', 'required', 'optional'):
+            groups = ('required', 'optional') if field == 'param' else (field,)
+            return any(value in parameters.get(group, {}) for group in groups for value in values)
+        if field == 'param.':
+            info = parameters.get('required', {}).get(node.param) or parameters.get('optional', {}).get(node.param)
+            ptype = info.get('type') if isinstance(info, dict) else None
+            return ptype is not None and str(ptype).lower() in [value.lower() for value in values]
+        value = ep.get(field)
+        if value is None:
+            return False
+        value = value.upper() if field == 'method' else str(value).lower()
+        return value in [self._key(node, v) for v in values]
+
+    def _scan(self, node, candidates, trace, depth):
+        candidates = members(candidates)
+        ids = [i for i in candidates if self.matches(node, self.endpoints[i])]
+        trace.append((depth, f"filter {node}", f"records, {len(candidates)} read", None, len(ids)))
+        return bits(ids)
+
+    def _eval(self, node, trace, depth=0):
+        """Bitmap des endpoints d'un nœud ; trace reçoit (profondeur, étape, accès, estimation, taille)."""
+        if not node.indexed and not isinstance(node, And):
+            return self._scan(node, self.universe, trace, depth)
+
+        if isinstance(node, Predicate):
+            ids = self._ids(node)
+            access = "credits (range)" if node.field == 'credits' else f"index {node.field.rstrip('.') or node.field}"
+            if node.field == 'param.':
+                access = "index param type"
+            trace.append((depth, str(node), access, self.estimate(node), count(ids)))
+            return ids
+
+        if isinstance(node, Not):
+            start = len(trace)
+            trace.append(None)
+            ids = self.universe ^ self._eval(node.item, trace, depth + 1)
+            trace[start] = (depth, "NOT", "complement", self.estimate(node), count(ids))
+            return ids
+
+        if isinstance(node, Or):
+            start = len(trace)
+            trace.append(None)
+            ids = 0
+            for item in node.items:
+                ids |= self._eval(item, trace, depth + 1)
+            trace[start] = (depth, "OR", "union", self.estimate(node), count(ids))
+            return ids
+
+        # AND : index positifs du plus sélectif au moins sélectif, puis les "not", puis les endpoints
+        start = len(trace)
+        trace.append(None)
+        positive = sorted((item for item in node.items if item.indexed and not isinstance(item, Not)),
+                          key=self.estimate)
+        negative = sorted((item for item in node.items if item.indexed and isinstance(item, Not)),
+                          key=lambda item: -self.estimate(item.item))
+        residual = [item for item in node.items if not item.indexed]
+
+        ids = None
+        for item in positive:
+            found = self._eval(item, trace, depth + 1)
+            ids = found if ids is None else ids & found
+            if not ids:
+                break
+        if ids is None:
+            ids = self.universe
+        for item in negative:
+            if not ids:
+                break
+            step = len(trace)
+            trace.append(None)
+            ids &= ~self._eval(item.item, trace, depth + 2)
+            trace[step] = (depth + 1, f"minus {_grouped(item.item)}", "difference", None, count(ids))
+        for item in residual:
+            if not ids:
+                break
+            ids = self._scan(item, ids, trace, depth + 1)
+        trace[start] = (depth, "AND", "intersect", self.estimate(node), count(ids))
+        return ids
+
+    def execute(self, query, trace=None):
+        """Ids du résultat d'une Query, triés et limités."""
+        trace = [] if trace is None else trace
+        ids = members(self.universe if query.where is None else self._eval(query.where, trace))
+
+        if query.sort:
+            # Les crédits viennent de leur index ; les autres champs des endpoints du résultat
+            if query.sort == 'credits':
+                key_of = self.credit_of.get
+            else:
+                key_of = lambda i: _sort_value(self.endpoints[i].get(query.sort))
+            keyed = [(key_of(i), i) for i in ids]
+            present = sorted(pair for pair in keyed if pair[0] is not None)
+            if query.descending:
+                present.sort(key=lambda pair: pair[0], reverse=True)
+            # Sans valeur (pas de prix, champ absent) : toujours à la fin, dans l'ordre du mapping
+            ordered = [i for _, i in present] + [i for key, i in keyed if key is None]
+        else:
+            ordered = ids
+
+        if query.limit is not None:
+            ordered = ordered[:query.limit]
+        return ordered
+
+    def run(self, expression):
+        """Endpoints qui satisfont l'expression, dans l'ordre demandé."""
+        return [self.endpoints[i] for i in self.execute(parse(expression))]
+
+    def explain(self, expression):
+        """Lignes décrivant le plan exécuté : étapes, accès, tailles estimées et obtenues."""
+        query = parse(expression)
+        trace = []
+        ordered = self.execute(query, trace)
+        lines = [f"{'='*70}", f"Filter: {expression}", f"{'='*70}",
+                 f"{'Step':<40}{'Access':<20}{'Est.':>6}{'Rows':>6}"]
+        if query.where is None:
+            lines.append(f"{'all endpoints':<40}{'-':<20}{self.bitmaps.size:>6}{self.bitmaps.size:>6}")
+        for depth, step, access, estimate, size in trace:
+            label = ('  ' * depth + step)[:39]
+            estimate = '' if estimate is None else estimate
+            size = '' if size is None else size
+            lines.append(f"{label:<40}{access[:19]:<20}{estimate:>6}{size:>6}")
+        if query.sort:
+            access = "credits index" if query.sort == 'credits' else "records"
+            lines.append(f"sort by {query.sort} {'desc' if query.descending else 'asc'} ({access})")
+        if query.limit is not None:
+            lines.append(f"limit {query.limit}")
+        lines.append(f"Endpoints read for the result: {len(ordered)} of {self.bitmaps.size}")
+        lines.append(f"{'='*70}")
+        return lines
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Nettoyeur HTML en une seule passe pour les extracteurs KIE API.
+Remplace les neuf re.sub successifs de clean_html par un seul scan, avec un résultat identique.
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+# Scripts, styles, balises et entités reconnus en un seul scan.
+# Le préfixe [<&] permet au moteur de sauter directement au prochain candidat, et les corps
+# de script/style sont parcourus sans backtracking (équivalent à ".*?</script>") : la boucle
+# déroulée [^<]*(?:<(?!/script>)[^<]*)* ne peut découper le corps que d'une seule façon, donc
+# pas besoin de quantificateurs possessifs (Python 3.11+ seulement) ni de groupes atomiques.
+# "&amp;lt;" et "&amp;gt;" sont décodés en "<" et ">" comme le faisaient les re.sub successifs.
+_MARKUP = re.compile(
+    r'[<&](?:'
+    r'(?<=<)(?:'
+    r'(?P<script>(?i:script[^>]*>[^<]*(?:<(?!/script>)[^<]*)*</script>))'
+    r'|(?P<style>(?i:style[^>]*>[^<]*(?:<(?!/style>)[^<]*)*</style>))'
+    r'|(?P<tag>[^>]+>))'
+    r'|(?<=&)(?P<entity>(?:nbsp|quot|amp(?:;[lg]t)?|lt|gt);)'
+    r')'
+)
+_SCRIPT_OPEN = re.compile(r'<script', re.IGNORECASE)
+
+_ENTITIES = {
+    '&nbsp;': ' ',
+    '&quot;': '"',
+    '&amp;': '&',
+    '&lt;': '<',
+    '&gt;': '>',
+    '&amp;lt;': '<',
+    '&amp;gt;': '>',
+}
+
+class _Ambiguous(Exception):
+    """Le texte contient du balisage imbriqué que seul l'ancien algorithme traite à l'identique."""
+
+def _replace_markup(match):
+    kind = match.lastgroup
+    if kind == 'entity':
+        return _ENTITIES[match.group()]
+
+    text = match.string
+    start = match.start()
+
+    # Une entité coupée par une balise ("&am<b></b>p;") n'est décodée qu'après suppression des balises
+    if text.find('&', max(0, start - 5), start) != -1:
+        raise _Ambiguous()
+    # Balise reformée après suppression d'un script ("<sty<script></script>le>")
+    if kind == 'tag' and text.find('<', start + 1, match.end()) != -1:
+        raise _Ambiguous()
+    # Script qui chevauche un bloc style : les scripts sont retirés en premier
+    if kind == 'style' and _SCRIPT_OPEN.search(text, start + 6, match.end()):
+        raise _Ambiguous()
+    return ''
+
+def clean_html_sequential(text, collapse_whitespace=True):
+    """Implémentation de référence : les re.sub successifs historiques."""
+    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'&nbsp;', ' ', text)
+    text = re.sub(r'&quot;', '"', text)
+    text = re.sub(r'&amp;', '&', text)
+    text = re.sub(r'&lt;', '<', text)
+    text = re.sub(r'&gt;', '>', text)
+    if collapse_whitespace:
+        text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+def clean_html(text, collapse_whitespace=True):
+    """Supprime scripts, styles et balises, décode les entités et normalise les espaces en un scan."""
+    if '<' in text or '&' in text:
+        try:
+            text = _MARKUP.sub(_replace_markup, text)
+        except _Ambiguous:
+            return clean_html_sequential(text, collapse_whitespace)
+
+    if collapse_whitespace:
+        # str.split() et \s reconnaissent exactement les mêmes caractères d'espacement
+        return ' '.join(text.split())
+    return text.strip()
+
+def _time_per_call(func, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    return (time.perf_counter() - start) / (repeat * len(items))
+
+def benchmark(html_files, repeat=20):
+    """Compare clean_html à l'implémentation séquentielle, par cellule de table et par page."""
+    pages = [Path(f).read_text(encoding='utf-8', errors='ignore') for f in html_files]
+    cells = [cell for page in pages
+             for cell in re.findall(r'<t[dh][^>]*>(.*?)</t[dh]>', page, re.DOTALL | re.IGNORECASE)]
+
+    mismatches = sum(1 for item in cells + pages if clean_html(item) != clean_html_sequential(item))
+
+    print(f"{'='*70}")
+    print(f"clean_html micro-benchmark ({len(pages)} pages, {len(cells)} cells)")
+    print(f"{'='*70}")
+    for label, items, n in [("Per cell", cells, repeat * 10), ("Per page", pages, repeat)]:
+        if not items:
+            continue
+        before = _time_per_call(clean_html_sequential, items, n)
+        after = _time_per_call(clean_html, items, n)
+        print(f"{label + ':':<14}{before * 1e6:10.2f} µs -> {after * 1e6:10.2f} µs  ({before / after:.2f}x)")
+    print(f"Mismatches:   {mismatches}")
+    print(f"{'='*70}")
+    return mismatches == 0
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python html_cleaner.py <file.html> [file.html ...]")
+        exit(1)
+    exit(0 if benchmark(sys.argv[1:]) else 1)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Scanner d'objets JSON en temps linéaire pour les extracteurs KIE API.
+Remplace les regex imbriquées (\\{[^}]*(?:\\{[^}]*\\}[^}]*)*\\}) qui backtrackent sur les gros bundles.
+
+Chaque scan avance une seule fois sur le texte en sautant d'un caractère structurel ({, } ou ")
+au suivant ; les chaînes sont parcourues par une regex sans ambiguïté (pas de backtracking).
+Les objets imbriqués sont résolus par le scan de leur parent et un scan ne dépasse jamais
+MAX_OBJECT_CHARS caractères : iter_parsed_objects est linéaire, find_marked_objects coûte au
+plus O(taille + marqueurs * MAX_OBJECT_CHARS). Un objet plus long que le plafond est ignoré.
+"""
+
+import re
+
+MAX_OBJECT_CHARS = 1 << 16
+
+# Marqueurs qui précèdent un exemple de requête (même ordre que les anciens request_patterns)
+REQUEST_MARKERS = [
+    r'Request Body',
+    r'Request Example',
+    r'Example Request',
+    r'Body Parameters',
+    r'"body":\s*(?=\{)',
+]
+
+_STRUCTURE = re.compile(r'[{}"]')
+_STRING_TAIL = re.compile(r'[^"\\]*+(?:\\.[^"\\]*+)*+"', re.DOTALL)
+
+class BraceScanner:
+    """Associe chaque '{' de content à son '}' fermant, en tenant compte des chaînes JSON."""
+
+    def __init__(self, content, max_object_chars=MAX_OBJECT_CHARS):
+        self.content = content
+        self.max_object_chars = max_object_chars
+        self._closing = {}
+
+    def scan(self, start):
+        """Scanne l'objet ouvert en start.
+
+        Retourne (close, stop, opened) : position du '}' fermant (-1 si l'objet n'est pas
+        fermé avant la fin du texte ou le plafond), position où le scan s'est arrêté, et
+        positions des '{' rencontrés hors chaînes, start compris.
+        """
+        content = self.content
+        limit = min(len(content), start + self.max_object_chars)
+        closing = self._closing
+        stack = []
+        opened = []
+        pos = start
+
+        while True:
+            m = _STRUCTURE.search(content, pos, limit)
+            if m is None:
+                pos = limit
+                break
+            i = m.start()
+            ch = content[i]
+
+            if ch == '"':
+                s = _STRING_TAIL.match(content, i + 1, limit)
+                if s is None:
+                    pos = limit
+                    break
+                pos = s.end()
+                continue
+
+            if ch == '{':
+                stack.append(i)
+                opened.append(i)
+            else:
+                # Les objets imbriqués déjà fermés n'auront plus besoin d'être scannés
+                closing[stack.pop()] = i
+                if not stack:
+                    return i, i + 1, opened
+            pos = i + 1
+
+        # Les objets encore ouverts ne se ferment pas avant la fin du texte (ou le plafond)
+        for i in stack:
+            closing[i] = -1
+        return -1, pos, opened
+
+    def match(self, start):
+        """Retourne la position du '}' qui ferme l'objet ouvert en start, ou -1."""
+        close = self._closing.get(start)
+        if close is None:
+            close = self.scan(start)[0]
+        return close
+
+def find_marked_objects(content, markers=REQUEST_MARKERS, flags=re.IGNORECASE):
+    """Retourne les objets JSON qui suivent chaque marqueur, groupés dans l'ordre des marqueurs.
+
+    Comme avec les anciennes regex, le bloc d'un marqueur commence au premier '{' qui le suit
+    et les marqueurs situés avant la fin du bloc précédent du même type sont ignorés.
+    Un objet non fermé est tronqué au premier '}', comme le faisaient les anciennes regex.
+    """
+    scanner = BraceScanner(content)
+    # Chaque marqueur est cherché séparément (préfixe littéral rapide), puis les positions sont fusionnées
+    hits = sorted((m.start(), m.end(), index)
+                  for index, marker in enumerate(markers)
+                  for m in re.finditer(marker, content, flags))
+
+    blocks = [[] for _ in markers]
+    resume_at = [0] * len(markers)
+    brace_from, next_brace = -1, -1
+
+    for start, end, index in hits:
+        if start < resume_at[index]:
+            continue
+
+        # Le premier '{' après end est déjà connu si end tombe entre brace_from et next_brace
+        if not brace_from <= end <= next_brace:
+            brace_from, next_brace = end, content.find('{', end)
+        if next_brace == -1:
+            continue
+
+        close = scanner.match(next_brace)
+        if close == -1:
+            close = content.find('}', next_brace)
+            if close == -1:
+                continue
+
+        blocks[index].append(content[next_brace:close + 1])
+        resume_at[index] = close + 1
+
+    return [block for group in blocks for block in group]
+
+def iter_parsed_objects(content, parse):
+    """Génère parse(bloc) pour chaque objet équilibré de content que parse accepte.
+
+    parse retourne None pour rejeter un bloc ; le scan descend alors dans ses objets
+    imbriqués au lieu de le sauter entièrement. Les '{' situés dans des chaînes ne sont
+    jamais pris comme début d'objet, et chaque caractère n'est scanné qu'une fois.
+    """
+    scanner = BraceScanner(content)
+    pos = content.find('{')
+    while pos != -1:
+        _, stop, opened = scanner.scan(pos)
+        accepted_until = -1
+        for start in opened:
+            if start < accepted_until:
+                continue
+            close = scanner.match(start)
+            if close == -1:
+                continue
+            parsed = parse(content[start:close + 1])
+            if parsed is not None:
+                yield parsed
+                accepted_until = close
+        pos = content.find('{', stop)
+
+def iter_nested_dicts(value):
+    """Génère les dictionnaires imbriqués dans value (sans value lui-même), en profondeur."""
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+    for child in children:
+        if isinstance(child, dict):
+            yield child
+        if isinstance(child, (dict, list)):
+            yield from iter_nested_dicts(child)
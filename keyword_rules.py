@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Règles de classification par mots-clés compilées une seule fois.
+Les chaînes if/elif de catégorisation re-mettent les champs en minuscules à chaque branche et
+testent chaque modèle avec any(...). Ici, les règles sont déclarées une fois puis mises à plat en
+listes de tests de mots-clés ; chaque champ est mis en minuscules et joint une seule fois, puis
+les règles sont parcourues dans l'ordre et la première vérifiée l'emporte, comme dans les chaînes.
+Un automate multi-motifs (KeywordMatcher) peut aussi reconnaître tous les mots-clés d'un champ
+en un seul parcours ; avec le moteur re de CPython il reste plus lent que les tests "in"
+(recherche de sous-chaîne en C) pour quelques dizaines de mots-clés, voir le benchmark.
+"""
+
+import re
+import sys
+import time
+import random
+
+# Séparateur des valeurs d'un champ multi-valué (modelIds) : aucun mot-clé ne le contient,
+# un mot-clé trouvé dans la jointure l'est donc dans l'une des valeurs
+VALUE_SEPARATOR = '\n'
+
+def _trie_pattern(keywords):
+    """Construit une regex en trie des mots-clés, qui reconnaît le plus long mot-clé à une position."""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        group = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Quantificateur glouton : la branche la plus longue est essayée d'abord
+        if terminal:
+            return f'(?:{group})?'
+        return group
+
+    return build(trie)
+
+class KeywordMatcher:
+    """Automate multi-motifs : retourne l'ensemble des mots-clés présents dans un texte.
+
+    Les mots-clés qui correspondent à une même position sont tous préfixes du texte à cette
+    position, donc préfixes du plus long d'entre eux : la regex en trie (dans un lookahead,
+    pour tester chaque position) trouve ce plus long mot-clé, et ses préfixes mots-clés sont
+    précalculés.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(keywords))
+        for keyword in self.keywords:
+            if not keyword or VALUE_SEPARATOR in keyword:
+                raise ValueError(f"invalid keyword: {keyword!r}")
+        self.regex = re.compile(f'(?=({_trie_pattern(self.keywords)}))')
+        self._prefixes = {
+            keyword: frozenset(k for k in self.keywords if keyword.startswith(k))
+            for keyword in self.keywords
+        }
+
+    def scan(self, text):
+        """Retourne l'ensemble des mots-clés contenus dans text."""
+        found = self.regex.findall(text)
+        if not found:
+            return frozenset()
+        prefixes = self._prefixes
+        return frozenset().union(*[prefixes[keyword] for keyword in set(found)])
+
+# Conditions des règles : des tuples évalués sur les mots-clés trouvés dans chaque champ
+
+def kw(field, keyword):
+    """Vrai si keyword apparaît dans le champ field."""
+    return ('kw', field, keyword)
+
+def any_of(*conditions):
+    return ('any',) + conditions
+
+def all_of(*conditions):
+    return ('all',) + conditions
+
+def not_(condition):
+    return ('not', condition)
+
+def _condition_keywords(condition):
+    if condition[0] == 'kw':
+        yield condition[1], condition[2]
+    elif condition[0] == 'not':
+        yield from _condition_keywords(condition[1])
+    else:
+        for sub in condition[1:]:
+            yield from _condition_keywords(sub)
+
+def _clauses(condition, field_index, negated=False):
+    """Met une condition sous forme "ou" de clauses "et" de tests (position du champ, mot, attendu).
+
+    Les "not" sont descendus jusqu'aux mots-clés (lois de De Morgan) : classify n'a plus qu'à
+    parcourir des listes, sans appel de fonction par condition.
+    """
+    op = condition[0]
+    if op == 'kw':
+        return [[(field_index[condition[1]], condition[2], not negated)]]
+    if op == 'not':
+        return _clauses(condition[1], field_index, not negated)
+    parts = [_clauses(sub, field_index, negated) for sub in condition[1:]]
+    if (op == 'any') != negated:
+        return [clause for part in parts for clause in part]
+    clauses = [[]]
+    for part in parts:
+        clauses = [clause + other for clause in clauses for other in part]
+    return clauses
+
+class RuleSet:
+    """Liste ordonnée de règles (résultat, condition) compilée pour des champs donnés.
+
+    classify parcourt les règles dans l'ordre et retourne le résultat de la première vérifiée.
+    Chaque champ est soit son texte (tests de sous-chaîne, mode par défaut), soit l'ensemble des
+    mots-clés qu'y a trouvé l'automate (automaton=True) : "mot in champ" a le même sens dans
+    les deux cas.
+    """
+
+    def __init__(self, fields, rules, default, automaton=False):
+        self.fields = list(fields)
+        self.rules = list(rules)
+        self.default = default
+        self.automaton = automaton
+
+        field_index = {field: i for i, field in enumerate(self.fields)}
+        keywords = {field: set() for field in self.fields}
+        for _, condition in self.rules:
+            for field, keyword in _condition_keywords(condition):
+                if field not in keywords:
+                    raise ValueError(f"unknown field {field!r} in rule for {keyword!r}")
+                keywords[field].add(keyword)
+        self.matchers = [KeywordMatcher(keywords[field]) if automaton and keywords[field] else None
+                         for field in self.fields]
+        self._compiled = [(result, _clauses(condition, field_index)) for result, condition in self.rules]
+
+    def scan(self, *texts):
+        """Retourne le tuple des mots-clés trouvés dans chaque champ (textes déjà en minuscules)."""
+        return tuple(matcher.scan(text) if matcher is not None else frozenset()
+                     for matcher, text in zip(self.matchers, texts))
+
+    def classify(self, *texts):
+        """Retourne le résultat de la première règle vérifiée, un texte (en minuscules) par champ."""
+        fields = self.scan(*texts) if self.automaton else texts
+        for result, clauses in self._compiled:
+            for clause in clauses:
+                for index, keyword, expected in clause:
+                    if (keyword in fields[index]) is not expected:
+                        break
+                else:
+                    return result
+        return self.default
+
+    def with_automaton(self):
+        """Même RuleSet, évalué sur les mots-clés trouvés par l'automate."""
+        return RuleSet(self.fields, self.rules, self.default, automaton=True)
+
+def join_values(values):
+    """Joint les valeurs d'un champ multi-valué pour un seul parcours."""
+    return VALUE_SEPARATOR.join(values)
+
+# Benchmark sur des endpoints synthétiques
+
+def _vocabulary(rule_sets):
+    words = set()
+    for rule_set in rule_sets:
+        for _, condition in rule_set.rules:
+            words.update(keyword for _, keyword in _condition_keywords(condition))
+    return sorted(words)
+
+def synthetic_endpoints(count, seed=0):
+    """Génère des endpoints aléatoires construits à partir des mots-clés des règles."""
+    from endpoint_categories import RULES
+
+    rng = random.Random(seed)
+    words = _vocabulary(RULES.rule_sets.values())
+    filler = ['api', 'v1', 'jobs', 'createTask', 'Generate', 'Model', 'docs', 'Pro', 'Fast', '2.1', 'x']
+
+    def text(max_words, sep):
+        parts = [rng.choice(words) if rng.random() < 0.5 else rng.choice(filler)
+                 for _ in range(rng.randint(0, max_words))]
+        value = sep.join(parts)
+        return value.title() if rng.random() < 0.3 else value
+
+    endpoints = []
+    for _ in range(count):
+        endpoints.append({
+            "name": text(5, ' '),
+            "endpoint": '/' + text(4, '/'),
+            "source_file": 'docskie/' + text(4, '/') + '.html',
+            "modelIds": [text(3, rng.choice(['/', '-'])) for _ in range(rng.randint(0, 3))],
+        })
+    return endpoints
+
+def _timed(func, items):
+    start = time.perf_counter()
+    results = [func(item) for item in items]
+    return results, time.perf_counter() - start
+
+def benchmark(count=100000):
+    """Compare les règles (tests de sous-chaîne) à l'automate sur count endpoints synthétiques.
+
+    Retourne le nombre de résultats différents entre les deux modes. Les résultats attendus des
+    règles sont vérifiés par tests/test_categorization.py.
+    """
+    from endpoint_categories import RULES, endpoint_fields
+
+    endpoints = synthetic_endpoints(count)
+    paths = [ep["source_file"] for ep in endpoints]
+    comparisons = [
+        ("endpoint_category", endpoints, endpoint_fields),
+        ("capability", endpoints, endpoint_fields),
+        ("file_category", paths, lambda path: (str(path).lower(),)),
+    ]
+
+    print(f"{'='*70}")
+    print(f"Keyword rules, substring tests vs automaton ({count:,} synthetic endpoints)")
+    print(f"{'='*70}")
+    failures = 0
+    for name, items, fields in comparisons:
+        rules = RULES[name]
+        automaton = rules.with_automaton()
+        # Règles seules, sans l'index exact de endpoint_categories
+        expected, rules_time = _timed(lambda item: rules.classify(*fields(item)), items)
+        actual, automaton_time = _timed(lambda item: automaton.classify(*fields(item)), items)
+        mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+        failures += len(mismatches)
+        status = "✓ identical" if not mismatches else f"✗ {len(mismatches)} mismatches"
+        print(f"{name}")
+        print(f"  substring tests:    {rules_time:7.3f}s")
+        print(f"  with automaton:     {automaton_time:7.3f}s ({rules_time / automaton_time:.2f}x)  {status}")
+        for i in mismatches[:5]:
+            print(f"    {items[i]!r}: {expected[i]} != {actual[i]}")
+    print(f"{'='*70}")
+    return failures
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    exit(1 if benchmark(count) else 0)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Index de recherche précalculé du mapping des endpoints KIE API.
+Écrit à côté du mapping (api-endpoints-index.json), il donne l'index de l'endpoint d'un
+modelId exact, d'un modelId en minuscules et les endpoints d'un chemin d'API, sans parcourir
+la liste. Les modelIds portés par plusieurs endpoints sont signalés : le routeur garde le
+premier, comme le faisait sa recherche linéaire.
+"""
+
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '-index.json'
+MAPPING_FILE = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+
+def index_path(mapping_file):
+    """api-endpoints-mapping.json -> api-endpoints-index.json, dans le même dossier."""
+    mapping_file = Path(mapping_file)
+    stem = mapping_file.stem[:-len('-mapping')] if mapping_file.stem.endswith('-mapping') else mapping_file.stem
+    return mapping_file.with_name(stem + INDEX_SUFFIX)
+
+def endpoints_digest(endpoints):
+    """Empreinte des (endpoint, modelIds) indexés : un index périmé ne correspond plus au mapping."""
+    keys = [[ep.get('endpoint'), list(ep.get('modelIds') or [])] for ep in endpoints]
+    return hashlib.sha256(json.dumps(keys, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def build_lookup_index(endpoints):
+    """Construit l'index d'une liste d'endpoints.
+
+    model_ids et model_ids_lower donnent le premier endpoint qui porte l'identifiant ;
+    duplicates liste tous les endpoints des identifiants (exacts ou en minuscules) partagés.
+    """
+    model_ids = {}
+    model_ids_lower = {}
+    paths = {}
+    owners = {}
+    owners_lower = {}
+    spellings = {}
+
+    for i, ep in enumerate(endpoints):
+        for model_id in ep.get('modelIds') or []:
+            model_ids.setdefault(model_id, i)
+            model_ids_lower.setdefault(model_id.lower(), i)
+            owners.setdefault(model_id, []).append(i)
+            owners_lower.setdefault(model_id.lower(), []).append(i)
+            spellings.setdefault(model_id.lower(), set()).add(model_id)
+        if ep.get('endpoint'):
+            paths.setdefault(ep['endpoint'], []).append(i)
+
+    def shared(table):
+        # Un même endpoint peut répéter un identifiant : seuls les endpoints distincts comptent
+        return {key: sorted(set(indices)) for key, indices in sorted(table.items()) if len(set(indices)) > 1}
+
+    return {
+        "version": INDEX_VERSION,
+        "endpoint_count": len(endpoints),
+        "endpoints_sha256": endpoints_digest(endpoints),
+        "model_ids": model_ids,
+        "model_ids_lower": model_ids_lower,
+        "paths": paths,
+        "duplicates": {
+            "model_ids": shared(owners),
+            # Identifiants distincts qui ne diffèrent que par la casse, sur des endpoints différents
+            "model_ids_lower": {key: indices for key, indices in shared(owners_lower).items()
+                                if len(spellings[key]) > 1},
+        },
+    }
+
+def write_lookup_index(mapping_file, endpoints):
+    """Écrit l'index à côté du mapping et le retourne."""
+    index = build_lookup_index(endpoints)
+    with open(index_path(mapping_file), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    return index
+
+def load_lookup_index(mapping_file, endpoints=None):
+    """Charge l'index d'un mapping, ou None s'il manque ou ne correspond plus aux endpoints."""
+    path = index_path(mapping_file)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get("version") != INDEX_VERSION:
+        return None
+    if endpoints is not None and (index["endpoint_count"] != len(endpoints)
+                                  or index["endpoints_sha256"] != endpoints_digest(endpoints)):
+        return None
+    return index
+
+def find_endpoint(index, model_id):
+    """Index de l'endpoint d'un modelId : correspondance exacte, puis en minuscules ; None sinon."""
+    found = index["model_ids"].get(model_id)
+    if found is None:
+        found = index["model_ids_lower"].get(model_id.lower())
+    return found
+
+def print_duplicates(index, endpoints):
+    """Affiche les modelIds portés par plusieurs endpoints et celui que le routeur choisit."""
+    duplicates = index["duplicates"]
+    print(f"{'='*70}")
+    print(f"Model IDs on several endpoints: {len(duplicates['model_ids'])}")
+    print(f"{'='*70}")
+    for model_id, indices in duplicates["model_ids"].items():
+        print(f"  {model_id}")
+        for i in indices:
+            mark = '→' if i == index["model_ids"][model_id] else ' '
+            print(f"    {mark} #{i:<4} {endpoints[i].get('name')} ({endpoints[i].get('endpoint')})")
+    if duplicates["model_ids_lower"]:
+        print(f"\nModel IDs that differ only by case: {len(duplicates['model_ids_lower'])}")
+        for key, indices in duplicates["model_ids_lower"].items():
+            variants = sorted({m for i in indices for m in endpoints[i].get('modelIds') or [] if m.lower() == key})
+            print(f"  {', '.join(variants)} -> endpoints {indices}")
+    print(f"{'='*70}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API model ID / path lookup index")
+    parser.add_argument('mapping', nargs='?', type=Path, default=MAPPING_FILE,
+                        help="mapping JSON indexé (l'index est écrit à côté)")
+    parser.add_argument('--check', action='store_true',
+                        help="vérifie que l'index existant correspond au mapping sans le réécrire")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+    with open(args.mapping, 'r', encoding='utf-8') as f:
+        endpoints = json.load(f).get('endpoints', [])
+
+    if args.check:
+        if load_lookup_index(args.mapping, endpoints) is None:
+            print(f"✗ {index_path(args.mapping)} is missing or stale")
+            return 1
+        print(f"✓ {index_path(args.mapping)} matches {args.mapping}")
+        return 0
+
+    index = write_lookup_index(args.mapping, endpoints)
+    print(f"✓ {len(index['model_ids'])} model IDs, {len(index['paths'])} paths -> {index_path(args.mapping)}")
+    print_duplicates(index, endpoints)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Disposition normalisée du mapping enrichi des endpoints KIE API.
+En disposition "full", by_category et by_capability contiennent des copies complètes des
+endpoints, ce qui triple la taille du fichier. En disposition "indexed", ces groupes ne
+contiennent que les index des endpoints dans la liste "endpoints" ; load_mapping() les
+réhydrate à la demande, groupe par groupe.
+"""
+
+import json
+import time
+from collections.abc import Mapping
+
+LAYOUT_FULL = 'full'
+LAYOUT_INDEXED = 'indexed'
+LAYOUTS = (LAYOUT_FULL, LAYOUT_INDEXED)
+
+# Groupes du mapping enrichi et champ de l'endpoint qui les définit
+GROUPS = {
+    'by_category': 'category',
+    'by_capability': 'capability',
+}
+
+def group_indices(endpoints, field):
+    """Retourne {valeur: [index des endpoints]} pour un champ, dans l'ordre des endpoints."""
+    groups = {}
+    for i, ep in enumerate(endpoints):
+        groups.setdefault(ep[field], []).append(i)
+    return groups
+
+def build_groups(endpoints, layout=LAYOUT_FULL):
+    """Groupes by_category et by_capability dans la disposition demandée."""
+    groups = {}
+    for name, field in GROUPS.items():
+        indices = group_indices(endpoints, field)
+        if layout == LAYOUT_INDEXED:
+            groups[name] = indices
+        else:
+            groups[name] = {value: [endpoints[i] for i in group] for value, group in indices.items()}
+    return groups
+
+def layout_of(data):
+    """Disposition d'un mapping chargé (les anciens fichiers sans marqueur sont "full")."""
+    return data.get('metadata', {}).get('layout', LAYOUT_FULL)
+
+def convert(data, layout):
+    """Retourne une copie superficielle du mapping dans la disposition demandée."""
+    converted = dict(data)
+    # Seule la disposition "indexed" est marquée : un fichier "full" reste identique à l'ancien format
+    metadata = {key: value for key, value in data.get('metadata', {}).items() if key != 'layout'}
+    if layout == LAYOUT_INDEXED:
+        metadata['layout'] = LAYOUT_INDEXED
+    converted['metadata'] = metadata
+    converted.update(build_groups(data['endpoints'], layout))
+    return converted
+
+class LazyGroups(Mapping):
+    """Groupes d'endpoints réhydratés à la première lecture de chaque groupe."""
+
+    def __init__(self, endpoints, indices):
+        self._endpoints = endpoints
+        self._indices = indices
+        self._cache = {}
+
+    def __getitem__(self, key):
+        group = self._cache.get(key)
+        if group is None:
+            endpoints = self._endpoints
+            group = self._cache[key] = [endpoints[i] for i in self._indices[key]]
+        return group
+
+    def __iter__(self):
+        return iter(self._indices)
+
+    def __len__(self):
+        return len(self._indices)
+
+    def count(self, key):
+        """Taille d'un groupe, sans le réhydrater."""
+        return len(self._indices[key])
+
+def rehydrate(data):
+    """Remplace les groupes d'index d'un mapping "indexed" par des LazyGroups (en place)."""
+    if layout_of(data) == LAYOUT_INDEXED:
+        for name in GROUPS:
+            if name in data:
+                data[name] = LazyGroups(data['endpoints'], data[name])
+    return data
+
+def load_mapping(path):
+    """Charge un mapping dans l'une ou l'autre disposition ; les groupes se lisent de la même façon."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return rehydrate(json.load(f))
+
+def serialize(data):
+    """Sérialise un mapping comme enhance_api_mapping_v2 l'écrit."""
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+def _best_of(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def layout_report(data, repeat=5):
+    """Mesure, pour chaque disposition, la taille du fichier, le temps de parsing et de réhydratation."""
+    rows = []
+    for layout in LAYOUTS:
+        text = serialize(convert(data, layout))
+        parse_time = _best_of(lambda: json.loads(text), repeat)
+        # Réhydratation et lecture de tous les groupes, sur un mapping fraîchement parsé à chaque fois
+        parsed = iter([json.loads(text) for _ in range(repeat)])
+
+        def read_groups():
+            loaded = rehydrate(next(parsed))
+            return [loaded[name][key] for name in GROUPS for key in loaded[name]]
+
+        load_all = _best_of(read_groups, repeat)
+        rows.append({
+            "layout": layout,
+            "bytes": len(text.encode('utf-8')),
+            "parse_seconds": parse_time,
+            "groups_seconds": load_all,
+        })
+    return rows
+
+def print_layout_report(rows):
+    """Affiche le rapport de layout_report, comparé à la disposition "full"."""
+    base = rows[0]
+    print(f"{'='*60}")
+    print(f"{'Layout':<10}{'Size (KB)':>12}{'Parse (ms)':>13}{'Groups (ms)':>13}{'vs full':>10}")
+    for row in rows:
+        print(f"{row['layout']:<10}{row['bytes'] / 1024:>12.1f}{row['parse_seconds'] * 1000:>13.2f}"
+              f"{row['groups_seconds'] * 1000:>13.3f}{row['bytes'] / base['bytes']:>9.2f}x")
+    print(f"{'='*60}")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Accès aux pages docskie partagé par les extracteurs KIE API.
+Chaque fichier est projeté en mémoire (mmap) une seule fois : les scanners d'octets travaillent
+directement sur la projection, et seul ce qui doit être analysé comme du texte est décodé.
+Les très grosses pages peuvent être parcourues par morceaux qui se chevauchent.
+"""
+
+import os
+import mmap
+from collections import namedtuple
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 20
+CHUNK_OVERLAP = 1 << 12
+
+# text : texte décodé du morceau (avec son chevauchement)
+# start, end : bornes, dans text, de la zone propre au morceau (hors chevauchement)
+# offset : position en octets du début de text dans le fichier
+Chunk = namedtuple('Chunk', ['offset', 'text', 'start', 'end'])
+
+def _translate_newlines(text):
+    """Même traduction des fins de ligne qu'un open() en mode texte."""
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+class Page:
+    """Fichier HTML projeté en mémoire.
+
+    data est un objet bytes-like (mmap) sans copie : find(), les regex bytes et les tranches
+    fonctionnent directement dessus. Utiliser de préférence open_page() dans un with.
+    Si data est fourni (octets déjà lus, par exemple par le lecteur de pipeline.py), le fichier
+    n'est pas ouvert.
+    """
+
+    def __init__(self, path, data=None):
+        self.path = Path(path)
+        self._file = None
+        self._map = None
+        self._text = None
+        if data is not None:
+            self.data = data
+            self.size = len(data)
+            return
+
+        self._file = open(self.path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        self.data = self._map if self._map is not None else b''
+        self.size = size
+
+    def has(self, needle):
+        """Indique si la page contient la séquence d'octets needle."""
+        return self.data.find(needle) != -1
+
+    def decode(self, start=0, end=None, errors='strict'):
+        """Décode une tranche d'octets en texte."""
+        end = self.size if end is None else end
+        return _translate_newlines(self.data[start:end].decode('utf-8', errors=errors))
+
+    def text(self, errors='strict'):
+        """Texte complet de la page, décodé une seule fois."""
+        if self._text is None or self._text[0] != errors:
+            self._text = (errors, self.decode(errors=errors))
+        return self._text[1]
+
+    def _align(self, pos):
+        """Recule pos jusqu'à une frontière de caractère UTF-8 qui ne coupe pas un \\r\\n."""
+        data = self.data
+        while 0 < pos < self.size and data[pos] & 0xC0 == 0x80:
+            pos -= 1
+        if 0 < pos < self.size and data[pos - 1] == 0x0D and data[pos] == 0x0A:
+            pos -= 1
+        return pos
+
+    def iter_chunks(self, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP, errors='strict'):
+        """Génère les morceaux (Chunk) de la page, avec overlap octets de contexte de chaque côté.
+
+        Chaque position du fichier appartient à la zone propre d'un seul morceau : un scanner
+        ne garde que les correspondances qui commencent dans [start, end) pour ne rien compter
+        deux fois. Une correspondance plus longue que overlap peut être tronquée en fin de morceau.
+        """
+        pos = 0
+        while pos < self.size:
+            own_end = self._align(min(self.size, pos + chunk_size))
+            if own_end <= pos:
+                # Morceau plus petit qu'un caractère : on avance jusqu'à la frontière suivante
+                own_end = pos + 1
+                while own_end < self.size and (self.data[own_end] & 0xC0 == 0x80 or
+                                               self.data[own_end - 1:own_end + 1] == b'\r\n'):
+                    own_end += 1
+            lead = self._align(max(0, pos - overlap))
+            tail = self._align(min(self.size, own_end + overlap))
+
+            before = self.decode(lead, pos, errors)
+            own = self.decode(pos, own_end, errors)
+            after = self.decode(own_end, tail, errors)
+            yield Chunk(lead, before + own + after, len(before), len(before) + len(own))
+            pos = own_end
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.data = b''
+        self._text = None
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_page(path, data=None):
+    """Ouvre une page (à utiliser dans un with), ou enveloppe ses octets déjà lus."""
+    return Page(path, data)
+
+def read_text(path, errors='strict', data=None):
+    """Lit et décode une page entière, comme open(path, encoding='utf-8').read()."""
+    with open_page(path, data) as page:
+        return page.text(errors)
+
+def read_bytes(path):
+    """Lit les octets d'une page avec un read() classique.
+
+    Contrairement aux défauts de page d'une projection mmap, l'appel système read() libère le
+    GIL : un thread lecteur peut charger les pages pendant que d'autres threads les analysent.
+    """
+    with open(path, 'rb') as f:
+        return f.read()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Localisation rapide des régions utiles d'une page docskie (titre, article, code/pre, tables).
+Les pages Mintlify sont surtout composées de bundles JavaScript et de payloads self.__next_f :
+les extracteurs n'ont besoin de scanner que ces régions, trouvées par simple bytes.find.
+"""
+
+import sys
+from pathlib import Path
+
+import page_access
+
+API_HOST = b'api.kie.ai'
+
+# Ancres du corps de l'article, par ordre de préférence (balise ouvrante, balise fermante)
+ARTICLE_ANCHORS = [
+    (b'<article', b'</article>'),
+    (b'<main', b'</main>'),
+    (b'id="content-area"', b'<footer'),
+    (b'<body', b'</body>'),
+]
+
+# Blocs repérés dans toute la page, même hors de l'article
+BLOCK_ANCHORS = [
+    (b'<pre', b'</pre>'),
+    (b'<code', b'</code>'),
+    (b'<table', b'</table>'),
+]
+
+def has_api_reference(data):
+    """Préfiltre : une page sans référence à api.kie.ai ne contient aucun endpoint."""
+    # find() plutôt que "in" : data peut être une projection mmap
+    return data.find(API_HOST) != -1
+
+def _find_block(data, open_tag, close_tag, start=0):
+    """Retourne (début, fin) du prochain bloc open_tag...close_tag, ou None."""
+    begin = data.find(open_tag, start)
+    if begin == -1:
+        return None
+    end = data.find(close_tag, begin + len(open_tag))
+    if end == -1:
+        return None
+    return begin, end + len(close_tag)
+
+def _article_regions(data):
+    """Retourne le corps de l'article, découpé autour des blocs <script> qu'il contient."""
+    for open_tag, close_tag in ARTICLE_ANCHORS:
+        article = _find_block(data, open_tag, close_tag)
+        if article is None:
+            continue
+
+        regions = []
+        pos, end = article
+        while pos < end:
+            script = _find_block(data, b'<script', b'</script>', pos)
+            if script is None or script[0] >= end:
+                regions.append((pos, end))
+                break
+            if script[0] > pos:
+                regions.append((pos, script[0]))
+            pos = script[1]
+        return regions
+    return []
+
+def locate_regions(data):
+    """Retourne les régions (début, fin) utiles de la page, triées et fusionnées."""
+    regions = []
+
+    title = _find_block(data, b'<title', b'</title>')
+    if title:
+        regions.append(title)
+
+    regions.extend(_article_regions(data))
+
+    for open_tag, close_tag in BLOCK_ANCHORS:
+        pos = 0
+        while True:
+            block = _find_block(data, open_tag, close_tag, pos)
+            if block is None:
+                break
+            regions.append(block)
+            pos = block[1]
+
+    regions.sort()
+    merged = []
+    for start, end in regions:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def regions_text(data, regions=None):
+    """Décode et concatène les régions utiles de la page."""
+    if regions is None:
+        regions = locate_regions(data)
+    return '\n'.join(data[start:end].decode('utf-8', errors='ignore') for start, end in regions)
+
+def read_page_regions(html_file):
+    """Lit une page et retourne le texte de ses régions utiles, ou None si elle ne cite pas api.kie.ai."""
+    with page_access.open_page(html_file) as page:
+        if not has_api_reference(page.data):
+            return None
+        return regions_text(page.data)
+
+def report(html_files):
+    """Affiche, pour chaque page, les octets scannés avant et après localisation des régions."""
+    total_before = total_after = skipped = 0
+
+    print(f"{'='*70}")
+    print("Bytes scanned per file (full page -> regions)")
+    print(f"{'='*70}")
+    for html_file in html_files:
+        with page_access.open_page(html_file) as page:
+            before = page.size
+            if has_api_reference(page.data):
+                after = sum(end - start for start, end in locate_regions(page.data))
+            else:
+                after = 0
+                skipped += 1
+        total_before += before
+        total_after += after
+        ratio = after / before * 100 if before else 0.0
+        print(f"{Path(html_file).name[:44]:<44} {before:>10,} -> {after:>9,} ({ratio:5.1f}%)")
+
+    count = len(html_files) or 1
+    print(f"{'='*70}")
+    print(f"Files:                        {len(html_files)}")
+    print(f"Skipped by prefilter:         {skipped}")
+    print(f"Average bytes before:         {total_before // count:,}")
+    print(f"Average bytes after:          {total_after // count:,}")
+    if total_before:
+        print(f"Reduction:                    {100 - total_after / total_before * 100:.1f}%")
+    print(f"{'='*70}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python page_regions.py <docskie_dir | file.html ...>")
+        exit(1)
+    paths = [Path(arg) for arg in sys.argv[1:]]
+    files = [f for p in paths for f in (sorted(p.rglob('*.html')) if p.is_dir() else [p])]
+    report(files)
@@ -11,6 +11,64 @@ from pathlib import Path
 from bs4 import BeautifulSoup
 from datetime import datetime
 
+def extract_soup_table_params(soup):
+    """Extrait les paramètres des tables HTML, dans l'ordre : [(nom, info, requis)]."""
+    table_params = []
+    tables = soup.find_all('table')
+    for table in tables:
+        rows = table.find_all('tr')
+        for row in rows[1:]:  # Skip header
+            cells = row.find_all(['td', 'th'])
+            if len(cells) >= 2:
+                param_name = cells[0].get_text().strip()
+                if not param_name or param_name.lower() in ['parameter', 'name', 'field']:
+                    continue
+
+                param_info = {
+                    "type": "string",
+                    "description": "",
+                    "options": [],
+                    "default": None
+                }
+
+                # Type
+                if len(cells) > 1:
+                    type_text = cells[1].get_text().strip().lower()
+                    if 'string' in type_text:
+                        param_info["type"] = "string"
+                    elif 'number' in type_text or 'integer' in type_text or 'int' in type_text:
+                        param_info["type"] = "number"
+                    elif 'boolean' in type_text or 'bool' in type_text:
+                        param_info["type"] = "boolean"
+                    elif 'array' in type_text or 'list' in type_text:
+                        param_info["type"] = "array"
+                    elif 'object' in type_text:
+                        param_info["type"] = "object"
+
+                # Description
+                if len(cells) > 2:
+                    param_info["description"] = cells[2].get_text().strip()
+
+                # Required/Optional
+                is_required = False
+                if len(cells) > 3:
+                    req_text = cells[3].get_text().strip().lower()
+                    is_required = 'yes' in req_text or 'required' in req_text or 'true' in req_text
+                else:
+                    # Chercher "required" dans la description
+                    full_text = ' '.join([c.get_text() for c in cells]).lower()
+                    is_required = 'required' in full_text and 'optional' not in full_text
+
+                # Default value
+                if len(cells) > 4:
+                    default_text = cells[4].get_text().strip()
+                    if default_text and default_text.lower() not in ['none', 'null', '-', '']:
+                        param_info["default"] = default_text
+
+                table_params.append((param_name, param_info, is_required))
+
+    return table_params
+
 def extract_endpoint_info(html_file):
     """Extrait les informations d'endpoint depuis un fichier HTML."""
     try:
@@ -146,62 +204,12 @@ def extract_endpoint_info(html_file):
 
         # Extraire les paramètres depuis les tables ou les blocs de code JSON
         # Chercher les tables de paramètres
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows[1:]:  # Skip header
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 2:
-                    param_name = cells[0].get_text().strip()
-                    if not param_name or param_name.lower() in ['parameter', 'name', 'field']:
-                        continue
-
-                    param_info = {
-                        "type": "string",
-                        "description": "",
-                        "options": [],
-                        "default": None
-                    }
-
-                    # Type
-                    if len(cells) > 1:
-                        type_text = cells[1].get_text().strip().lower()
-                        if 'string' in type_text:
-                            param_info["type"] = "string"
-                        elif 'number' in type_text or 'integer' in type_text or 'int' in type_text:
-                            param_info["type"] = "number"
-                        elif 'boolean' in type_text or 'bool' in type_text:
-                            param_info["type"] = "boolean"
-                        elif 'array' in type_text or 'list' in type_text:
-                            param_info["type"] = "array"
-                        elif 'object' in type_text:
-                            param_info["type"] = "object"
-
-                    # Description
-                    if len(cells) > 2:
-                        param_info["description"] = cells[2].get_text().strip()
-
-                    # Required/Optional
-                    is_required = False
-                    if len(cells) > 3:
-                        req_text = cells[3].get_text().strip().lower()
-                        is_required = 'yes' in req_text or 'required' in req_text or 'true' in req_text
-                    else:
-                        # Chercher "required" dans la description
-                        full_text = ' '.join([c.get_text() for c in cells]).lower()
-                        is_required = 'required' in full_text and 'optional' not in full_text
-
-                    # Default value
-                    if len(cells) > 4:
-                        default_text = cells[4].get_text().strip()
-                        if default_text and default_text.lower() not in ['none', 'null', '-', '']:
-                            param_info["default"] = default_text
-
-                    # Ajouter le paramètre
-                    if is_required:
-                        endpoint_info["parameters"]["required"][param_name] = param_info
-                    else:
-                        endpoint_info["parameters"]["optional"][param_name] = param_info
+        for param_name, param_info, is_required in extract_soup_table_params(soup):
+            # Ajouter le paramètre
+            if is_required:
+                endpoint_info["parameters"]["required"][param_name] = param_info
+            else:
+                endpoint_info["parameters"]["optional"][param_name] = param_info
 
         # Extraire les paramètres depuis les blocs JSON
         json_patterns = [
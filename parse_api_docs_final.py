@@ -7,9 +7,32 @@ Version finale avec filtrage du bruit et extraction précise des vrais paramètr
 import os
 import json
 import re
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 
+import endpoint_categories
+import extract_real_params
+import html_cleaner
+import json_scanner
+import keyword_rules
+import page_access
+import page_regions
+import pipeline
+import stage_timing
+import table_parser
+import token_scanner
+from extraction_cache import open_cache
+
+DOCSKIE_PATH = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie')
+OUTPUT_FILE = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+
+# Résultat d'une page écartée par le préfiltre (sans api.kie.ai) ; None reste réservé aux erreurs
+SKIPPED_PAGE = {"skipped": True}
+
 # Paramètres JavaScript à ignorer (bruit du site web)
 NOISE_PARAMS = {
     'true', 'false', 'dark', 'light', 'children', 'id', 'name', 'location_startswith',
@@ -19,20 +42,22 @@ NOISE_PARAMS = {
     'defaultValue', 'defaultChecked', 'disabled', 'readOnly', 'required'
 }
 
+# Motifs de l'endpoint, lus par le token scanner (kind, pattern, flags, premiers caractères)
+ENDPOINT_TOKEN_SPECS = [
+    ('url', r'https://api\.kie\.ai(/api/v\d+/[a-zA-Z0-9/_-]+)', 0, 'h'),
+    ('method', r'--request\s+(POST|GET)|"(POST|GET)"', re.IGNORECASE, r'"\-'),
+    ('model', r'"model"\s*:\s*"([a-zA-Z0-9/_-]+)"', 0, '"'),
+    ('credit', r'(\d+)\s*credits?', re.IGNORECASE, '0-9'),
+    ('curl', r'curl\s+--request\s+\w+\s+https://api\.kie\.ai[^\n]{50,500}', re.IGNORECASE, 'cC'),
+]
+ENDPOINT_TOKENS = token_scanner.TokenScanner(ENDPOINT_TOKEN_SPECS, overlapping=['method'])
+
 def clean_html(text):
     """Nettoie les balises HTML d'un texte."""
     if not text:
         return ""
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<[^>]+>', '', text)
-    text = re.sub(r'&nbsp;', ' ', text)
-    text = re.sub(r'&quot;', '"', text)
-    text = re.sub(r'&amp;', '&', text)
-    text = re.sub(r'&lt;', '<', text)
-    text = re.sub(r'&gt;', '>', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    with stage_timing.span('clean_html'):
+        return html_cleaner.clean_html(text)
 
 def is_valid_api_param(param_name):
     """Vérifie si un nom de paramètre est valide pour une API."""
@@ -47,26 +72,24 @@ def is_valid_api_param(param_name):
             return False
     return True
 
+def json_param_type(value):
+    """Retourne le type de paramètre correspondant à une valeur JSON."""
+    if isinstance(value, bool):
+        return "boolean"
+    elif isinstance(value, int) or isinstance(value, float):
+        return "number"
+    elif isinstance(value, list):
+        return "array"
+    elif isinstance(value, dict):
+        return "object"
+    return "string"
+
 def extract_request_params(content):
     """Extrait les paramètres de requête depuis les exemples de code."""
     params = {}
 
-    # Chercher les blocs de code JSON (Request Body, Request Example, etc.)
-    json_blocks = []
-
-    # Pattern pour trouver les sections de requêtes
-    request_patterns = [
-        r'Request Body[^{]*(\{[^}]*(?:\{[^}]*\}[^}]*)*\})',
-        r'Request Example[^{]*(\{[^}]*(?:\{[^}]*\}[^}]*)*\})',
-        r'Example Request[^{]*(\{[^}]*(?:\{[^}]*\}[^}]*)*\})',
-        r'Body Parameters[^{]*(\{[^}]*(?:\{[^}]*\}[^}]*)*\})',
-        r'"body":\s*(\{[^}]*(?:\{[^}]*\}[^}]*)*\})',
-    ]
-
-    for pattern in request_patterns:
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
-        for match in matches:
-            json_blocks.append(match.group(1))
+    # Blocs JSON qui suivent Request Body, Request Example, "body": ... (toutes profondeurs)
+    json_blocks = json_scanner.find_marked_objects(content)
 
     # Parser les blocs JSON
     for json_block in json_blocks:
@@ -79,22 +102,23 @@ def extract_request_params(content):
             if isinstance(json_obj, dict):
                 for key, value in json_obj.items():
                     if is_valid_api_param(key):
-                        param_type = "string"
-                        if isinstance(value, bool):
-                            param_type = "boolean"
-                        elif isinstance(value, int) or isinstance(value, float):
-                            param_type = "number"
-                        elif isinstance(value, list):
-                            param_type = "array"
-                        elif isinstance(value, dict):
-                            param_type = "object"
-
                         params[key] = {
-                            "type": param_type,
+                            "type": json_param_type(value),
                             "description": "",
                             "default": None,
                             "example": value if not isinstance(value, (dict, list)) else None
                         }
+
+                # Paramètres imbriqués (ex: "input": {"prompt": ...}) sans écraser ceux du premier niveau
+                for nested in json_scanner.iter_nested_dicts(json_obj):
+                    for key, value in nested.items():
+                        if is_valid_api_param(key) and key not in params:
+                            params[key] = {
+                                "type": json_param_type(value),
+                                "description": "",
+                                "default": None,
+                                "example": value if not isinstance(value, (dict, list)) else None
+                            }
         except Exception as e:
             # Essayer une approche plus simple avec regex
             param_matches = re.finditer(r'"([a-zA-Z_][a-zA-Z0-9_]*)"\s*:\s*("(?:[^"\\]|\\.)*"|true|false|null|\d+\.?\d*|\[.*?\])', json_block)
@@ -129,263 +153,345 @@ def extract_request_params(content):
 
     return params
 
+def table_columns(headers):
+    """Retourne les index des colonnes (nom, type, description, requis, défaut) d'une table."""
+    name_idx = -1
+    type_idx = -1
+    desc_idx = -1
+    required_idx = -1
+    default_idx = -1
+
+    for i, header in enumerate(header.lower() for header in headers):
+        if 'name' in header or 'parameter' in header or 'field' in header:
+            name_idx = i
+        elif 'type' in header:
+            type_idx = i
+        elif 'description' in header or 'desc' in header:
+            desc_idx = i
+        elif 'required' in header or 'optional' in header:
+            required_idx = i
+        elif 'default' in header:
+            default_idx = i
+
+    return name_idx, type_idx, desc_idx, required_idx, default_idx
+
 def extract_table_params(content):
-    """Extrait les paramètres depuis les tables HTML."""
+    """Extrait les paramètres depuis les tables HTML (une seule passe, ligne par ligne)."""
     params = {}
+    headers = columns = None
 
-    # Trouver les tables
-    table_pattern = r'<table[^>]*>(.*?)</table>'
-    tables = re.finditer(table_pattern, content, re.DOTALL | re.IGNORECASE)
-
-    for table_match in tables:
-        table_content = table_match.group(1)
-
-        # Extraire les lignes
-        rows = re.findall(r'<tr[^>]*>(.*?)</tr>', table_content, re.DOTALL | re.IGNORECASE)
-
-        # Analyser les headers pour comprendre la structure
-        if not rows:
+    for row in table_parser.iter_table_rows(content):
+        # La ligne 0 de chaque table porte les en-têtes
+        if row.index == 0:
             continue
 
-        header_row = rows[0]
-        headers = [clean_html(cell).lower() for cell in re.findall(r'<th[^>]*>(.*?)</th>', header_row, re.DOTALL | re.IGNORECASE)]
-
-        # Si pas de headers, essayer avec des td
-        if not headers:
-            headers = [clean_html(cell).lower() for cell in re.findall(r'<td[^>]*>(.*?)</td>', header_row, re.DOTALL | re.IGNORECASE)]
-
-        # Trouver les index des colonnes importantes
-        name_idx = -1
-        type_idx = -1
-        desc_idx = -1
-        required_idx = -1
-        default_idx = -1
-
-        for i, header in enumerate(headers):
-            if 'name' in header or 'parameter' in header or 'field' in header:
-                name_idx = i
-            elif 'type' in header:
-                type_idx = i
-            elif 'description' in header or 'desc' in header:
-                desc_idx = i
-            elif 'required' in header or 'optional' in header:
-                required_idx = i
-            elif 'default' in header:
-                default_idx = i
+        if row.headers is not headers:
+            headers = row.headers
+            columns = table_columns(headers)
+        name_idx, type_idx, desc_idx, required_idx, default_idx = columns
 
         # Traiter les lignes de données
-        for row in rows[1:]:
-            cells = [clean_html(cell) for cell in re.findall(r'<t[dh][^>]*>(.*?)</t[dh]>', row, re.DOTALL | re.IGNORECASE)]
-
-            if len(cells) < 2:
-                continue
-
-            # Extraire le nom du paramètre
-            param_name = cells[name_idx] if name_idx >= 0 and name_idx < len(cells) else cells[0]
-            param_name = param_name.strip()
+        cells = row.cells
+        if len(cells) < 2:
+            continue
 
-            if not is_valid_api_param(param_name):
-                continue
+        # Extraire le nom du paramètre
+        param_name = cells[name_idx] if name_idx >= 0 and name_idx < len(cells) else cells[0]
+        param_name = param_name.strip()
 
-            # Type
-            param_type = "string"
-            if type_idx >= 0 and type_idx < len(cells):
-                type_text = cells[type_idx].lower()
-                if 'string' in type_text:
-                    param_type = "string"
-                elif 'number' in type_text or 'integer' in type_text or 'int' in type_text or 'float' in type_text:
-                    param_type = "number"
-                elif 'boolean' in type_text or 'bool' in type_text:
-                    param_type = "boolean"
-                elif 'array' in type_text or 'list' in type_text or '[]' in type_text:
-                    param_type = "array"
-                elif 'object' in type_text or '{}' in type_text:
-                    param_type = "object"
-
-            # Description
-            description = ""
-            if desc_idx >= 0 and desc_idx < len(cells):
-                description = cells[desc_idx]
-
-            # Required
-            is_required = False
-            if required_idx >= 0 and required_idx < len(cells):
-                req_text = cells[required_idx].lower()
-                is_required = 'yes' in req_text or 'required' in req_text or 'true' in req_text
-
-            # Default
-            default_value = None
-            if default_idx >= 0 and default_idx < len(cells):
-                default_text = cells[default_idx]
-                if default_text and default_text.lower() not in ['none', 'null', '-', '', 'n/a']:
-                    default_value = default_text
-
-            params[param_name] = {
-                "info": {
-                    "type": param_type,
-                    "description": description,
-                    "default": default_value,
-                    "example": None
-                },
-                "required": is_required
-            }
+        if not is_valid_api_param(param_name):
+            continue
 
-    return params
+        # Type
+        param_type = "string"
+        if type_idx >= 0 and type_idx < len(cells):
+            type_text = cells[type_idx].lower()
+            if 'string' in type_text:
+                param_type = "string"
+            elif 'number' in type_text or 'integer' in type_text or 'int' in type_text or 'float' in type_text:
+                param_type = "number"
+            elif 'boolean' in type_text or 'bool' in type_text:
+                param_type = "boolean"
+            elif 'array' in type_text or 'list' in type_text or '[]' in type_text:
+                param_type = "array"
+            elif 'object' in type_text or '{}' in type_text:
+                param_type = "object"
 
-def extract_endpoint_info(html_file):
-    """Extrait les informations d'endpoint avec filtrage du bruit."""
-    try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        endpoint_info = {
-            "file": str(html_file),
-            "category": None,
-            "name": None,
-            "endpoint": None,
-            "full_url": None,
-            "method": None,
-            "description": None,
-            "modelIds": [],
-            "parameters": {
-                "required": {},
-                "optional": {}
-            },
-            "pricing": {
-                "credits": None,
-                "notes": None
+        # Description
+        description = ""
+        if desc_idx >= 0 and desc_idx < len(cells):
+            description = cells[desc_idx]
+
+        # Required
+        is_required = False
+        if required_idx >= 0 and required_idx < len(cells):
+            req_text = cells[required_idx].lower()
+            is_required = 'yes' in req_text or 'required' in req_text or 'true' in req_text
+
+        # Default
+        default_value = None
+        if default_idx >= 0 and default_idx < len(cells):
+            default_text = cells[default_idx]
+            if default_text and default_text.lower() not in ['none', 'null', '-', '', 'n/a']:
+                default_value = default_text
+
+        params[param_name] = {
+            "info": {
+                "type": param_type,
+                "description": description,
+                "default": default_value,
+                "example": None
             },
-            "examples": []
+            "required": is_required
         }
 
-        # Titre
-        title_match = re.search(r'<title[^>]*>(.*?)</title>', content, re.IGNORECASE | re.DOTALL)
-        if title_match:
-            title = clean_html(title_match.group(1))
-            endpoint_info["name"] = title.replace(' - KIE API', '').replace('KIE API', '').strip()
-
-        # Catégorie
-        file_path_lower = str(html_file).lower()
-        if 'suno' in file_path_lower or '/music' in file_path_lower or 'elevenlabs' in file_path_lower:
-            endpoint_info["category"] = "audio"
-        elif 'runway' in file_path_lower or 'luma' in file_path_lower or 'veo' in file_path_lower or 'kling' in file_path_lower or 'wan' in file_path_lower or 'sora' in file_path_lower or 'hailuo' in file_path_lower or 'bytedance' in file_path_lower or 'infinitalk' in file_path_lower or '/video' in file_path_lower:
-            endpoint_info["category"] = "video"
-        elif '4oimage' in file_path_lower or 'flux' in file_path_lower or 'grok' in file_path_lower or 'ideogram' in file_path_lower or 'seedream' in file_path_lower or 'recraft' in file_path_lower or 'qwen' in file_path_lower or 'topaz' in file_path_lower or '/image' in file_path_lower:
-            endpoint_info["category"] = "image"
-        elif 'claude' in file_path_lower or 'gemini' in file_path_lower or '/chat' in file_path_lower:
-            endpoint_info["category"] = "chat"
-        else:
-            endpoint_info["category"] = "other"
-
-        # URLs d'API (chercher seulement les vraies URLs d'API)
-        api_url_pattern = r'https://api\.kie\.ai(/api/v\d+/[a-zA-Z0-9/_-]+)'
-        api_urls = re.findall(api_url_pattern, content)
-
-        if api_urls:
-            # Filtrer et prendre la première URL valide
-            for url_path in api_urls:
-                # Ignorer les URLs génériques
-                if not any(skip in url_path for skip in ['record-info', 'example', 'test']):
-                    endpoint_info["endpoint"] = url_path
-                    endpoint_info["full_url"] = f"https://api.kie.ai{url_path}"
-                    break
-
-        # Méthode HTTP
-        if re.search(r'--request\s+POST|"POST"|method.*POST', content, re.IGNORECASE):
-            endpoint_info["method"] = "POST"
-        elif re.search(r'--request\s+GET|"GET"|method.*GET', content, re.IGNORECASE):
-            endpoint_info["method"] = "GET"
-        else:
-            endpoint_info["method"] = "POST"  # Par défaut
-
-        # Modèles
-        model_pattern = r'"model"\s*:\s*"([a-zA-Z0-9/_-]+)"'
-        models = re.findall(model_pattern, content)
-        endpoint_info["modelIds"] = sorted(list(set(models)))
+    return params
 
-        # Paramètres depuis les tables
-        table_params = extract_table_params(content)
+# Paramètres supposés requis quand seul un exemple de requête les mentionne
+REQUIRED_GUESS = ['prompt', 'model', 'modelId', 'text', 'image', 'input']
+
+def read_page_content(html_file, regions_only=False, data=None):
+    """Lit le contenu à scanner d'une page, ou None si elle ne cite pas api.kie.ai.
+
+    Avec regions_only, seules les régions utiles de la page (titre, article, code, tables)
+    sont retournées au lieu des bundles JavaScript complets. data contient les octets de la
+    page s'ils ont déjà été lus.
+    """
+    with page_access.open_page(html_file, data) as page:
+        # Préfiltre sur les octets : une page sans api.kie.ai n'est jamais décodée
+        if not page_regions.has_api_reference(page.data):
+            content = None
+        elif regions_only:
+            content = page_regions.regions_text(page.data)
+        else:
+            content = page.text()
 
-        # Paramètres depuis les exemples
-        request_params = extract_request_params(content)
+    # Préfiltre : sans référence à api.kie.ai, aucun endpoint ne peut être trouvé
+    if content is None or 'api.kie.ai' not in content:
+        return None
+    return content
+
+def extract_endpoint_fields(html_file, content):
+    """Extrait titre, catégorie, URL, méthode, modèles, pricing, description et exemples.
+
+    Les paramètres restent vides : ils sont remplis par fill_parameters.
+    """
+    endpoint_info = {
+        "file": str(html_file),
+        "category": None,
+        "name": None,
+        "endpoint": None,
+        "full_url": None,
+        "method": None,
+        "description": None,
+        "modelIds": [],
+        "parameters": {
+            "required": {},
+            "optional": {}
+        },
+        "pricing": {
+            "credits": None,
+            "notes": None
+        },
+        "examples": []
+    }
 
-        # Fusionner (priorité aux tables)
-        all_params = {}
-        for param_name, param_data in table_params.items():
-            all_params[param_name] = param_data
+    # Titre
+    title_match = re.search(r'<title[^>]*>(.*?)</title>', content, re.IGNORECASE | re.DOTALL)
+    if title_match:
+        title = clean_html(title_match.group(1))
+        endpoint_info["name"] = title.replace(' - KIE API', '').replace('KIE API', '').strip()
+
+    # Catégorie (mêmes règles que extract_real_params, chemin parcouru une seule fois)
+    endpoint_info["category"] = extract_real_params.categorize_file(html_file)
+
+    # URLs, méthodes, modèles, crédits et exemples curl en tokens typés
+    with stage_timing.span('endpoint_tokens'):
+        tokens = ENDPOINT_TOKENS.collect(content)
+    stage_timing.count_tokens(tokens)
+
+    # URLs d'API (chercher seulement les vraies URLs d'API)
+    api_urls = token_scanner.values(content, tokens['url'])
+
+    if api_urls:
+        # Filtrer et prendre la première URL valide
+        for url_path in api_urls:
+            # Ignorer les URLs génériques
+            if not any(skip in url_path for skip in ['record-info', 'example', 'test']):
+                endpoint_info["endpoint"] = url_path
+                endpoint_info["full_url"] = f"https://api.kie.ai{url_path}"
+                break
+
+    # Méthode HTTP
+    methods = {(t.groups[0] or t.groups[1]).upper() for t in tokens['method']}
+    if 'POST' in methods or re.search(r'method.*POST', content, re.IGNORECASE):
+        endpoint_info["method"] = "POST"
+    elif 'GET' in methods or re.search(r'method.*GET', content, re.IGNORECASE):
+        endpoint_info["method"] = "GET"
+    else:
+        endpoint_info["method"] = "POST"  # Par défaut
+
+    # Modèles
+    models = token_scanner.values(content, tokens['model'])
+    endpoint_info["modelIds"] = sorted(list(set(models)))
+
+    # Pricing
+    credit_matches = token_scanner.values(content, tokens['credit'])
+    valid_credits = [int(c) for c in credit_matches if 1 <= int(c) <= 10000]
+    if valid_credits:
+        endpoint_info["pricing"]["credits"] = min(valid_credits)
+
+    # Description
+    desc_patterns = [
+        r'<h1[^>]*>(.*?)</h1>.*?<p[^>]*>(.*?)</p>',
+        r'<h2[^>]*>(?:Description|Overview)</h2>\s*<p[^>]*>(.*?)</p>',
+    ]
+    for pattern in desc_patterns:
+        with stage_timing.span('description'):
+            match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
+        if match:
+            desc = clean_html(match.group(1) if match.lastindex == 1 else match.group(2))
+            if desc and len(desc) > 20 and len(desc) < 500:
+                endpoint_info["description"] = desc
+                break
+
+    # Exemples curl
+    curl_examples = token_scanner.values(content, tokens['curl'])
+    endpoint_info["examples"] = [clean_html(ex)[:500] for ex in curl_examples[:2]]
+
+    return endpoint_info
+
+def guess_required(request_params):
+    """Convertit les paramètres d'un exemple de requête au format {"info", "required"}."""
+    return {
+        param_name: {
+            "info": param_info,
+            "required": param_name in REQUIRED_GUESS
+        }
+        for param_name, param_info in request_params.items()
+    }
 
-        for param_name, param_info in request_params.items():
+def merge_params(*param_sets):
+    """Fusionne des dicts {nom: {"info", "required"}} ; le premier qui définit un nom l'emporte."""
+    all_params = {}
+    for params in param_sets:
+        for param_name, param_data in params.items():
             if param_name not in all_params:
-                # Deviner si requis
-                is_required = param_name in ['prompt', 'model', 'modelId', 'text', 'image', 'input']
-                all_params[param_name] = {
-                    "info": param_info,
-                    "required": is_required
-                }
-
-        # Remplir les paramètres finaux
-        for param_name, param_data in all_params.items():
-            if param_data["required"]:
-                endpoint_info["parameters"]["required"][param_name] = param_data["info"]
-            else:
-                endpoint_info["parameters"]["optional"][param_name] = param_data["info"]
-
-        # Pricing
-        credit_matches = re.findall(r'(\d+)\s*credits?', content, re.IGNORECASE)
-        valid_credits = [int(c) for c in credit_matches if 1 <= int(c) <= 10000]
-        if valid_credits:
-            endpoint_info["pricing"]["credits"] = min(valid_credits)
-
-        # Description
-        desc_patterns = [
-            r'<h1[^>]*>(.*?)</h1>.*?<p[^>]*>(.*?)</p>',
-            r'<h2[^>]*>(?:Description|Overview)</h2>\s*<p[^>]*>(.*?)</p>',
-        ]
-        for pattern in desc_patterns:
-            match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-            if match:
-                desc = clean_html(match.group(1) if match.lastindex == 1 else match.group(2))
-                if desc and len(desc) > 20 and len(desc) < 500:
-                    endpoint_info["description"] = desc
-                    break
+                all_params[param_name] = param_data
+    return all_params
+
+def fill_parameters(endpoint_info, all_params):
+    """Range les paramètres fusionnés dans required/optional."""
+    for param_name, param_data in all_params.items():
+        if param_data["required"]:
+            endpoint_info["parameters"]["required"][param_name] = param_data["info"]
+        else:
+            endpoint_info["parameters"]["optional"][param_name] = param_data["info"]
 
-        # Exemples curl
-        curl_pattern = r'curl\s+--request\s+\w+\s+https://api\.kie\.ai[^\n]{50,500}'
-        curl_examples = re.findall(curl_pattern, content, re.IGNORECASE)
-        endpoint_info["examples"] = [clean_html(ex)[:500] for ex in curl_examples[:2]]
+def extract_endpoint_info(html_file, regions_only=False, data=None):
+    """Extrait les informations d'endpoint avec filtrage du bruit.
 
-        return endpoint_info
+    Avec regions_only, seules les régions utiles de la page (titre, article, code, tables)
+    sont scannées au lieu des bundles JavaScript complets. Retourne SKIPPED_PAGE pour une page
+    sans api.kie.ai et None en cas d'erreur.
+    """
+    try:
+        with stage_timing.page(html_file, None if data is None else len(data)):
+            with stage_timing.span('read'):
+                content = read_page_content(html_file, regions_only, data)
+            if content is None:
+                return SKIPPED_PAGE
+
+            with stage_timing.span('fields'):
+                endpoint_info = extract_endpoint_fields(html_file, content)
+
+            # Paramètres depuis les tables, puis depuis les exemples (priorité aux tables)
+            with stage_timing.span('table_params'):
+                table_params = extract_table_params(content)
+            with stage_timing.span('request_params'):
+                request_params = extract_request_params(content)
+            fill_parameters(endpoint_info, merge_params(table_params, guess_required(request_params)))
+            stage_timing.count('table_param', len(table_params))
+            stage_timing.count('request_param', len(request_params))
+
+            return endpoint_info
 
     except Exception as e:
         print(f"Error: {html_file.name}: {e}")
         return None
 
-def main():
-    """Fonction principale."""
-    docskie_path = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie')
-    html_files = list(docskie_path.rglob('*.html'))
-
-    print(f"{'='*70}")
-    print(f"KIE API Documentation Parser - Final Version")
-    print(f"{'='*70}")
-    print(f"Found {len(html_files)} HTML files\n")
-
+def extract_page_bytes(html_file, data, regions_only=False):
+    """Étape d'analyse du pipeline : extrait l'endpoint d'une page déjà lue."""
+    return extract_endpoint_info(html_file, regions_only, data)
+
+def iter_extractions(html_files, workers=1, regions_only=False, runner=None):
+    """Génère (fichier, endpoint_info) dans l'ordre de html_files.
+
+    En série, via un pool de processus, ou via runner (pipeline.Pipeline) qui lit les pages
+    pendant que les workers analysent les précédentes.
+    """
+    if runner is not None:
+        for result in runner.run(html_files):
+            if result.error is not None:
+                print(f"Error: {result.item.name}: {result.error}")
+            yield result.item, result.value
+        return
+
+    extract = partial(extract_endpoint_info, regions_only=regions_only)
+    if workers <= 1:
+        for html_file in html_files:
+            yield html_file, extract(html_file)
+        return
+
+    # pool.map conserve l'ordre d'entrée : la sortie reste identique au mode série
+    chunksize = max(1, len(html_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(extract, html_files, chunksize=chunksize)
+        for html_file, endpoint_info in zip(html_files, results):
+            yield html_file, endpoint_info
+
+def iter_cached_extractions(html_files, cache, workers=1, regions_only=False, runner=None):
+    """Comme iter_extractions, mais ne parse que les fichiers nouveaux ou modifiés."""
+    lookups = [(html_file,) + cache.lookup(html_file) for html_file in html_files]
+    pending = [html_file for html_file, _, found, _ in lookups if not found]
+    fresh = iter_extractions(pending, workers, regions_only, runner)
+
+    for html_file, digest, found, endpoint_info in lookups:
+        if not found:
+            _, endpoint_info = next(fresh)
+            # Les erreurs de lecture ne sont pas mises en cache ; les pages écartées (SKIPPED_PAGE) le sont
+            if endpoint_info is not None:
+                cache.store(html_file, digest, endpoint_info)
+        yield html_file, endpoint_info
+
+def collect_endpoints(html_files, workers=1, verbose=True, cache=None, regions_only=False, runner=None):
+    """Extrait tous les endpoints et retourne (endpoints, skipped)."""
     endpoints = []
     skipped = 0
 
-    for i, html_file in enumerate(html_files, 1):
-        print(f"[{i:3d}/{len(html_files)}] {html_file.name[:60]:<60}", end=" ")
-        endpoint_info = extract_endpoint_info(html_file)
+    if cache is not None:
+        extractions = iter_cached_extractions(html_files, cache, workers, regions_only, runner)
+    else:
+        extractions = iter_extractions(html_files, workers, regions_only, runner)
+
+    for i, (html_file, endpoint_info) in enumerate(extractions, 1):
+        if verbose:
+            print(f"[{i:3d}/{len(html_files)}] {html_file.name[:60]:<60}", end=" ")
 
-        if endpoint_info and endpoint_info["endpoint"]:
+        if endpoint_info and endpoint_info.get("endpoint"):
             param_count = len(endpoint_info["parameters"]["required"]) + len(endpoint_info["parameters"]["optional"])
-            print(f"✓ ({param_count} params)")
+            if verbose:
+                print(f"✓ ({param_count} params)")
             endpoints.append(endpoint_info)
         else:
-            print("✗ skipped")
+            if verbose:
+                print("✗ skipped")
             skipped += 1
 
-    # Créer le JSON final
+    return endpoints, skipped
+
+def build_output(endpoints):
+    """Construit le JSON final avec les statistiques par catégorie."""
     output = {
         "version": "1.0.0",
         "extracted_date": datetime.now().strftime("%Y-%m-%d"),
@@ -395,25 +501,138 @@ def main():
         "endpoints": endpoints
     }
 
-    # Statistiques
     for endpoint in endpoints:
         cat = endpoint.get("category", "other")
         output["categories"][cat] = output["categories"].get(cat, 0) + 1
 
+    return output
+
+def serialize_output(output):
+    """Sérialise le mapping exactement comme il est écrit sur disque."""
+    return json.dumps(output, indent=2, ensure_ascii=False)
+
+def compare_modes(html_files, workers, regions_only=False):
+    """Exécute les modes série et parallèle, vérifie la sortie et affiche le speedup."""
+    start = time.perf_counter()
+    serial_endpoints, serial_skipped = collect_endpoints(html_files, workers=1, verbose=False,
+                                                         regions_only=regions_only)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel_endpoints, parallel_skipped = collect_endpoints(html_files, workers=workers, verbose=False,
+                                                             regions_only=regions_only)
+    parallel_time = time.perf_counter() - start
+
+    identical = (serialize_output(build_output(serial_endpoints)) == serialize_output(build_output(parallel_endpoints))
+                 and serial_skipped == parallel_skipped)
+
+    print(f"{'='*70}")
+    print(f"Serial vs parallel extraction ({len(html_files)} files)")
+    print(f"{'='*70}")
+    print(f"{'Serial (1 worker):':<30}{serial_time:.2f}s")
+    print(f"{f'Parallel ({workers} workers):':<30}{parallel_time:.2f}s")
+    print(f"Speedup:                      {serial_time / parallel_time if parallel_time else 0:.2f}x")
+    print(f"Identical output:             {'yes' if identical else 'NO'}")
+    print(f"{'='*70}\n")
+
+    return identical
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API Documentation Parser - Final Version")
+    parser.add_argument('--docskie', type=Path, default=DOCSKIE_PATH,
+                        help="dossier des pages HTML de la documentation")
+    parser.add_argument('--output', type=Path, default=OUTPUT_FILE,
+                        help="fichier du mapping généré")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="nombre de processus d'extraction (1 = série, 0 = tous les CPU)")
+    parser.add_argument('--compare', action='store_true',
+                        help="exécute aussi le mode série et affiche le speedup")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore le cache d'extraction et re-parse toutes les pages")
+    parser.add_argument('--regions', action='store_true',
+                        help="ne scanne que le titre, l'article, les blocs de code et les tables")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="lit les pages dans un thread pendant que les workers analysent les précédentes")
+    parser.add_argument('--queue-depth', type=int, default=pipeline.QUEUE_DEPTH,
+                        help="pages lues d'avance par le pipeline")
+    parser.add_argument('--timing-report', type=Path, metavar='FILE',
+                        help="écrit le temps de chaque étape et les pages les plus lentes dans FILE (JSON) ; "
+                             "les pages en cache ne sont pas analysées, à combiner avec --no-cache")
+    parser.add_argument('--timing-top', type=int, default=stage_timing.TOP_PAGES, metavar='N',
+                        help="nombre de pages les plus lentes listées dans le rapport de timing")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if args.timing_report and workers > 1 and not args.pipeline:
+        # Les mesures sont enregistrées dans ce processus : pas de pool de processus
+        print(f"Timing report: {workers} workers -> 1 (serial extraction)")
+        workers = 1
+
+    html_files = list(args.docskie.rglob('*.html'))
+
+    print(f"{'='*70}")
+    print(f"KIE API Documentation Parser - Final Version")
+    print(f"{'='*70}")
+    print(f"Found {len(html_files)} HTML files")
+    print(f"Workers: {workers}\n")
+
+    if args.compare:
+        if not compare_modes(html_files, max(workers, 2), args.regions):
+            print("✗ Parallel output differs from serial output")
+            return 1
+
+    cache = None
+    if not args.no_cache:
+        # Le mode régions produit d'autres résultats : il a son propre cache
+        cache_name = 'parse_api_docs_final-regions' if args.regions else 'parse_api_docs_final'
+        cache = open_cache(cache_name, __file__, endpoint_categories.__file__, endpoint_categories.RULES_FILE,
+                           extract_real_params.__file__, html_cleaner.__file__, json_scanner.__file__,
+                           keyword_rules.__file__, page_access.__file__, page_regions.__file__,
+                           table_parser.__file__, token_scanner.__file__)
+    if args.timing_report:
+        # Activé après --compare : seules les pages de l'extraction principale sont mesurées
+        stage_timing.enable()
+    runner = None
+    if args.pipeline:
+        runner = pipeline.Pipeline(partial(extract_page_bytes, regions_only=args.regions), workers=workers,
+                                   queue_depth=args.queue_depth,
+                                   processes=workers > 1 and not args.timing_report)
+    endpoints, skipped = collect_endpoints(html_files, workers, cache=cache, regions_only=args.regions,
+                                           runner=runner)
+    if cache is not None:
+        cache.prune(html_files)
+        cache.save()
+    if runner is not None:
+        print()
+        runner.report()
+    if args.timing_report:
+        print()
+        stage_timing.print_summary(stage_timing.write_report(args.timing_report, args.timing_top))
+        print(f"Timing report saved to: {args.timing_report}")
+
+    # Créer le JSON final
+    output = build_output(endpoints)
+
     total_params = sum(len(e["parameters"]["required"]) + len(e["parameters"]["optional"]) for e in endpoints)
     endpoints_with_models = sum(1 for e in endpoints if e["modelIds"])
     endpoints_with_pricing = sum(1 for e in endpoints if e["pricing"]["credits"])
 
     # Sauvegarder
-    output_file = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+    output_file = args.output
     with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+        f.write(serialize_output(output))
 
     print(f"\n{'='*70}")
     print(f"✓ Extraction complete!")
     print(f"{'='*70}")
     print(f"Total endpoints extracted:    {len(endpoints)}")
     print(f"Files skipped:                {skipped}")
+    if cache is not None:
+        print(f"Extraction cache:             {cache.summary()}")
     print(f"Total parameters extracted:   {total_params}")
     print(f"Endpoints with models:        {endpoints_with_models}")
     print(f"Endpoints with pricing:       {endpoints_with_pricing}")
@@ -437,4 +656,4 @@ def main():
         print()
 
 if __name__ == "__main__":
-    main()
+    exit(main() or 0)
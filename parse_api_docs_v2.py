@@ -10,48 +10,44 @@ import re
 from pathlib import Path
 from datetime import datetime
 
+import html_cleaner
+import json_scanner
+import page_access
+import table_parser
+
 def clean_html(text):
     """Nettoie les balises HTML d'un texte."""
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<[^>]+>', '', text)
-    text = re.sub(r'&nbsp;', ' ', text)
-    text = re.sub(r'&quot;', '"', text)
-    text = re.sub(r'&amp;', '&', text)
-    text = re.sub(r'&lt;', '<', text)
-    text = re.sub(r'&gt;', '>', text)
-    return text.strip()
+    return html_cleaner.clean_html(text, collapse_whitespace=False)
+
+def parse_json_block(json_text):
+    """Parse un bloc JSON après nettoyage des virgules finales, ou retourne None."""
+    json_text = re.sub(r',\s*}', '}', json_text)
+    json_text = re.sub(r',\s*]', ']', json_text)
+    try:
+        return json.loads(json_text)
+    except (ValueError, RecursionError):
+        return None
 
 def extract_json_objects(content):
     """Extrait tous les objets JSON du contenu."""
+    flat_objects = []
     json_objects = []
 
-    # Chercher des blocs JSON
-    patterns = [
-        r'\{[^{}]*"[^"]*"[^{}]*:[^{}]*\}',
-        r'\{(?:[^{}]|(?:\{[^{}]*\}))*\}'
-    ]
-
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.DOTALL)
-        for match in matches:
-            try:
-                json_text = match.group(0)
-                # Nettoyer
-                json_text = re.sub(r',\s*}', '}', json_text)
-                json_text = re.sub(r',\s*]', ']', json_text)
-                obj = json.loads(json_text)
-                json_objects.append(obj)
-            except:
-                pass
+    # Objets équilibrés de toute profondeur ; un bloc invalide est exploré plus en profondeur
+    for obj in json_scanner.iter_parsed_objects(content, parse_json_block):
+        json_objects.append(obj)
+
+        # Les objets plats (sans objet imbriqué) sont aussi retournés séparément
+        for candidate in [obj] + list(json_scanner.iter_nested_dicts(obj)):
+            if candidate and not any(json_scanner.iter_nested_dicts(candidate)):
+                flat_objects.append(candidate)
 
-    return json_objects
+    return flat_objects + json_objects
 
 def extract_endpoint_info(html_file):
     """Extrait les informations d'endpoint depuis un fichier HTML avec parsing approfondi."""
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = page_access.read_text(html_file)
 
         # Initialiser la structure
         endpoint_info = {
@@ -178,71 +174,66 @@ def extract_endpoint_info(html_file):
                             "example": value
                         }
 
-        # Chercher les tables de paramètres dans le HTML
-        # Pattern pour détecter les tables
-        table_pattern = r'<table[^>]*>(.*?)</table>'
-        tables = re.finditer(table_pattern, content, re.DOTALL | re.IGNORECASE)
-
+        # Chercher les tables de paramètres dans le HTML (une seule passe, ligne par ligne)
         params_from_tables = {}
-        for table_match in tables:
-            table_content = table_match.group(1)
-            # Extraire les lignes
-            rows = re.findall(r'<tr[^>]*>(.*?)</tr>', table_content, re.DOTALL | re.IGNORECASE)
-
+        for row in table_parser.iter_table_rows(content):
             # Skip header row
-            for row in rows[1:]:
-                cells = re.findall(r'<t[dh][^>]*>(.*?)</t[dh]>', row, re.DOTALL | re.IGNORECASE)
-                if len(cells) >= 2:
-                    param_name = clean_html(cells[0]).strip()
-
-                    # Valider le nom du paramètre
-                    if not param_name or param_name.lower() in ['parameter', 'name', 'field', 'property', 'key']:
-                        continue
-
-                    # Type
+            if row.index == 0:
+                continue
+            cells = row.cells
+            if len(cells) < 2:
+                continue
+
+            param_name = cells[0].strip()
+
+            # Valider le nom du paramètre
+            if not param_name or param_name.lower() in ['parameter', 'name', 'field', 'property', 'key']:
+                continue
+
+            # Type
+            param_type = "string"
+            if len(cells) > 1:
+                type_text = cells[1].lower()
+                if 'string' in type_text:
                     param_type = "string"
-                    if len(cells) > 1:
-                        type_text = clean_html(cells[1]).lower()
-                        if 'string' in type_text:
-                            param_type = "string"
-                        elif 'number' in type_text or 'integer' in type_text or 'int' in type_text or 'float' in type_text:
-                            param_type = "number"
-                        elif 'boolean' in type_text or 'bool' in type_text:
-                            param_type = "boolean"
-                        elif 'array' in type_text or 'list' in type_text or '[]' in type_text:
-                            param_type = "array"
-                        elif 'object' in type_text or '{}' in type_text:
-                            param_type = "object"
-
-                    # Description
-                    description = ""
-                    if len(cells) > 2:
-                        description = clean_html(cells[2]).strip()
-
-                    # Required
-                    is_required = False
-                    required_text = ""
-                    if len(cells) > 3:
-                        required_text = clean_html(cells[3]).lower()
-                        is_required = 'yes' in required_text or 'required' in required_text or 'true' in required_text
-
-                    # Default value
-                    default_value = None
-                    if len(cells) > 4:
-                        default_text = clean_html(cells[4]).strip()
-                        if default_text and default_text.lower() not in ['none', 'null', '-', '', 'n/a']:
-                            default_value = default_text
-
-                    param_info = {
-                        "type": param_type,
-                        "description": description,
-                        "default": default_value
-                    }
-
-                    params_from_tables[param_name] = {
-                        "info": param_info,
-                        "required": is_required
-                    }
+                elif 'number' in type_text or 'integer' in type_text or 'int' in type_text or 'float' in type_text:
+                    param_type = "number"
+                elif 'boolean' in type_text or 'bool' in type_text:
+                    param_type = "boolean"
+                elif 'array' in type_text or 'list' in type_text or '[]' in type_text:
+                    param_type = "array"
+                elif 'object' in type_text or '{}' in type_text:
+                    param_type = "object"
+
+            # Description
+            description = ""
+            if len(cells) > 2:
+                description = cells[2].strip()
+
+            # Required
+            is_required = False
+            required_text = ""
+            if len(cells) > 3:
+                required_text = cells[3].lower()
+                is_required = 'yes' in required_text or 'required' in required_text or 'true' in required_text
+
+            # Default value
+            default_value = None
+            if len(cells) > 4:
+                default_text = cells[4].strip()
+                if default_text and default_text.lower() not in ['none', 'null', '-', '', 'n/a']:
+                    default_value = default_text
+
+            param_info = {
+                "type": param_type,
+                "description": description,
+                "default": default_value
+            }
+
+            params_from_tables[param_name] = {
+                "info": param_info,
+                "required": is_required
+            }
 
         # Fusionner les paramètres des tables et des exemples
         all_params = {}
@@ -5,12 +5,42 @@ Extracts endpoint information including URL, method, parameters, pricing, and ex
 """
 
 import os
+import sys
 import json
 import re
+import argparse
+import tracemalloc
 from pathlib import Path
 from html.parser import HTMLParser
 from typing import Dict, List, Any, Optional
 
+# Size of the chunks fed to the streaming parser
+STREAM_CHUNK = 1 << 16
+# Longest match the streaming pattern matchers can report
+STREAM_WINDOW = 4096
+
+URL_PATTERNS = [
+    r'https://api\.kie\.ai/api/v\d+/[^\s"\'\)]+',
+    r'/api/v\d+/[^\s"\'\)]+',
+    r'POST\s+(https://[^\s]+)',
+    r'GET\s+(https://[^\s]+)',
+]
+
+MODEL_ID_PATTERNS = [
+    r'"model[_-]?id"\s*:\s*"([^"]+)"',
+    r'"model"\s*:\s*"([^"]+)"',
+    r'model[_-]?id[:\s]+([a-zA-Z0-9\-_.]+)',
+]
+
+CREDIT_PATTERNS = [
+    r'(\d+)\s*credit',
+    r'cost[:\s]+(\d+)',
+    r'price[:\s]+(\d+)',
+    r'(\d+)\s*credits?',
+]
+
+DESCRIPTION_PATTERN = r'(?:Description|Overview|Introduction)[:\s]+([^\.]+\.)'
+
 class KieApiHTMLParser(HTMLParser):
     def __init__(self):
         super().__init__()
@@ -42,23 +72,132 @@ class KieApiHTMLParser(HTMLParser):
             self.current_code.append(data)
         self.all_text.append(data)
 
-def extract_endpoint_info(html_file_path: str) -> Optional[Dict[str, Any]]:
-    """Extract API endpoint information from an HTML file."""
-    try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-    except Exception as e:
-        print(f"Error reading {html_file_path}: {e}")
-        return None
+class StreamPatternMatcher:
+    """Incremental re.findall over a text stream that keeps at most two windows of text.
 
-    parser = KieApiHTMLParser()
-    parser.feed(html_content)
+    Matches longer than the window are not reported; shorter ones are found exactly
+    as re.findall would find them in the full text.
+    """
 
-    full_text = ' '.join(parser.all_text)
-    code_blocks = parser.code_blocks
+    def __init__(self, pattern, flags=0, window=STREAM_WINDOW, limit=None):
+        self.regex = re.compile(pattern, flags)
+        self.window = window
+        self.limit = limit
+        self.matches = []
+        self.buffer = ''
+        self.scan_from = 0
+        self.done = False
+
+    def feed(self, text):
+        if self.done:
+            return
+        self.buffer += text
+        if len(self.buffer) >= 2 * self.window:
+            self._scan(final=False)
+
+    def close(self):
+        if not self.done:
+            self._scan(final=True)
+        self.done = True
+        self.buffer = ''
+        return self.matches
+
+    def _scan(self, final):
+        buffer = self.buffer
+        # A match ending before `safe` cannot grow or be preceded by an earlier match (within the window)
+        safe = len(buffer) - self.window
+        pending = None
+
+        while True:
+            m = self.regex.search(buffer, self.scan_from)
+            if m is None:
+                break
+            if not final and m.end() > safe:
+                pending = m.start()
+                break
+            groups = m.groups()
+            self.matches.append(m.group() if not groups else groups[0] if len(groups) == 1 else groups)
+            self.scan_from = max(m.end(), m.start() + 1)
+            if self.limit and len(self.matches) >= self.limit:
+                self.done = True
+                self.buffer = ''
+                return
+
+        if final:
+            return
+        cut = safe
+        if pending is not None and len(buffer) - pending <= 2 * self.window:
+            cut = min(pending, safe)
+        cut = max(cut, 0)
+        self.buffer = buffer[cut:]
+        self.scan_from = max(self.scan_from - cut, 0)
+
+class StreamingKieApiHTMLParser(KieApiHTMLParser):
+    """KieApiHTMLParser variant that never keeps the page text.
+
+    Code and pre blocks are kept as before; every other text node is only passed through
+    the pattern matchers, so memory stays bounded by the window size and the code blocks.
+    """
+
+    def __init__(self, window=STREAM_WINDOW):
+        super().__init__()
+        self.url_matchers = [StreamPatternMatcher(p, window=window, limit=1) for p in URL_PATTERNS]
+        self.model_matchers = [StreamPatternMatcher(p, re.IGNORECASE, window) for p in MODEL_ID_PATTERNS]
+        self.credit_matchers = [StreamPatternMatcher(p, re.IGNORECASE, window, limit=1) for p in CREDIT_PATTERNS]
+        self.description_matcher = StreamPatternMatcher(DESCRIPTION_PATTERN, re.IGNORECASE, window, limit=1)
+        # Substring checks on the upper/lower-cased text, as done on full_text
+        self.upper_matchers = {word: StreamPatternMatcher(word, window=window, limit=1) for word in ('POST', 'GET')}
+        self.optional_matcher = StreamPatternMatcher('optional', window=window, limit=1)
+        self.text_started = False
+
+    def handle_data(self, data):
+        if self.in_code or self.in_pre:
+            self.current_code.append(data)
+
+        # Same text as ' '.join(all_text), without keeping it
+        if self.text_started:
+            data = ' ' + data
+        self.text_started = True
 
-    endpoint_info = {
-        "name": "",
+        for matcher in self.url_matchers + self.model_matchers + self.credit_matchers:
+            matcher.feed(data)
+        self.description_matcher.feed(data)
+        upper = data.upper()
+        for matcher in self.upper_matchers.values():
+            matcher.feed(upper)
+        self.optional_matcher.feed(data.lower())
+
+    def finish(self):
+        """Flushes all matchers; call once the whole file has been fed."""
+        for matcher in (self.url_matchers + self.model_matchers + self.credit_matchers +
+                        [self.description_matcher, self.optional_matcher] + list(self.upper_matchers.values())):
+            matcher.close()
+
+def feed_file_in_chunks(parser, html_file_path, chunk_size=STREAM_CHUNK):
+    """Feeds a file to an HTMLParser in chunks that always end right before a '<'.
+
+    Cutting before a tag keeps the text nodes identical to a single feed() of the whole file.
+    """
+    carry = ''
+    with open(html_file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunk = carry + chunk
+            cut = chunk.rfind('<')
+            if cut <= 0:
+                carry = chunk
+                continue
+            parser.feed(chunk[:cut])
+            carry = chunk[cut:]
+    if carry:
+        parser.feed(carry)
+
+def new_endpoint_info(html_file_path: str) -> Dict[str, Any]:
+    """Empty endpoint record, named after the file."""
+    return {
+        "name": os.path.basename(html_file_path).replace(' - KIE API.html', '').replace('.html', ''),
         "endpoint": "",
         "method": "",
         "modelIds": [],
@@ -70,56 +209,8 @@ def extract_endpoint_info(html_file_path: str) -> Optional[Dict[str, Any]]:
         "source_file": os.path.basename(html_file_path)
     }
 
-    # Extract name from filename
-    filename = os.path.basename(html_file_path).replace(' - KIE API.html', '').replace('.html', '')
-    endpoint_info["name"] = filename
-
-    # Extract endpoint URL
-    url_patterns = [
-        r'https://api\.kie\.ai/api/v\d+/[^\s"\'\)]+',
-        r'/api/v\d+/[^\s"\'\)]+',
-        r'POST\s+(https://[^\s]+)',
-        r'GET\s+(https://[^\s]+)',
-    ]
-
-    for pattern in url_patterns:
-        matches = re.findall(pattern, full_text)
-        if matches:
-            endpoint_info["endpoint"] = matches[0]
-            break
-
-    # Extract HTTP method
-    if 'POST' in full_text.upper():
-        endpoint_info["method"] = "POST"
-    elif 'GET' in full_text.upper():
-        endpoint_info["method"] = "GET"
-
-    # Extract model IDs
-    model_id_patterns = [
-        r'"model[_-]?id"\s*:\s*"([^"]+)"',
-        r'"model"\s*:\s*"([^"]+)"',
-        r'model[_-]?id[:\s]+([a-zA-Z0-9\-_.]+)',
-    ]
-
-    for pattern in model_id_patterns:
-        matches = re.findall(pattern, full_text, re.IGNORECASE)
-        if matches:
-            endpoint_info["modelIds"].extend(matches)
-
-    # Extract pricing/credits
-    credit_patterns = [
-        r'(\d+)\s*credit',
-        r'cost[:\s]+(\d+)',
-        r'price[:\s]+(\d+)',
-        r'(\d+)\s*credits?',
-    ]
-
-    for pattern in credit_patterns:
-        matches = re.findall(pattern, full_text, re.IGNORECASE)
-        if matches:
-            endpoint_info["pricing"]["credits"] = int(matches[0])
-            break
-
+def add_code_block_info(endpoint_info: Dict[str, Any], code_blocks: List[str], has_optional, key_in_text) -> None:
+    """Fills examples and parameters from the code blocks."""
     # Extract curl examples
     curl_examples = []
     for code_block in code_blocks:
@@ -142,7 +233,7 @@ def extract_endpoint_info(html_file_path: str) -> Optional[Dict[str, Any]]:
                         for key, value in data.items():
                             if key not in ['api_key', 'apiKey']:
                                 param_type = type(value).__name__
-                                if 'optional' in full_text.lower() and key in full_text.lower():
+                                if has_optional and key_in_text(key, code_block):
                                     endpoint_info["optional"][key] = param_type
                                 else:
                                     endpoint_info["required"][key] = param_type
@@ -151,14 +242,137 @@ def extract_endpoint_info(html_file_path: str) -> Optional[Dict[str, Any]]:
             except:
                 pass
 
+def extract_endpoint_info_streaming(html_file_path: str, chunk_size: int = STREAM_CHUNK) -> Optional[Dict[str, Any]]:
+    """Same as extract_endpoint_info, feeding the file in chunks with bounded text windows."""
+    parser = StreamingKieApiHTMLParser()
+    try:
+        feed_file_in_chunks(parser, html_file_path, chunk_size)
+    except Exception as e:
+        print(f"Error reading {html_file_path}: {e}")
+        return None
+    parser.finish()
+
+    endpoint_info = new_endpoint_info(html_file_path)
+
+    for matcher in parser.url_matchers:
+        if matcher.matches:
+            endpoint_info["endpoint"] = matcher.matches[0]
+            break
+
+    if parser.upper_matchers['POST'].matches:
+        endpoint_info["method"] = "POST"
+    elif parser.upper_matchers['GET'].matches:
+        endpoint_info["method"] = "GET"
+
+    for matcher in parser.model_matchers:
+        endpoint_info["modelIds"].extend(matcher.matches)
+
+    for matcher in parser.credit_matchers:
+        if matcher.matches:
+            endpoint_info["pricing"]["credits"] = int(matcher.matches[0])
+            break
+
+    # The page text is gone: a JSON key is looked up in the lower-cased code block it comes from
+    add_code_block_info(endpoint_info, parser.code_blocks, bool(parser.optional_matcher.matches),
+                        lambda key, code_block: key in code_block.lower())
+
+    if parser.description_matcher.matches:
+        endpoint_info["description"] = parser.description_matcher.matches[0].strip()
+
+    return endpoint_info
+
+def extract_endpoint_info(html_file_path: str) -> Optional[Dict[str, Any]]:
+    """Extract API endpoint information from an HTML file."""
+    try:
+        with open(html_file_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+    except Exception as e:
+        print(f"Error reading {html_file_path}: {e}")
+        return None
+
+    parser = KieApiHTMLParser()
+    parser.feed(html_content)
+
+    full_text = ' '.join(parser.all_text)
+    code_blocks = parser.code_blocks
+
+    endpoint_info = new_endpoint_info(html_file_path)
+
+    # Extract endpoint URL
+    for pattern in URL_PATTERNS:
+        matches = re.findall(pattern, full_text)
+        if matches:
+            endpoint_info["endpoint"] = matches[0]
+            break
+
+    # Extract HTTP method
+    if 'POST' in full_text.upper():
+        endpoint_info["method"] = "POST"
+    elif 'GET' in full_text.upper():
+        endpoint_info["method"] = "GET"
+
+    # Extract model IDs
+    for pattern in MODEL_ID_PATTERNS:
+        matches = re.findall(pattern, full_text, re.IGNORECASE)
+        if matches:
+            endpoint_info["modelIds"].extend(matches)
+
+    # Extract pricing/credits
+    for pattern in CREDIT_PATTERNS:
+        matches = re.findall(pattern, full_text, re.IGNORECASE)
+        if matches:
+            endpoint_info["pricing"]["credits"] = int(matches[0])
+            break
+
+    # Extract curl examples and parameters from code blocks
+    full_text_lower = full_text.lower()
+    add_code_block_info(endpoint_info, code_blocks, 'optional' in full_text_lower,
+                        lambda key, code_block: key in full_text_lower)
+
     # Extract description
-    desc_match = re.search(r'(?:Description|Overview|Introduction)[:\s]+([^\.]+\.)', full_text, re.IGNORECASE)
+    desc_match = re.search(DESCRIPTION_PATTERN, full_text, re.IGNORECASE)
     if desc_match:
         endpoint_info["description"] = desc_match.group(1).strip()
 
     return endpoint_info
 
-def main():
+def peak_memory(func, *args):
+    """Runs func(*args) under tracemalloc and returns (result, peak bytes)."""
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+def memory_report(html_files) -> bool:
+    """Compares the peak traced memory of the full and streaming parsers on each file."""
+    mismatches = 0
+    print("=" * 60)
+    print("Peak traced memory per file (full -> streaming)")
+    print("=" * 60)
+    for html_file in sorted(html_files, key=lambda f: f.stat().st_size, reverse=True):
+        full, full_peak = peak_memory(extract_endpoint_info, str(html_file))
+        streamed, stream_peak = peak_memory(extract_endpoint_info_streaming, str(html_file))
+        same = full == streamed
+        mismatches += not same
+        print(f"{html_file.name[:34]:<34} {html_file.stat().st_size:>10,} B  "
+              f"{full_peak:>11,} -> {stream_peak:>9,}{'' if same else '  (output differs)'}")
+    print("=" * 60)
+    print(f"Files: {len(html_files)}, output mismatches: {mismatches}")
+    return mismatches == 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="KIE API HTML documentation parser")
+    parser.add_argument('--stream', action='store_true',
+                        help="feed files in chunks and keep only bounded text windows")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="compare tracemalloc peaks of the full and streaming parsers, then exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     docskie_dir = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie')
     output_file = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
 
@@ -168,9 +382,14 @@ def main():
     html_files = list(docskie_dir.glob('**/*.html'))
     print(f"Found {len(html_files)} HTML files")
 
+    if args.memory_report:
+        return 0 if memory_report(html_files) else 1
+
+    extract = extract_endpoint_info_streaming if args.stream else extract_endpoint_info
+
     for html_file in sorted(html_files):
         print(f"Processing: {html_file.relative_to(docskie_dir)}")
-        endpoint_info = extract_endpoint_info(str(html_file))
+        endpoint_info = extract(str(html_file))
         if endpoint_info and (endpoint_info['endpoint'] or endpoint_info['method']):
             all_endpoints.append(endpoint_info)
 
@@ -189,4 +408,4 @@ def main():
     print(f"Output saved to: {output_file}")
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -7,9 +7,19 @@ Extracts endpoint information with better accuracy using BeautifulSoup.
 import os
 import json
 import re
+import argparse
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+import endpoint_categories
+import keyword_rules
+import page_access
+import pipeline
+import stage_timing
+import token_scanner
+from extraction_cache import open_cache
+
 try:
     from bs4 import BeautifulSoup
     HAS_BS4 = True
@@ -17,11 +27,35 @@ except ImportError:
     HAS_BS4 = False
     print("Warning: BeautifulSoup not available, using regex fallback")
 
-def extract_with_regex(html_content: str, filename: str, full_path: str = "") -> Optional[Dict[str, Any]]:
+DOCSKIE_PATH = '/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie'
+OUTPUT_FILE = '/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json'
+
+# Endpoint patterns read by the token scanner: (kind, pattern, flags, first characters).
+ENDPOINT_TOKEN_SPECS = [
+    ('url', r'https://api\.kie\.ai(/api/v\d+/[^\s"\'<>]+)', 0, 'h'),
+    ('url_json', r'"url"\s*:\s*"https://api\.kie\.ai(/api/v\d+/[^"]+)"', 0, '"'),
+    ('url_post', r'POST\s+https://api\.kie\.ai(/api/v\d+/[^\s"\'<>]+)', 0, 'P'),
+    ('url_get', r'GET\s+https://api\.kie\.ai(/api/v\d+/[^\s"\'<>]+)', 0, 'G'),
+    ('method', r'\b(POST|GET)\b', re.IGNORECASE, 'pPgG'),
+    ('model_id', r'"model[_-]?id"\s*:\s*"([^"]+)"', re.IGNORECASE, '"'),
+    ('model', r'"model"\s*:\s*"([^"]+)"', re.IGNORECASE, '"'),
+    ('model_attr', r'model[_-]?id[=:]\s*["\']([^"\']+)["\']', re.IGNORECASE, 'mM'),
+    ('credit_per', r'(\d+)\s+credits?\s+per', re.IGNORECASE, '0-9'),
+    ('credit_cost', r'costs?\s+(\d+)\s+credits?', re.IGNORECASE, 'cC'),
+    ('credit_price', r'price[:\s]+(\d+)', re.IGNORECASE, 'pP'),
+    ('credit', r'(\d+)\s+credits?\b', re.IGNORECASE, '0-9'),
+]
+ENDPOINT_TOKENS = token_scanner.TokenScanner(ENDPOINT_TOKEN_SPECS)
+
+def _at_word_start(text: str, pos: int) -> bool:
+    """True when a word boundary precedes text[pos], as matched by a leading regex \\b."""
+    return pos == 0 or not (text[pos - 1].isalnum() or text[pos - 1] == '_')
+
+def extract_with_regex(html_content: str, filename: str, full_path: str = "",
+                       docskie_path: str = DOCSKIE_PATH) -> Optional[Dict[str, Any]]:
     """Fallback extraction using regex when BeautifulSoup is not available."""
 
     # Get relative path from docskie folder for better categorization
-    docskie_path = '/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie'
     relative_path = full_path.replace(docskie_path + '/', '') if docskie_path in full_path else filename
 
     endpoint_info = {
@@ -38,36 +72,33 @@ def extract_with_regex(html_content: str, filename: str, full_path: str = "") ->
         "category": ""
     }
 
+    # URLs, methods, model IDs and credits as typed tokens
+    with stage_timing.span('endpoint_tokens'):
+        tokens = ENDPOINT_TOKENS.collect(html_content)
+    stage_timing.count_tokens(tokens)
+
     # Extract endpoint URL - look for various patterns
-    url_patterns = [
-        r'https://api\.kie\.ai(/api/v\d+/[^\s"\'<>]+)',
-        r'"url"\s*:\s*"https://api\.kie\.ai(/api/v\d+/[^"]+)"',
-        r'POST\s+https://api\.kie\.ai(/api/v\d+/[^\s"\'<>]+)',
-        r'GET\s+https://api\.kie\.ai(/api/v\d+/[^\s"\'<>]+)',
-    ]
-
-    for pattern in url_patterns:
-        matches = re.findall(pattern, html_content)
+    for kind in ['url', 'url_json', 'url_post', 'url_get']:
+        matches = token_scanner.values(html_content, tokens[kind])
         if matches:
             endpoint_info["endpoint"] = matches[0] if matches[0].startswith('/') else '/' + matches[0]
             break
 
-    # Extract HTTP method
-    if re.search(r'\bPOST\b', html_content, re.IGNORECASE):
+    # Extract HTTP method ("POST https://..." URLs take precedence over the bare word at the same offset)
+    methods = {t.groups[0].upper() for t in tokens['method']}
+    if any(_at_word_start(html_content, t.start) for t in tokens['url_post']):
+        methods.add('POST')
+    if any(_at_word_start(html_content, t.start) for t in tokens['url_get']):
+        methods.add('GET')
+    if 'POST' in methods:
         endpoint_info["method"] = "POST"
-    elif re.search(r'\bGET\b', html_content, re.IGNORECASE):
+    elif 'GET' in methods:
         endpoint_info["method"] = "GET"
 
     # Extract model IDs from JSON examples
-    model_patterns = [
-        r'"model[_-]?id"\s*:\s*"([^"]+)"',
-        r'"model"\s*:\s*"([^"]+)"',
-        r'model[_-]?id[=:]\s*["\']([^"\']+)["\']',
-    ]
-
     model_ids = set()
-    for pattern in model_patterns:
-        matches = re.findall(pattern, html_content, re.IGNORECASE)
+    for kind in ['model_id', 'model', 'model_attr']:
+        matches = token_scanner.values(html_content, tokens[kind])
         for match in matches:
             if match and len(match) < 100:  # Sanity check
                 model_ids.add(match)
@@ -75,15 +106,8 @@ def extract_with_regex(html_content: str, filename: str, full_path: str = "") ->
     endpoint_info["modelIds"] = sorted(list(model_ids))
 
     # Extract pricing - look for credit costs
-    credit_patterns = [
-        r'(\d+)\s+credits?\s+per',
-        r'costs?\s+(\d+)\s+credits?',
-        r'price[:\s]+(\d+)',
-        r'(\d+)\s+credits?\b',
-    ]
-
-    for pattern in credit_patterns:
-        matches = re.findall(pattern, html_content, re.IGNORECASE)
+    for kind in ['credit_per', 'credit_cost', 'credit_price', 'credit']:
+        matches = token_scanner.values(html_content, tokens[kind])
         if matches:
             try:
                 endpoint_info["pricing"]["credits"] = int(matches[0])
@@ -93,12 +117,16 @@ def extract_with_regex(html_content: str, filename: str, full_path: str = "") ->
 
     # Extract curl examples
     curl_pattern = r'curl\s+[^<]*?(?:https://api\.kie\.ai[^<]*?)(?:\s*\\|\s*-[^\n]*\n)*[^<]*?(?:\n\n|</code>|</pre>)'
-    curl_matches = re.findall(curl_pattern, html_content, re.DOTALL | re.IGNORECASE)
+    with stage_timing.span('curl_examples'):
+        curl_matches = re.findall(curl_pattern, html_content, re.DOTALL | re.IGNORECASE)
+    stage_timing.count('curl', len(curl_matches))
     endpoint_info["examples"] = [match.strip()[:1000] for match in curl_matches[:2]]
 
     # Extract parameters from JSON request examples
     json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-    json_matches = re.findall(json_pattern, html_content)
+    with stage_timing.span('json_objects'):
+        json_matches = re.findall(json_pattern, html_content)
+    stage_timing.count('json_object', len(json_matches))
 
     params_found = {}
     for json_str in json_matches[:5]:  # Check first 5 JSON objects
@@ -125,41 +153,58 @@ def extract_with_regex(html_content: str, filename: str, full_path: str = "") ->
         else:
             endpoint_info["optional"][key] = ptype
 
-    # Determine category from path
-    if '/gpt4o-image/' in endpoint_info["endpoint"]:
-        endpoint_info["category"] = "4o-image"
-    elif '/suno/' in endpoint_info["endpoint"]:
-        endpoint_info["category"] = "suno"
-    elif '/runway/' in endpoint_info["endpoint"]:
-        endpoint_info["category"] = "runway"
-    elif '/flux/' in endpoint_info["endpoint"] or 'flux' in endpoint_info["name"].lower():
-        endpoint_info["category"] = "flux"
-    elif '/veo/' in endpoint_info["endpoint"] or 'veo' in endpoint_info["name"].lower():
-        endpoint_info["category"] = "veo"
-    elif '/luma/' in endpoint_info["endpoint"]:
-        endpoint_info["category"] = "luma"
-    elif '/market/' in endpoint_info["endpoint"]:
-        endpoint_info["category"] = "market"
+    # Determine category from path (path_category rules of endpoint_categories)
+    with stage_timing.span('category'):
+        endpoint_info["category"] = endpoint_categories.categorize_path(endpoint_info["endpoint"], endpoint_info["name"])
 
     return endpoint_info
 
-def extract_endpoint_info(html_file_path: str) -> Optional[Dict[str, Any]]:
-    """Extract API endpoint information from an HTML file."""
-    try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-    except Exception as e:
-        print(f"Error reading {html_file_path}: {e}")
-        return None
-
-    filename = os.path.basename(html_file_path)
-
-    # Use regex-based extraction
-    return extract_with_regex(html_content, filename, html_file_path)
-
-def main():
-    docskie_dir = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/docskie')
-    output_file = Path('/home/gsm/AndroidStudioProjects/BananoToon/vercel-backend/api-endpoints-mapping.json')
+def extract_endpoint_info(html_file_path: str, data: Optional[bytes] = None,
+                          docskie_path: str = DOCSKIE_PATH) -> Optional[Dict[str, Any]]:
+    """Extract API endpoint information from an HTML file, or from its already-read bytes."""
+    with stage_timing.page(html_file_path, None if data is None else len(data)):
+        try:
+            with stage_timing.span('read'):
+                html_content = page_access.read_text(html_file_path, data=data)
+        except Exception as e:
+            print(f"Error reading {html_file_path}: {e}")
+            return None
+
+        filename = os.path.basename(html_file_path)
+
+        # Use regex-based extraction
+        return extract_with_regex(html_content, filename, html_file_path, docskie_path)
+
+def extract_page_bytes(html_file_path: str, data: bytes, docskie_path: str = DOCSKIE_PATH) -> Optional[Dict[str, Any]]:
+    """Pipeline parse stage: extract the endpoint of an already-read page."""
+    return extract_endpoint_info(html_file_path, data, docskie_path)
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Advanced parser for KIE API HTML documentation")
+    parser.add_argument('--docskie', type=Path, default=Path(DOCSKIE_PATH),
+                        help="directory of the HTML documentation pages")
+    parser.add_argument('--output', type=Path, default=Path(OUTPUT_FILE),
+                        help="generated mapping file")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore the extraction cache and re-parse every page")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="read pages in a thread while workers parse the previous ones")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="pipeline parse workers (more than 1 uses processes)")
+    parser.add_argument('--queue-depth', type=int, default=pipeline.QUEUE_DEPTH,
+                        help="pages read ahead by the pipeline")
+    parser.add_argument('--timing-report', type=Path, metavar='FILE',
+                        help="write per-stage timings and the slowest pages to FILE (JSON); "
+                             "cached pages are not parsed, so combine with --no-cache")
+    parser.add_argument('--timing-top', type=int, default=stage_timing.TOP_PAGES, metavar='N',
+                        help="slowest pages listed in the timing report")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    docskie_dir = args.docskie
+    output_file = args.output
 
     all_endpoints = []
 
@@ -167,11 +212,34 @@ def main():
     html_files = list(docskie_dir.glob('**/*.html'))
     print(f"Found {len(html_files)} HTML files\n")
 
-    for i, html_file in enumerate(sorted(html_files), 1):
-        rel_path = html_file.relative_to(docskie_dir)
+    cache = None if args.no_cache else open_cache('parse_html_docs_v2', __file__, endpoint_categories.__file__,
+                                                endpoint_categories.RULES_FILE, keyword_rules.__file__,
+                                                page_access.__file__, token_scanner.__file__)
+
+    workers = max(1, args.workers)
+    if args.timing_report:
+        stage_timing.enable()
+        if args.pipeline and workers > 1:
+            # Timings are recorded in this process: parse with threads instead of processes
+            print(f"Timing report: {workers} pipeline workers run as threads\n")
+
+    runner = None
+    if args.pipeline:
+        runner = pipeline.Pipeline(partial(extract_page_bytes, docskie_path=str(docskie_dir)), workers=workers, queue_depth=args.queue_depth,
+                                   processes=workers > 1 and not args.timing_report)
+    # Read errors are not cached
+    extract = partial(extract_endpoint_info, docskie_path=str(docskie_dir))
+    results = pipeline.run_extractions([str(f) for f in sorted(html_files)], extract, cache, runner,
+                                       cacheable=lambda endpoint_info: endpoint_info is not None)
+
+    for i, (html_file, endpoint_info, error) in enumerate(results, 1):
+        rel_path = Path(html_file).relative_to(docskie_dir)
         print(f"[{i}/{len(html_files)}] Processing: {rel_path}")
-
-        endpoint_info = extract_endpoint_info(str(html_file))
+        if error is not None:
+            # Pages read by the pipeline: read errors are reported like extract_endpoint_info does
+            if not isinstance(error, OSError):
+                raise error
+            print(f"Error reading {html_file}: {error}")
 
         if endpoint_info:
             # Only include if we found an endpoint or method
@@ -208,8 +276,17 @@ def main():
     print(f"\n{'='*60}")
     print(f"Extracted {len(all_endpoints)} endpoints")
     print(f"Categories: {', '.join(sorted(by_category.keys()))}")
+    if cache is not None:
+        cache.prune(html_files)
+        cache.save()
+        print(f"Extraction cache: {cache.summary()}")
     print(f"Output saved to: {output_file}")
     print(f"{'='*60}")
+    if runner is not None:
+        runner.report()
+    if args.timing_report:
+        stage_timing.print_summary(stage_timing.write_report(args.timing_report, args.timing_top))
+        print(f"Timing report saved to: {args.timing_report}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Exécution en pipeline des extracteurs KIE API : lecture, analyse et écriture se chevauchent.
+Un thread lecteur précharge les pages dans une file bornée, des workers les analysent (threads,
+ou processus pour un vrai parallélisme CPU) et un seul écrivain reçoit les résultats dans
+l'ordre d'entrée. Le temps passé par chaque étape à attendre ses voisines est mesuré.
+"""
+
+import time
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import page_access
+
+QUEUE_DEPTH = 16
+
+# value : résultat de parse(item, payload) ; error : exception levée par read ou parse, sinon None
+Result = namedtuple('Result', ['item', 'value', 'error'])
+
+_DONE = object()
+
+class StageStats:
+    """Temps d'une étape : travail, attente de son entrée (famine) et de sa sortie (blocage)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, starved=0.0, blocked=0.0, items=0):
+        with self._lock:
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+            self.items += items
+
+class Pipeline:
+    """Lecteur -> workers -> écrivain, reliés par des files bornées à queue_depth éléments.
+
+    read(item) fait les entrées/sorties (par défaut page_access.read_bytes, qui libère le GIL) ;
+    parse(item, payload) fait l'analyse. Avec processes=True, chaque worker délègue parse à un
+    pool de processus : parse et ses arguments doivent alors être picklables.
+    """
+
+    def __init__(self, parse, read=page_access.read_bytes, workers=1, queue_depth=QUEUE_DEPTH,
+                 processes=False):
+        self.parse = parse
+        self.read = read
+        self.workers = max(1, workers)
+        self.queue_depth = max(1, queue_depth)
+        self.processes = processes
+        self.stats = [StageStats('read'), StageStats('parse'), StageStats('write')]
+        self.elapsed = 0.0
+
+    def _reader(self, items, pages, stop):
+        stats = self.stats[0]
+        for index, item in enumerate(items):
+            if stop.is_set():
+                break
+            start = time.perf_counter()
+            try:
+                payload, error = self.read(item), None
+            except Exception as e:
+                payload, error = None, e
+            read_done = time.perf_counter()
+            pages.put((index, item, payload, error))
+            stats.add(busy=read_done - start, blocked=time.perf_counter() - read_done, items=1)
+        for _ in range(self.workers):
+            pages.put(_DONE)
+
+    def _worker(self, pages, results, pool):
+        stats = self.stats[1]
+        while True:
+            start = time.perf_counter()
+            task = pages.get()
+            got = time.perf_counter()
+            if task is _DONE:
+                stats.add(starved=got - start)
+                results.put(_DONE)
+                return
+
+            index, item, payload, error = task
+            value = None
+            if error is None:
+                try:
+                    if pool is not None:
+                        value = pool.submit(self.parse, item, payload).result()
+                    else:
+                        value = self.parse(item, payload)
+                except Exception as e:
+                    error = e
+            parsed = time.perf_counter()
+            results.put((index, Result(item, value, error)))
+            stats.add(busy=parsed - got, starved=got - start, blocked=time.perf_counter() - parsed, items=1)
+
+    def run(self, items):
+        """Génère un Result par élément de items, dans l'ordre d'entrée.
+
+        Le code qui consomme le générateur est l'écrivain : son temps entre deux résultats est
+        compté comme travail, son attente du résultat suivant comme famine.
+        """
+        items = list(items)
+        pages = queue.Queue(self.queue_depth)
+        results = queue.Queue(self.queue_depth)
+        stop = threading.Event()
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.processes else None
+        threads = [threading.Thread(target=self._reader, args=(items, pages, stop), daemon=True)]
+        threads += [threading.Thread(target=self._worker, args=(pages, results, pool), daemon=True)
+                    for _ in range(self.workers)]
+
+        writer = self.stats[2]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        # Les résultats arrivent dans le désordre : ils attendent leur tour dans pending
+        pending = {}
+        next_index = 0
+        running = self.workers
+        try:
+            while next_index < len(items):
+                start = time.perf_counter()
+                while next_index not in pending:
+                    message = results.get()
+                    if message is _DONE:
+                        running -= 1
+                        if running == 0 and next_index not in pending:
+                            raise RuntimeError("pipeline workers stopped before all results were written")
+                        continue
+                    pending[message[0]] = message[1]
+                resumed = time.perf_counter()
+                writer.add(starved=resumed - start)
+
+                yield pending.pop(next_index)
+                next_index += 1
+                writer.add(busy=time.perf_counter() - resumed, items=1)
+        finally:
+            stop.set()
+            # Débloque le lecteur et les workers si l'écrivain s'arrête avant la fin
+            for q in (pages, results):
+                try:
+                    while True:
+                        q.get_nowait()
+                except queue.Empty:
+                    pass
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            self.elapsed = time.perf_counter() - started
+
+    def report(self):
+        """Affiche le temps de travail et d'attente de chaque étape."""
+        print(f"{'='*70}")
+        mode = f"{self.workers} {'process' if self.processes else 'thread'} worker(s)"
+        print(f"Pipeline: {mode}, queue depth {self.queue_depth}, {self.elapsed:.2f}s wall time")
+        print(f"{'='*70}")
+        print(f"{'Stage':<8}{'Items':>8}{'Busy (s)':>12}{'Waiting input (s)':>20}{'Waiting output (s)':>21}")
+        for stats in self.stats:
+            print(f"{stats.name:<8}{stats.items:>8}{stats.busy:>12.3f}{stats.starved:>20.3f}{stats.blocked:>21.3f}")
+        print(f"{'='*70}")
+        if self.workers > 1:
+            print(f"Worker times are summed over the {self.workers} workers.")
+
+def _extract(extract, item):
+    try:
+        return Result(item, extract(item), None)
+    except Exception as e:
+        return Result(item, None, e)
+
+def run_extractions(items, extract, cache=None, pipeline=None, cacheable=None):
+    """Génère un Result par élément, dans l'ordre, en n'analysant que les pages absentes du cache.
+
+    Sans pipeline, extract(item) est appelé en série ; sinon les pages à analyser passent par
+    pipeline.run(). cacheable(value) indique si un résultat doit être mis en cache.
+    """
+    lookups = []
+    for item in items:
+        if cache is None:
+            lookups.append((item, None, False, None))
+            continue
+        try:
+            lookups.append((item,) + cache.lookup(item))
+        except OSError:
+            # Fichier illisible : l'extraction rapportera l'erreur
+            lookups.append((item, None, False, None))
+
+    pending = [item for item, _, found, _ in lookups if not found]
+    if pipeline is not None:
+        fresh = pipeline.run(pending)
+    else:
+        fresh = (_extract(extract, item) for item in pending)
+
+    for item, digest, found, value in lookups:
+        error = None
+        if not found:
+            _, value, error = next(fresh)
+            if digest is not None and error is None and (cacheable is None or cacheable(value)):
+                cache.store(item, digest, value)
+        yield Result(item, value, error)
+
+    # Laisse le pipeline se terminer : ses statistiques sont complètes à la fin de run()
+    for _ in fresh:
+        pass
@@ -4,23 +4,49 @@ Utilitaire de recherche et filtrage des endpoints KIE API.
 Permet de trouver rapidement des endpoints par catégorie, modèle, paramètres, etc.
 """
 
-import json
 import sys
 from pathlib import Path
 
-def load_mapping():
-    """Charge le fichier de mapping JSON."""
-    mapping_file = Path(__file__).parent / 'api-endpoints-mapping.json'
-    with open(mapping_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+import binary_catalog
+import catalog_store
+import search_server
+import search_index
+import source_stamp
+import batch_search
+import filter_query
+
+BACKENDS = ('json', 'sqlite', 'server')
+MAPPING_FILE = Path(__file__).parent / 'api-endpoints-mapping.json'
+COMMANDS = ('search', 'category', 'model', 'name', 'text', 'param', 'filter', 'explain',
+            'list-models', 'list-params', 'stats', 'serve', 'batch')
+
+def load_mapping(backend='json', socket_path=search_server.SOCKET_PATH):
+    """Charge le mapping : le catalogue binaire s'il est à jour (lu à la demande), sinon le JSON.
+
+    Avec le backend sqlite, retourne la base indexée (reconstruite si le JSON est plus récent) ;
+    avec le backend server, un client du serveur lancé par la commande serve.
+    """
+    if backend == 'sqlite':
+        return catalog_store.open_store(MAPPING_FILE)
+    if backend == 'server':
+        return search_server.SearchClient(socket_path)
+    return binary_catalog.load_mapping(MAPPING_FILE)
+
+def is_store(data):
+    """True si data fait les recherches lui-même (base SQLite, serveur, index en mémoire) au lieu d'être parcouru."""
+    return isinstance(data, (catalog_store.CatalogStore, search_server.SearchClient, search_server.CatalogIndex))
 
 def search_by_category(data, category):
     """Recherche par catégorie."""
+    if is_store(data):
+        return data.search_by_category(category)
     results = [ep for ep in data['endpoints'] if ep['category'] == category.lower()]
     return results
 
 def search_by_model(data, model_query):
     """Recherche par modèle."""
+    if is_store(data):
+        return data.search_by_model(model_query)
     results = [
         ep for ep in data['endpoints']
         if any(model_query.lower() in model.lower() for model in ep['modelIds'])
@@ -29,22 +55,72 @@ def search_by_model(data, model_query):
 
 def search_by_name(data, name_query):
     """Recherche par nom."""
+    if is_store(data):
+        return data.search_by_name(name_query)
     results = [
         ep for ep in data['endpoints']
         if name_query.lower() in ep['name'].lower()
     ]
     return results
 
+def search_by_text(data, query):
+    """Recherche dans les noms et les descriptions (endpoint et paramètres)."""
+    if is_store(data):
+        return data.search_by_text(query)
+    query = query.lower()
+    results = [
+        ep for ep in data['endpoints']
+        if query in ep['name'].lower() or query in catalog_store.endpoint_description(ep).lower()
+    ]
+    return results
+
 def search_by_parameter(data, param_name):
     """Recherche par paramètre."""
+    if is_store(data):
+        return data.search_by_parameter(param_name)
     results = [
         ep for ep in data['endpoints']
         if param_name in ep['parameters']['required'] or param_name in ep['parameters']['optional']
     ]
     return results
 
+def search_ranked(data, query, top=search_index.TOP_K):
+    """Recherche classée par pertinence (trigrammes + BM25F), tolérante aux fautes de frappe.
+
+    Retourne [(endpoint, score)] ; l'index est lu à côté du mapping (reconstruit s'il est périmé).
+    """
+    if isinstance(data, (search_server.SearchClient, search_server.CatalogIndex)):
+        return [tuple(hit) for hit in data.search_ranked(query, top)]
+    with search_index.open_index(MAPPING_FILE) as index:
+        hits = index.search(query, top)
+    if isinstance(data, catalog_store.CatalogStore):
+        endpoints = data.endpoints_at(i for i, _ in hits)
+    else:
+        endpoints = [data['endpoints'][i] for i, _ in hits]
+    return [(ep, score) for ep, (_, score) in zip(endpoints, hits)]
+
+def filter_index(data):
+    """Index du langage de filtres ; gardé par la base ou l'index en mémoire, sinon construit pour la requête."""
+    if isinstance(data, (catalog_store.CatalogStore, search_server.CatalogIndex)):
+        return data.filter_index()
+    return filter_query.FilterIndex(data['endpoints'])
+
+def filter_endpoints(data, expression):
+    """Recherche par expression de filtre (voir filter_query.py) ; lève FilterError si elle est invalide."""
+    if isinstance(data, search_server.SearchClient):
+        return data.filter_endpoints(expression)
+    return filter_index(data).run(expression)
+
+def explain_filter(data, expression):
+    """Plan d'exécution d'une expression de filtre, ligne par ligne."""
+    if isinstance(data, search_server.SearchClient):
+        return data.explain_filter(expression)
+    return filter_index(data).explain(expression)
+
 def list_all_models(data):
     """Liste tous les modèles uniques."""
+    if is_store(data):
+        return data.list_all_models()
     models = set()
     for ep in data['endpoints']:
         models.update(ep['modelIds'])
@@ -52,12 +128,25 @@ def list_all_models(data):
 
 def list_all_parameters(data):
     """Liste tous les paramètres uniques."""
+    if is_store(data):
+        return data.list_all_parameters()
     params = set()
     for ep in data['endpoints']:
         params.update(ep['parameters']['required'].keys())
         params.update(ep['parameters']['optional'].keys())
     return sorted(list(params))
 
+# Commandes acceptées par le mode batch
+BATCH_COMMANDS = {
+    'category': search_by_category,
+    'model': search_by_model,
+    'name': search_by_name,
+    'text': search_by_text,
+    'param': search_by_parameter,
+    'search': search_ranked,
+    'filter': filter_endpoints,
+}
+
 def display_endpoint(ep, detailed=False):
     """Affiche un endpoint."""
     req_count = len(ep['parameters']['required'])
@@ -87,28 +176,72 @@ def display_endpoint(ep, detailed=False):
                 example = f" (ex: {info['example']})" if info.get('example') else ""
                 print(f"     - {param}: {info['type']}{example}")
 
+def pop_option(argv, name, default):
+    """Retire `name <valeur>` des arguments ; retourne (valeur, arguments restants)."""
+    argv = list(argv)
+    value = default
+    if name in argv:
+        i = argv.index(name)
+        value = argv[i + 1] if i + 1 < len(argv) else ''
+        del argv[i:i + 2]
+    return value, argv
+
 def main():
     """Fonction principale CLI."""
-    data = load_mapping()
+    backend, argv = pop_option(sys.argv, '--backend', 'json')
+    socket_path, argv = pop_option(argv, '--socket', search_server.SOCKET_PATH)
+    top, argv = pop_option(argv, '--top', str(search_index.TOP_K))
+    if backend not in BACKENDS:
+        print(f"Error: --backend must be one of: {', '.join(BACKENDS)}")
+        return 1
 
-    if len(sys.argv) < 2:
-        print("Usage: python search_endpoints.py <command> [args]")
+    if len(argv) < 2:
+        print("Usage: python search_endpoints.py [--backend json|sqlite|server] [--socket PATH] [--top K] <command> [args]")
         print("\nCommands:")
+        print("  search <query>        - Ranked fuzzy search (name, models, path, category, params)")
         print("  category <name>       - Search by category (image|video|audio|chat)")
         print("  model <query>         - Search by model name")
         print("  name <query>          - Search by endpoint name")
+        print("  text <query>          - Search names and descriptions")
         print("  param <param_name>    - Search by parameter")
+        print("  filter <expression>   - Filter with an expression (and/or/not, sort by, limit)")
+        print("  explain <expression>  - Show the plan chosen for a filter expression")
         print("  list-models           - List all unique models")
         print("  list-params           - List all unique parameters")
         print("  stats                 - Show statistics")
+        print("  serve                 - Serve queries on a Unix socket for --backend server")
+        print("  batch [file] [--full] - Run one query per line (stdin by default), print JSONL")
         print("\nExamples:")
+        print("  python search_endpoints.py search kling2.1")
         print("  python search_endpoints.py category video")
         print("  python search_endpoints.py model wan")
         print("  python search_endpoints.py name 'Image to Video'")
         print("  python search_endpoints.py param prompt")
+        print("  python search_endpoints.py filter 'category = video and param = image_url and credits < 100'")
+        print("  python search_endpoints.py explain 'model ~ kling and not required = image_url'")
+        print("  python search_endpoints.py --backend sqlite model wan")
+        print("  python search_endpoints.py --backend server model wan")
+        print("  python search_endpoints.py batch queries.txt > results.jsonl")
         return
 
-    command = sys.argv[1].lower()
+    # Commande vérifiée avant le chargement : pas de connexion au serveur pour une faute de frappe
+    command = argv[1].lower()
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}")
+        print("Run without arguments to see usage.")
+        return 1
+
+    if command == 'serve':
+        return search_server.serve(socket_path)
+
+    # Empreinte prise avant le chargement, pour l'index classé du batch (voir search_server.index_mapping)
+    mapping_source = source_stamp.stamp(MAPPING_FILE) if command == 'batch' and backend == 'json' else None
+    try:
+        data = load_mapping(backend, socket_path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        print(f"Error: no server listening on {socket_path}")
+        print("Start one with: python search_endpoints.py serve")
+        return 1
 
     if command == 'stats':
         print("="*70)
@@ -124,41 +257,78 @@ def main():
         for param, count in list(data['most_common_parameters'].items())[:15]:
             print(f"  {param:20s} : {count:3d} endpoints")
 
+    elif command == 'search':
+        if len(argv) < 3:
+            print("Error: Please specify a search query")
+            return
+        if not top.isdigit() or int(top) < 1:
+            print("Error: --top must be a positive integer")
+            return
+        query = ' '.join(argv[2:])
+        results = search_ranked(data, query, int(top))
+        print(f"\n Top {len(results)} endpoints for '{query}':\n")
+        for rank, (ep, score) in enumerate(results, 1):
+            print(f"\n#{rank}  score {score:.2f}", end='')
+            display_endpoint(ep)
+
+    elif command == 'batch':
+        full = '--full' in argv
+        args = [arg for arg in argv[2:] if arg != '--full']
+        # Backend json : le mapping déjà chargé est indexé en mémoire une fois pour tout le batch
+        catalog = search_server.index_mapping(data, mapping_source, MAPPING_FILE) if backend == 'json' else data
+        source = args[0] if args else '-'
+        if source == '-':
+            stats = batch_search.run_batch(catalog, sys.stdin, sys.stdout, BATCH_COMMANDS, full)
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                stats = batch_search.run_batch(catalog, f, sys.stdout, BATCH_COMMANDS, full)
+        batch_search.print_stats(stats)
+
     elif command == 'category':
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Error: Please specify a category (image|video|audio|chat|other)")
             return
-        category = sys.argv[2]
+        category = argv[2]
         results = search_by_category(data, category)
         print(f"\n Found {len(results)} endpoints in category '{category}':\n")
         for ep in results:
             display_endpoint(ep)
 
     elif command == 'model':
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Error: Please specify a model query")
             return
-        query = sys.argv[2]
+        query = argv[2]
         results = search_by_model(data, query)
         print(f"\n Found {len(results)} endpoints with model matching '{query}':\n")
         for ep in results:
             display_endpoint(ep, detailed=True)
 
     elif command == 'name':
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Error: Please specify a name query")
             return
-        query = ' '.join(sys.argv[2:])
+        query = ' '.join(argv[2:])
         results = search_by_name(data, query)
         print(f"\n Found {len(results)} endpoints matching '{query}':\n")
         for ep in results:
             display_endpoint(ep, detailed=True)
 
+    elif command == 'text':
+        if len(argv) < 3:
+            print("Error: Please specify a text query")
+            return
+        query = ' '.join(argv[2:])
+        results = search_by_text(data, query)
+        print(f"\n Found {len(results)} endpoints mentioning '{query}':\n")
+        for ep in results:
+            display_endpoint(ep)
+
     elif command == 'param':
-        if len(sys.argv) < 3:
+        if len(argv) < 3:
             print("Error: Please specify a parameter name")
             return
-        param = sys.argv[2]
+        param = argv[2]
         results = search_by_parameter(data, param)
         print(f"\n Found {len(results)} endpoints with parameter '{param}':\n")
         for ep in results[:10]:  # Limit to 10
@@ -166,6 +336,23 @@ def main():
         if len(results) > 10:
             print(f"\n   ... and {len(results) - 10} more")
 
+    elif command in ('filter', 'explain'):
+        if len(argv) < 3:
+            print("Error: Please specify a filter expression")
+            return
+        expression = ' '.join(argv[2:])
+        try:
+            if command == 'explain':
+                print('\n'.join(explain_filter(data, expression)))
+                return
+            results = filter_endpoints(data, expression)
+        except filter_query.FilterError as e:
+            print(f"Error: {e}")
+            return
+        print(f"\n Found {len(results)} endpoints for '{expression}':\n")
+        for ep in results:
+            display_endpoint(ep)
+
     elif command == 'list-models':
         models = list_all_models(data)
         print(f"\n Found {len(models)} unique models:\n")
@@ -178,9 +365,5 @@ def main():
         for i, param in enumerate(params, 1):
             print(f"  {i:3d}. {param}")
 
-    else:
-        print(f"Unknown command: {command}")
-        print("Run without arguments to see usage.")
-
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Recherche classée et tolérante aux fautes dans les endpoints KIE API (trigrammes + BM25F).
+Chaque champ indexé (nom, modelIds, chemin, catégorie, capability, noms des paramètres) est
+découpé en trigrammes de mots ; le score BM25F de chaque (trigramme, endpoint) est calculé à la
+construction. Une requête comme "kling2.1" partage la plupart de ses trigrammes avec
+"kling-v2.1" et le retrouve sans correspondance exacte.
+
+L'index est écrit à côté du mapping (api-endpoints-search.idx) et lu par mmap : les postings de
+chaque trigramme sont triés par score décroissant, ce qui permet d'arrêter la recherche des k
+meilleurs dès qu'aucun endpoint non vu ne peut plus les dépasser (algorithme à seuil de Fagin).
+Les listes sont lues par blocs de rangs ; le score d'un endpoint rencontré est lu dans son
+vecteur de trigrammes (trié, parcouru par dichotomie), stocké dans le même fichier, et abandonné
+dès qu'il ne peut plus entrer dans les k meilleurs. Aucune table n'est construite à la requête.
+L'en-tête enregistre l'empreinte du mapping indexé (voir source_stamp) ; l'index est reconstruit
+quand le mapping change.
+
+Latence : une requête sélective ("kling2.1") lit quelques dizaines d'endpoints et répond en
+moins d'une milliseconde à 100k endpoints. Une requête large ("image to video") sur un
+catalogue de copies quasi identiques doit départager des dizaines de milliers d'ex aequo avant
+que le seuil ne l'arrête (23 500 pour "image to video" sur le benchmark) : elle reste exacte
+mais se compte en dizaines de millisecondes.
+
+Disposition du fichier :
+    préambule | en-tête JSON (paramètres, {trigramme: [position, nombre]}) | bourrage |
+    ids d'endpoints (u32 * n) | scores (f32 * n) |
+    débuts des vecteurs (u32 * (endpoints + 1)) | trigrammes (u32 * n) | scores (f32 * n)
+Dans les vecteurs, un trigramme est désigné par la position de ses postings.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import mmap
+import time
+import heapq
+import struct
+import argparse
+import statistics
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+
+import source_stamp
+
+MAGIC = b'KSRC'
+INDEX_VERSION = 2
+INDEX_SUFFIX = '-search.idx'
+MAPPING_FILE = Path(__file__).parent / 'api-endpoints-mapping.json'
+TOP_K = 10
+
+PREAMBLE = struct.Struct('<4sHHI')
+
+# Poids BM25F de chaque champ indexé
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'modelIds': 3.0,
+    'endpoint': 1.5,
+    'category': 1.0,
+    'capability': 1.0,
+    'parameters': 1.0,
+}
+K1 = 1.2
+B = 0.75
+
+# Rangs lus au plus par tour dans chaque liste de postings
+MAX_BLOCK = 256
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+def index_path(mapping_file):
+    """api-endpoints-mapping.json -> api-endpoints-search.idx, dans le même dossier."""
+    mapping_file = Path(mapping_file)
+    stem = mapping_file.stem[:-len('-mapping')] if mapping_file.stem.endswith('-mapping') else mapping_file.stem
+    return mapping_file.with_name(stem + INDEX_SUFFIX)
+
+def field_text(ep, field):
+    """Texte d'un champ indexé d'un endpoint."""
+    if field == 'modelIds':
+        return ' '.join(ep.get('modelIds') or [])
+    if field == 'parameters':
+        parameters = ep.get('parameters') or {}
+        return ' '.join([*parameters.get('required', {}), *parameters.get('optional', {})])
+    return ep.get(field) or ''
+
+def trigrams(text):
+    """Trigrammes des mots de text en minuscules, bornés par $ ("v2" -> $v2, v2$)."""
+    grams = []
+    for word in WORD_RE.findall(text.lower()):
+        padded = f"${word}$"
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def build_postings(endpoints):
+    """Retourne {trigramme: (ids, scores)}, postings triés par score décroissant puis par id."""
+    count = len(endpoints)
+    # Les mêmes textes reviennent souvent (noms de paramètres, catégories) : découpés une fois
+    counted = {}
+
+    def field_counts(text):
+        counts = counted.get(text)
+        if counts is None:
+            grams = trigrams(text)
+            counts = counted[text] = (Counter(grams), len(grams))
+        return counts
+
+    fields = [(field, weight, [field_counts(field_text(ep, field)) for ep in endpoints])
+              for field, weight in FIELD_WEIGHTS.items()]
+    averages = {field: (sum(length for _, length in docs) / count if count else 0) or 1
+                for field, _, docs in fields}
+
+    docs = {}
+    frequencies = {}
+    for i in range(count):
+        combined = {}
+        for field, weight, field_docs in fields:
+            counts, length = field_docs[i]
+            if not length:
+                continue
+            norm = weight / (1 - B + B * length / averages[field])
+            for gram, tf in counts.items():
+                combined[gram] = combined.get(gram, 0.0) + tf * norm
+        for gram, tf in combined.items():
+            if gram not in docs:
+                docs[gram] = array('I')
+                frequencies[gram] = array('f')
+            docs[gram].append(i)
+            frequencies[gram].append(tf)
+
+    postings = {}
+    for gram, ids in docs.items():
+        idf = math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+        scored = sorted(((-idf * tf * (K1 + 1) / (K1 + tf), i) for tf, i in zip(frequencies[gram], ids)))
+        postings[gram] = (array('I', [i for _, i in scored]), array('f', [-score for score, _ in scored]))
+    return postings
+
+def write_index(endpoints, path, source=None):
+    """Construit et écrit l'index d'une liste d'endpoints ; retourne la taille du fichier.
+
+    source est l'empreinte du fichier de mapping (source_stamp.stamp), enregistrée dans l'en-tête.
+    """
+    postings = build_postings(endpoints)
+    terms = {}
+    position = 0
+    for gram in sorted(postings):
+        terms[gram] = [position, len(postings[gram][0])]
+        position += len(postings[gram][0])
+
+    header = json.dumps({
+        "version": INDEX_VERSION,
+        "endpoint_count": len(endpoints),
+        "source": source,
+        "fields": FIELD_WEIGHTS,
+        "k1": K1,
+        "b": B,
+        "postings": position,
+        "terms": terms,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-(PREAMBLE.size + len(header)) % 4)
+
+    ids = array('I')
+    scores = array('f')
+    for gram in sorted(postings):
+        ids.extend(postings[gram][0])
+        scores.extend(postings[gram][1])
+
+    # Vecteurs par endpoint, remplis dans l'ordre des trigrammes : chacun est donc déjà trié
+    starts = array('I', bytes(4 * (len(endpoints) + 1)))
+    for i in ids:
+        starts[i + 1] += 1
+    for i in range(len(endpoints)):
+        starts[i + 1] += starts[i]
+    fill = array('I', starts)
+    vector_grams = array('I', bytes(4 * position))
+    vector_scores = array('f', bytes(4 * position))
+    for gram, (start, _) in terms.items():
+        for i, score in zip(*postings[gram]):
+            slot = fill[i]
+            vector_grams[slot] = start
+            vector_scores[slot] = score
+            fill[i] = slot + 1
+
+    sections = (ids, scores, starts, vector_grams, vector_scores)
+    if sys.byteorder == 'big':
+        for section in sections:
+            section.byteswap()
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, INDEX_VERSION, 0, len(header)))
+        f.write(header)
+        for section in sections:
+            section.tofile(f)
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+class SearchIndex:
+    """Index ouvert par mmap ; search() retourne les k meilleurs (id d'endpoint, score)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < PREAMBLE.size:
+                raise ValueError(f"{self.path}: empty or truncated search index")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, header_size = PREAMBLE.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != INDEX_VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path}: not a search index (version {INDEX_VERSION})")
+        try:
+            header = json.loads(self._mm[PREAMBLE.size:PREAMBLE.size + header_size])
+        except ValueError:
+            self._mm.close()
+            raise ValueError(f"{self.path}: truncated search index") from None
+        self.endpoint_count = header["endpoint_count"]
+        self.source = header.get("source")
+        self.terms = header["terms"]
+        total = header["postings"]
+        layout = [('I', total), ('f', total), ('I', self.endpoint_count + 1), ('I', total), ('f', total)]
+        start = PREAMBLE.size + header_size
+        if len(self._mm) != start + 4 * sum(count for _, count in layout):
+            self._mm.close()
+            raise ValueError(f"{self.path}: truncated search index")
+        self._sections = []
+        for typecode, count in layout:
+            self._sections.append(self._section(start, typecode, count))
+            start += 4 * count
+        self._ids, self._scores, self._vector_starts, self._vector_grams, self._vector_scores = self._sections
+
+    def _section(self, start, typecode, count):
+        if sys.byteorder == 'little':
+            return memoryview(self._mm)[start:start + 4 * count].cast(typecode)
+        section = array(typecode, self._mm[start:start + 4 * count])
+        section.byteswap()
+        return section
+
+    def close(self):
+        for section in self._sections:
+            if isinstance(section, memoryview):
+                section.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def postings(self, gram):
+        """(ids, scores) d'un trigramme, triés par score décroissant."""
+        start, count = self.terms[gram]
+        return self._ids[start:start + count], self._scores[start:start + count]
+
+    def search(self, query, top=TOP_K):
+        """Les top meilleurs (id, score) pour query, par score décroissant puis par id."""
+        weights = {gram: weight for gram, weight in Counter(trigrams(query)).items() if gram in self.terms}
+        if not weights or top <= 0:
+            return []
+        lists = [(self.terms[gram][0], weight, *self.postings(gram)) for gram, weight in weights.items()]
+        starts, vector_grams, vector_scores = self._vector_starts, self._vector_grams, self._vector_scores
+
+        best = []  # tas des top meilleurs (score, -id)
+        seen = set()
+        depth = 0
+        block = 1
+        while True:
+            # Un endpoint absent des rangs 0..depth-1 a au plus caps[j] dans la liste j, et au plus
+            # threshold en tout : les top meilleurs sont trouvés quand le k-ième le dépasse
+            caps = [weight * scores[depth] if depth < len(ids) else 0.0 for _, weight, ids, scores in lists]
+            threshold = sum(caps)
+            floor = best[0][0] if len(best) == top else None
+            if (floor is not None and floor > threshold) or not any(caps):
+                break
+            # Rangs depth..depth+block-1 de toutes les listes d'un coup ; le bloc double à chaque tour
+            # Trigrammes au plus gros cap vérifiés d'abord : le majorant baisse plus vite
+            order = sorted(((position, weight, cap) for (position, weight, _, _), cap in zip(lists, caps)),
+                           key=lambda item: -item[2])
+            fresh = set()
+            for _, _, ids, _ in lists:
+                fresh.update(ids[depth:depth + block])
+            fresh -= seen
+            seen |= fresh
+            depth += block
+            block = min(2 * block, MAX_BLOCK)
+            for doc in fresh:
+                # Score lu dans le vecteur de l'endpoint ; abandonné dès que son majorant (scores lus
+                # plus caps restants) passe sous le k-ième meilleur
+                low, high = starts[doc], starts[doc + 1]
+                score = 0.0
+                bound = threshold
+                for gram_position, gram_weight, cap in order:
+                    i = bisect_left(vector_grams, gram_position, low, high)
+                    if i < high and vector_grams[i] == gram_position:
+                        value = gram_weight * vector_scores[i]
+                        score += value
+                        bound += value - cap
+                    else:
+                        bound -= cap
+                    if floor is not None and bound < floor - 1e-9:
+                        break
+                else:
+                    if len(best) < top:
+                        heapq.heappush(best, (score, -doc))
+                    elif (score, -doc) > best[0]:
+                        heapq.heapreplace(best, (score, -doc))
+                    if len(best) == top:
+                        floor = best[0][0]
+        return [(-neg_doc, score) for score, neg_doc in sorted(best, reverse=True)]
+
+def open_fresh(path, mapping_file):
+    """Index ouvert s'il est complet et construit à partir du mapping actuel, sinon None."""
+    try:
+        index = SearchIndex(path)
+    except (OSError, ValueError):
+        return None
+    if source_stamp.matches(index.source, mapping_file):
+        return index
+    index.close()
+    return None
+
+def is_fresh(path, mapping_file):
+    """True si l'index existe, est complet et correspond au contenu du mapping."""
+    index = open_fresh(path, mapping_file)
+    if index is None:
+        return False
+    index.close()
+    return True
+
+def _open_built_from(path, source):
+    """Index ouvert s'il est complet et construit à partir du contenu décrit par source, sinon None."""
+    try:
+        index = SearchIndex(path)
+    except (OSError, ValueError):
+        return None
+    # Sans empreinte (mapping absent à la lecture), l'index déployé seul fait foi
+    if source is None or (index.source or {}).get("sha256") == source["sha256"]:
+        return index
+    index.close()
+    return None
+
+def open_index(mapping_file, endpoints=None, source=None):
+    """Ouvre l'index d'un mapping, reconstruit d'abord s'il manque, est périmé ou ne correspond pas.
+
+    Si l'appelant a déjà lu endpoints, source est l'empreinte du mapping (source_stamp.stamp)
+    prise avant cette lecture : l'index doit décrire ces endpoints, pas le mapping actuel.
+    """
+    path = index_path(mapping_file)
+    if endpoints is None:
+        index = open_fresh(path, mapping_file)
+        if index is not None:
+            return index
+        # Empreinte prise avant la lecture : un mapping modifié entre-temps rendra l'index périmé
+        source = source_stamp.stamp(mapping_file)
+        with open(mapping_file, 'r', encoding='utf-8') as f:
+            endpoints = json.load(f).get('endpoints', [])
+    else:
+        index = _open_built_from(path, source)
+        if index is not None:
+            if index.endpoint_count == len(endpoints):
+                return index
+            index.close()
+    write_index(endpoints, path, source)
+    return SearchIndex(path)
+
+BENCHMARK_QUERIES = ['kling2.1', 'image to video', 'veo3 fast', 'aspectratio', 'suno v4', 'flux kontext']
+
+def benchmark(mapping_file, target=100_000, top=TOP_K, repeat=50):
+    """Construction, taille, ouverture et latence des requêtes pour un catalogue d'environ target endpoints."""
+    import tempfile
+    import catalog_store
+
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    factor = max(1, round(target / max(1, len(data['endpoints']))))
+    endpoints = catalog_store.scale_mapping(data, factor)['endpoints']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / ('scaled' + INDEX_SUFFIX)
+        start = time.perf_counter()
+        size = write_index(endpoints, path)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = SearchIndex(path)
+        open_seconds = time.perf_counter() - start
+
+        print(f"{'='*70}")
+        print(f"{len(endpoints)} endpoints ({factor}x), {len(index.terms)} trigrams, {size / 1e6:.1f} MB")
+        print(f"Build {build_seconds:.1f} s, open {open_seconds * 1000:.2f} ms")
+        print(f"{'='*70}")
+        print(f"{'Query':<20}{'First (ms)':>12}{'Median (ms)':>13}{'p95 (ms)':>10}  Top result")
+        with index:
+            for query in BENCHMARK_QUERIES:
+                start = time.perf_counter()
+                hits = index.search(query, top)
+                first = time.perf_counter() - start
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    index.search(query, top)
+                    times.append(time.perf_counter() - start)
+                times.sort()
+                name = endpoints[hits[0][0]]['name'] if hits else '-'
+                print(f"{query:<20}{first * 1000:>12.3f}{statistics.median(times) * 1000:>13.3f}"
+                      f"{times[int(len(times) * 0.95) - 1] * 1000:>10.3f}  {name[:30]}")
+        print(f"{'='*70}")
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="KIE API ranked trigram/BM25 endpoint search index")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="construit l'index à côté du mapping")
+    build.add_argument('mapping', type=Path, nargs='?', default=MAPPING_FILE)
+    bench = sub.add_parser('benchmark', help="latence des requêtes sur un catalogue agrandi")
+    bench.add_argument('mapping', type=Path, nargs='?', default=MAPPING_FILE)
+    bench.add_argument('--endpoints', type=int, default=100_000, help="taille visée du catalogue agrandi")
+    bench.add_argument('--top', type=int, default=TOP_K, help="nombre de résultats par requête")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+
+    if args.command == 'build':
+        source = source_stamp.stamp(args.mapping)
+        with open(args.mapping, 'r', encoding='utf-8') as f:
+            endpoints = json.load(f).get('endpoints', [])
+        path = index_path(args.mapping)
+        size = write_index(endpoints, path, source)
+        with SearchIndex(path) as index:
+            print(f"✓ {len(endpoints)} endpoints, {len(index.terms)} trigrams -> {path} ({size / 1024:.1f} KB)")
+        return 0
+
+    benchmark(args.mapping, args.endpoints, args.top)
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
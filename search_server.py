@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Serveur de requêtes de search_endpoints.py, chaud en mémoire, sur une socket Unix.
+Le mapping est chargé une fois et indexé (bitmaps des catégories, paramètres et modelIds,
+noms en minuscules) ; chaque requête est une ligne JSON {"method": ..., "args": [...]} et chaque
+réponse une ligne JSON {"ok": true, "result": ...}. Quand api-endpoints-mapping.json change,
+un nouvel index est construit à côté puis remplace l'ancien d'un coup : les requêtes en
+cours finissent sur l'index qu'elles ont pris, et l'ancien est fermé (mmap de l'index classé
+compris) quand la dernière se termine.
+"""
+
+import os
+import json
+import time
+import signal
+import socket
+import tempfile
+import threading
+import socketserver
+from collections.abc import Mapping
+from pathlib import Path
+
+import catalog_store
+import search_index
+import source_stamp
+import filter_query
+from endpoint_bitmaps import BitmapIndex, members
+
+MAPPING_FILE = Path(__file__).parent / 'api-endpoints-mapping.json'
+SOCKET_PATH = Path(os.environ.get('KIE_SEARCH_SOCKET') or Path(tempfile.gettempdir()) / 'kie-search-endpoints.sock')
+POLL_SECONDS = 1.0
+
+# Méthodes de CatalogIndex appelables par les clients
+METHODS = (
+    'search_by_category',
+    'search_by_model',
+    'search_by_name',
+    'search_by_text',
+    'search_by_parameter',
+    'list_all_models',
+    'list_all_parameters',
+    'search_ranked',
+    'filter_endpoints',
+    'explain_filter',
+    'header',
+)
+
+class CatalogIndex:
+    """Index en mémoire d'un mapping ; mêmes résultats et même ordre que les recherches sur le JSON."""
+
+    def __init__(self, data, ranked=None):
+        endpoints = data.get('endpoints', [])
+        self.endpoints = endpoints
+        self.ranked = ranked
+        # Requêtes en cours sur cet index, comptées par SearchServer (fermé à 0 une fois remplacé)
+        self.in_flight = 0
+        self._filter = None
+        self._header = {key: value for key, value in data.items() if key != 'endpoints'}
+        self.bitmaps = BitmapIndex(endpoints)
+
+        # Minuscules calculées une fois, pas à chaque requête
+        self._names = [ep.get('name', '').lower() for ep in endpoints]
+        self._texts = [catalog_store.endpoint_description(ep).lower() for ep in endpoints]
+        self._models = self.bitmaps.distinct('model')
+        self._parameters = self.bitmaps.distinct('param')
+
+    def endpoints_of(self, bitmap):
+        return [self.endpoints[i] for i in members(bitmap)]
+
+    def search_by_category(self, category):
+        return self.endpoints_of(self.bitmaps.bitmap('category', category.lower()))
+
+    def search_by_model(self, model_query):
+        model_query = model_query.lower()
+        return self.endpoints_of(self.bitmaps.matching('model_lower', lambda model: model_query in model))
+
+    def search_by_name(self, name_query):
+        name_query = name_query.lower()
+        return [ep for ep, name in zip(self.endpoints, self._names) if name_query in name]
+
+    def search_by_text(self, query):
+        query = query.lower()
+        return [ep for ep, name, text in zip(self.endpoints, self._names, self._texts)
+                if query in name or query in text]
+
+    def search_by_parameter(self, param_name):
+        return self.endpoints_of(self.bitmaps.bitmap('param', param_name))
+
+    def list_all_models(self):
+        return self._models
+
+    def list_all_parameters(self):
+        return self._parameters
+
+    def search_ranked(self, query, top=search_index.TOP_K):
+        if self.ranked is None:
+            raise ValueError("no ranked search index loaded")
+        return [[self.endpoints[i], score] for i, score in self.ranked.search(query, top)]
+
+    def filter_index(self):
+        # Construit à la première expression de filtre seulement
+        if self._filter is None:
+            self._filter = filter_query.FilterIndex(self.endpoints, self.bitmaps)
+        return self._filter
+
+    def filter_endpoints(self, expression):
+        return self.filter_index().run(expression)
+
+    def explain_filter(self, expression):
+        return self.filter_index().explain(expression)
+
+    def header(self):
+        return self._header
+
+    def close(self):
+        if self.ranked is not None:
+            self.ranked.close()
+
+def _signature(path):
+    """(mtime, taille) du fichier, ou None s'il n'existe pas."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def index_mapping(data, source, mapping_file=MAPPING_FILE):
+    """CatalogIndex d'un mapping déjà chargé, avec l'index classé de mapping_file.
+
+    source est l'empreinte du mapping prise avant la lecture de data (source_stamp.stamp).
+    """
+    # L'index classé est relu depuis le disque s'il est à jour (l'ancien reste ouvert pour les requêtes en cours)
+    return CatalogIndex(data, search_index.open_index(mapping_file, data.get('endpoints', []), source))
+
+def load_index(mapping_file):
+    # Empreinte prise avant la lecture : un mapping réécrit entre-temps rendra l'index périmé
+    source = source_stamp.stamp(mapping_file)
+    with open(mapping_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return index_mapping(data, source, mapping_file)
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Une connexion : autant de requêtes (une par ligne) que le client en envoie."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            # L'index est pris une fois par requête : un rechargement ne la coupe pas
+            index = self.server.acquire_index()
+            try:
+                request = json.loads(line)
+                method = request.get('method')
+                if method not in METHODS:
+                    raise ValueError(f"unknown method: {method!r}")
+                response = {"ok": True, "result": getattr(index, method)(*request.get('args', []))}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            finally:
+                self.server.release_index(index)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+class SearchServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serveur multithread ; server.index est remplacé en bloc par le rechargement."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, mapping_file, poll=POLL_SECONDS):
+        self.mapping_file = Path(mapping_file)
+        self.poll = poll
+        self.generation = 1
+        self._signature = _signature(self.mapping_file)
+        self.index = load_index(self.mapping_file)
+        self._index_lock = threading.Lock()
+        self._stop = threading.Event()
+        super().__init__(str(socket_path), _Handler)
+
+    def acquire_index(self):
+        """Index en service, compté comme utilisé jusqu'à release_index."""
+        with self._index_lock:
+            index = self.index
+            index.in_flight += 1
+            return index
+
+    def release_index(self, index):
+        """Fin d'une requête ; ferme l'index s'il a été remplacé et que c'était la dernière."""
+        with self._index_lock:
+            index.in_flight -= 1
+            retired = index.in_flight == 0 and index is not self.index
+        if retired:
+            index.close()
+
+    def reload_if_changed(self):
+        """Reconstruit l'index si le mapping a changé ; True si un nouvel index est en service."""
+        signature = _signature(self.mapping_file)
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            index = load_index(self.mapping_file)
+        except (OSError, ValueError) as e:
+            # Fichier en cours d'écriture : l'ancien index reste en service, nouvel essai au prochain tour
+            print(f"⚠️  Reload failed, keeping generation {self.generation}: {e}", flush=True)
+            return False
+        with self._index_lock:
+            old, self.index = self.index, index
+            retired = old.in_flight == 0
+        # Sinon la dernière requête en cours sur l'ancien index le fermera
+        if retired:
+            old.close()
+        self._signature = signature
+        self.generation += 1
+        print(f"✓ Reloaded {len(index.endpoints)} endpoints (generation {self.generation})", flush=True)
+        return True
+
+    def watch(self):
+        while not self._stop.wait(self.poll):
+            self.reload_if_changed()
+
+    def serve(self):
+        """Sert jusqu'à Ctrl+C ou SIGTERM, avec le rechargement dans un thread à part."""
+        signal.signal(signal.SIGTERM, _interrupt)
+        watcher = threading.Thread(target=self.watch, daemon=True)
+        watcher.start()
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            self.server_close()
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+def _interrupt(signum, frame):
+    # SIGTERM arrête le serveur comme Ctrl+C : la socket est supprimée en sortant
+    raise KeyboardInterrupt
+
+def _socket_in_use(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+def serve(socket_path=SOCKET_PATH, mapping_file=MAPPING_FILE, poll=POLL_SECONDS):
+    """Lance le serveur (bloquant) ; retourne 1 si un autre serveur utilise déjà la socket."""
+    socket_path = Path(socket_path)
+    if socket_path.exists():
+        if _socket_in_use(socket_path):
+            print(f"✗ A server is already listening on {socket_path}")
+            return 1
+        # Socket laissée par un serveur arrêté brutalement
+        socket_path.unlink()
+
+    start = time.perf_counter()
+    server = SearchServer(socket_path, mapping_file, poll)
+    print(f"✓ {len(server.index.endpoints)} endpoints indexed in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Listening on {socket_path} (reload on change of {mapping_file}, Ctrl+C to stop)", flush=True)
+    server.serve()
+    return 0
+
+class SearchClient(Mapping):
+    """Client du serveur ; mêmes méthodes que CatalogIndex, et se lit comme le mapping pour stats."""
+
+    def __init__(self, socket_path=SOCKET_PATH):
+        self.socket_path = Path(socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(str(self.socket_path))
+        self._reader = self._sock.makefile('rb')
+        self._header = None
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def call(self, method, *args):
+        self._sock.sendall(json.dumps({"method": method, "args": list(args)}).encode('utf-8') + b'\n')
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError(f"{self.socket_path}: server closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            if response["error"].startswith("FilterError: "):
+                raise filter_query.FilterError(response["error"][len("FilterError: "):])
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def search_by_category(self, category):
+        return self.call('search_by_category', category)
+
+    def search_by_model(self, model_query):
+        return self.call('search_by_model', model_query)
+
+    def search_by_name(self, name_query):
+        return self.call('search_by_name', name_query)
+
+    def search_by_text(self, query):
+        return self.call('search_by_text', query)
+
+    def search_by_parameter(self, param_name):
+        return self.call('search_by_parameter', param_name)
+
+    def list_all_models(self):
+        return self.call('list_all_models')
+
+    def list_all_parameters(self):
+        return self.call('list_all_parameters')
+
+    def search_ranked(self, query, top=search_index.TOP_K):
+        return [tuple(hit) for hit in self.call('search_ranked', query, top)]
+
+    def filter_endpoints(self, expression):
+        return self.call('filter_endpoints', expression)
+
+    def explain_filter(self, expression):
+        return self.call('explain_filter', expression)
+
+    @property
+    def header(self):
+        if self._header is None:
+            self._header = self.call('header')
+        return self._header
+
+    def __getitem__(self, key):
+        return self.header[key]
+
+    def __iter__(self):
+        return iter(self.header)
+
+    def __len__(self):
+        return len(self.header)
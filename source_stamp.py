@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Empreinte du mapping JSON dont est issu un fichier dérivé (catalogue binaire, base SQLite,
+index de recherche). Chaque fichier dérivé enregistre la taille, le st_mtime_ns et le SHA-256
+du mapping lus à la construction ; il est à jour si le mapping actuel a le même contenu.
+Comparer les dates seules se trompe dans les deux sens : un mapping restauré avec une date
+plus ancienne passe pour inchangé, un simple touch force une reconstruction.
+"""
+
+import hashlib
+from pathlib import Path
+
+def file_sha256(path):
+    """SHA-256 (hex) d'un fichier, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def stamp(mapping_file):
+    """{size, mtime_ns, sha256} du mapping, à enregistrer avec le fichier dérivé ; None s'il manque."""
+    mapping_file = Path(mapping_file)
+    if not mapping_file.exists():
+        return None
+    stat = mapping_file.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_sha256(mapping_file)}
+
+def matches(recorded, mapping_file):
+    """True si le mapping a encore le contenu décrit par recorded.
+
+    Sans mapping (fichier dérivé déployé seul), le fichier dérivé fait foi. Une taille différente
+    suffit à conclure ; taille et st_mtime_ns identiques évitent de relire le mapping ; sinon
+    (touch, checkout, copie) le SHA-256 tranche.
+    """
+    mapping_file = Path(mapping_file)
+    if not mapping_file.exists():
+        return True
+    if not recorded:
+        return False
+    stat = mapping_file.stat()
+    if stat.st_size != recorded.get("size"):
+        return False
+    if stat.st_mtime_ns == recorded.get("mtime_ns"):
+        return True
+    return file_sha256(mapping_file) == recorded.get("sha256")
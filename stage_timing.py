@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Mesure optionnelle du temps passé dans chaque étape des extracteurs KIE API.
+Désactivée par défaut : page() et span() retournent alors un gestionnaire de contexte vide
+partagé, et count() ne fait rien. Activée par enable(), elle enregistre pour chaque page le
+temps de chaque étape et le nombre de correspondances des regex, puis produit un rapport JSON :
+totaux par étape, p50/p95/p99 par fichier et pages les plus lentes avec leur taille.
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+TOP_PAGES = 20
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullSpan()
+
+class PageRecord:
+    """Temps et compteurs d'une page. Les étapes imbriquées sont nommées "parent/enfant"."""
+
+    __slots__ = ('path', 'size', 'seconds', 'stages', 'calls', 'matches', 'stack')
+
+    def __init__(self, path, size):
+        self.path = str(path)
+        self.size = size
+        self.seconds = 0.0
+        self.stages = {}
+        self.calls = {}
+        self.matches = {}
+        self.stack = []
+
+class _Span:
+    __slots__ = ('record', 'name', 'start')
+
+    def __init__(self, record, name):
+        stack = record.stack
+        self.record = record
+        self.name = f'{stack[-1]}/{name}' if stack else name
+
+    def __enter__(self):
+        self.record.stack.append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        record = self.record
+        record.stack.pop()
+        record.stages[self.name] = record.stages.get(self.name, 0.0) + elapsed
+        record.calls[self.name] = record.calls.get(self.name, 0) + 1
+        return False
+
+class _PageSpan:
+    __slots__ = ('recorder', 'record', 'previous', 'start')
+
+    def __init__(self, recorder, path, size):
+        if size is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+        self.recorder = recorder
+        self.record = PageRecord(path, size)
+
+    def __enter__(self):
+        local = self.recorder.local
+        self.previous = getattr(local, 'page', None)
+        local.page = self.record
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        self.record.seconds = time.perf_counter() - self.start
+        self.recorder.local.page = self.previous
+        with self.recorder.lock:
+            self.recorder.pages.append(self.record)
+        return False
+
+class Recorder:
+    """Pages enregistrées ; la page en cours est propre à chaque thread (workers du pipeline)."""
+
+    def __init__(self):
+        self.pages = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def current(self):
+        return getattr(self.local, 'page', None)
+
+_recorder = None
+
+def enable():
+    """Active la mesure et retourne le Recorder (les mesures précédentes sont oubliées)."""
+    global _recorder
+    _recorder = Recorder()
+    return _recorder
+
+def disable():
+    global _recorder
+    _recorder = None
+
+def enabled():
+    return _recorder is not None
+
+def page(path, size=None):
+    """Contexte d'extraction d'une page ; size (octets) est lu sur le disque s'il n'est pas donné."""
+    if _recorder is None:
+        return _NULL
+    return _PageSpan(_recorder, path, size)
+
+def span(name):
+    """Contexte d'une étape de la page en cours (ignoré hors d'une page)."""
+    if _recorder is None:
+        return _NULL
+    record = _recorder.current()
+    if record is None:
+        return _NULL
+    return _Span(record, name)
+
+def count(name, n=1):
+    """Ajoute n correspondances au compteur name de la page en cours."""
+    if _recorder is None:
+        return
+    record = _recorder.current()
+    if record is not None:
+        record.matches[name] = record.matches.get(name, 0) + n
+
+def count_tokens(tokens):
+    """Compte les tokens de chaque kind d'un TokenScanner.collect()."""
+    if _recorder is None:
+        return
+    for kind, kind_tokens in tokens.items():
+        count(kind, len(kind_tokens))
+
+def _percentile(sorted_values, q):
+    """Percentile par rang le plus proche d'une liste triée."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+def _distribution(values):
+    values = sorted(values)
+    return {
+        "p50": round(_percentile(values, 50), 6),
+        "p95": round(_percentile(values, 95), 6),
+        "p99": round(_percentile(values, 99), 6),
+        "max": round(values[-1], 6) if values else 0.0,
+    }
+
+def build_report(top=TOP_PAGES):
+    """Construit le rapport des pages enregistrées depuis enable()."""
+    pages = list(_recorder.pages) if _recorder is not None else []
+    total = sum(p.seconds for p in pages)
+
+    stage_names = sorted({name for p in pages for name in p.stages})
+    stages = {}
+    for name in stage_names:
+        per_file = [p.stages[name] for p in pages if name in p.stages]
+        stage_total = sum(per_file)
+        stages[name] = dict({
+            "total_seconds": round(stage_total, 6),
+            "share": round(stage_total / total, 4) if total else 0.0,
+            "calls": sum(p.calls.get(name, 0) for p in pages),
+            "files": len(per_file),
+        }, **_distribution(per_file))
+
+    matches = {}
+    for p in pages:
+        for name, n in p.matches.items():
+            matches[name] = matches.get(name, 0) + n
+
+    slowest = sorted(pages, key=lambda p: p.seconds, reverse=True)[:top]
+    return {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "files": len(pages),
+        "total_seconds": round(total, 6),
+        "total_bytes": sum(p.size for p in pages),
+        "per_file_seconds": _distribution([p.seconds for p in pages]),
+        "stages": stages,
+        "regex_matches": dict(sorted(matches.items())),
+        "slowest_pages": [
+            {
+                "file": p.path,
+                "size": p.size,
+                "seconds": round(p.seconds, 6),
+                "stages": {name: round(seconds, 6) for name, seconds in p.stages.items()},
+                "matches": p.matches,
+            }
+            for p in slowest
+        ],
+        "notes": "Nested stages are named parent/child; a parent's time includes its children.",
+    }
+
+def write_report(path, top=TOP_PAGES):
+    """Écrit le rapport JSON dans path et le retourne."""
+    report = build_report(top)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+def print_summary(report):
+    """Affiche les étapes du rapport, de la plus coûteuse à la moins coûteuse."""
+    print(f"{'='*70}")
+    print(f"Stage timings ({report['files']} files, {report['total_seconds']:.3f}s, "
+          f"p95 {report['per_file_seconds']['p95'] * 1000:.2f} ms/file)")
+    print(f"{'='*70}")
+    print(f"{'Stage':<34}{'Total (s)':>10}{'Share':>8}{'p50 (ms)':>9}{'p99 (ms)':>9}")
+    for name, stats in sorted(report["stages"].items(), key=lambda x: -x[1]["total_seconds"]):
+        print(f"{name[:33]:<34}{stats['total_seconds']:>10.3f}{stats['share'] * 100:>7.1f}%"
+              f"{stats['p50'] * 1000:>9.3f}{stats['p99'] * 1000:>9.3f}")
+    print(f"{'='*70}")
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Générateur d'un corpus docskie synthétique pour tester et mesurer les extracteurs KIE API.
+Les pages imitent les pages Mintlify de la documentation : titre, article avec tables de
+paramètres, exemples curl et corps de requête ("model": "..."), pricing en crédits, et gros
+bundles JavaScript inline. Le corpus est déterministe pour un seed donné, de 100 à 100k pages.
+"""
+
+import json
+import random
+import argparse
+from pathlib import Path
+
+MANIFEST_FILE = 'corpus-manifest.json'
+
+# (dossier, titre, endpoint, méthode, modèle, unité de pricing) ; {v} est une version tirée au hasard
+FAMILIES = [
+    ('market/video/kling', 'Kling V{v} Image to Video', '/api/v1/jobs/createTask', 'POST', 'kling/v{v}-image-to-video', 'video'),
+    ('market/video/wan', 'Wan {v} - Text to Video', '/api/v1/jobs/createTask', 'POST', 'wan/{v}-text-to-video', 'video'),
+    ('market/video/hailuo', 'Hailuo {v} - Image to Video', '/api/v1/jobs/createTask', 'POST', 'hailuo/{v}-image-to-video-pro', 'video'),
+    ('market/video/bytedance', 'Bytedance - V{v} Pro Image to Video', '/api/v1/jobs/createTask', 'POST', 'bytedance/v{v}-pro-image-to-video', 'video'),
+    ('veo3', 'Veo {v} Generate Video', '/api/v1/veo/generate', 'POST', 'veo{v}', 'video'),
+    ('runway', 'Runway Aleph {v}', '/api/v1/aleph/generate', 'POST', 'runway/aleph-{v}', 'video'),
+    ('market/image/seedream', 'Seedream {v} - Edit', '/api/v1/jobs/createTask', 'POST', 'seedream/{v}-edit', 'image'),
+    ('market/image/qwen', 'Qwen - image-edit {v}', '/api/v1/jobs/createTask', 'POST', 'qwen/image-edit-{v}', 'image'),
+    ('market/image/grok', 'Grok Imagine {v} - Text to Image', '/api/v1/jobs/createTask', 'POST', 'grok-imagine/text-to-image-{v}', 'image'),
+    ('flux', 'Flux Kontext {v} Generate or Edit Image', '/api/v1/flux/kontext/generate', 'POST', 'flux-kontext/pro-{v}', 'image'),
+    ('4o-image', 'Generate 4o Image {v}', '/api/v1/gpt4o-image/generate', 'POST', 'gpt4o/image-{v}', 'image'),
+    ('suno', 'Suno Generate Music V{v}', '/api/v1/generate', 'POST', 'suno/v{v}', 'song'),
+    ('market/audio/elevenlabs', 'ElevenLabs Text to Speech V{v}', '/api/v1/jobs/createTask', 'POST', 'elevenlabs/text-to-speech-v{v}', 'request'),
+    ('market/chat/claude', 'Claude Sonnet {v}', '/api/v1/jobs/createTask', 'POST', 'anthropic/claude-sonnet-{v}', 'request'),
+    ('market/chat/gemini', 'Gemini {v} Flash', '/api/v1/jobs/createTask', 'POST', 'google/gemini-{v}-flash', 'request'),
+    ('common-api', 'Get Task Details {v}', '/api/v1/jobs/recordInfo', 'GET', None, None),
+]
+
+# Pages de guide sans référence à l'API : elles ne doivent produire aucun endpoint
+GUIDE_RATIO = 0.05
+
+# (nom, type, description, exemple) des paramètres d'entrée
+INPUT_PARAMS = [
+    ('prompt', 'string', 'Text description of the content to generate', 'a cat surfing a wave at sunset'),
+    ('image_url', 'string', 'URL of the input image', 'https://example.com/input.png'),
+    ('duration', 'integer', 'Length of the output in seconds', 5),
+    ('aspect_ratio', 'string', 'Output aspect ratio', '16:9'),
+    ('resolution', 'string', 'Output resolution', '1080p'),
+    ('seed', 'integer', 'Random seed for reproducible results', 42),
+    ('negative_prompt', 'string', 'What to avoid in the output', 'blurry, low quality'),
+    ('cfg_scale', 'number', 'Prompt adherence strength', 0.5),
+    ('enable_safety_checker', 'boolean', 'Filter unsafe content', True),
+    ('num_images', 'integer', 'Number of images to generate', 1),
+    ('style', 'string', 'Visual style preset', 'cinematic'),
+    ('callBackUrl', 'string', 'URL notified when the task completes', 'https://example.com/callback'),
+]
+
+NOISE_WORDS = [
+    'className', 'children', 'props', 'useState', 'useEffect', 'jsx', 'div', 'span', 'href', 'navigation',
+    'sidebar', 'anchor', 'tooltip', 'theme', 'dark', 'light', 'render', 'module', 'exports', 'chunk',
+    'webpack', 'hydrate', 'segment', 'payload', 'buildId', 'locale', 'config', 'analytics', 'search',
+    'model', 'credits', 'POST', 'GET', 'api', 'request', 'response', 'token', 'version', 'layout',
+]
+
+# Clés des objets JSON du bruit : sans "model", qui ajouterait de faux modelIds aux résultats
+KEY_WORDS = [word for word in NOISE_WORDS if word != 'model']
+
+def _identifier(rng):
+    return rng.choice(NOISE_WORDS) + rng.choice(['', '_', '$']) + format(rng.getrandbits(20), 'x')
+
+def _noise_fragment(rng):
+    """Un morceau de bundle JavaScript minifié (fonctions, objets JSON, chaînes échappées)."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        args = ','.join(_identifier(rng) for _ in range(rng.randint(1, 4)))
+        body = ';'.join(f'{_identifier(rng)}={_identifier(rng)}.{rng.choice(NOISE_WORDS)}({rng.randint(0, 999)})'
+                        for _ in range(rng.randint(3, 10)))
+        return f'function {_identifier(rng)}({args}){{{body};return {_identifier(rng)}}}'
+    if kind == 1:
+        obj = {rng.choice(KEY_WORDS): rng.choice([rng.randint(0, 9999), _identifier(rng), None, True])
+               for _ in range(rng.randint(2, 8))}
+        obj['children'] = [{'type': rng.choice(NOISE_WORDS), 'key': _identifier(rng)} for _ in range(rng.randint(0, 3))]
+        return f'var {_identifier(rng)}={json.dumps(obj, separators=(",", ":"))};'
+    if kind == 2:
+        # Charge RSC de Next.js : du JSON échappé dans une chaîne
+        inner = json.dumps({'className': ' '.join(rng.choice(NOISE_WORDS) for _ in range(6)),
+                            'href': f'/{rng.choice(NOISE_WORDS)}/{_identifier(rng)}'})
+        return f'self.__next_f.push([1,{json.dumps(inner)}]);'
+    return '!' + ','.join(f'{_identifier(rng)}:"{" ".join(rng.choice(NOISE_WORDS) for _ in range(rng.randint(3, 12)))}"'
+                          for _ in range(rng.randint(2, 6))) + ';'
+
+def noise_pool(seed, size=512):
+    """Morceaux de bruit partagés par toutes les pages (générer le bruit page par page serait lent)."""
+    rng = random.Random(f'{seed}:noise')
+    return [''.join(_noise_fragment(rng) for _ in range(20)) for _ in range(size)]
+
+def _noise(rng, pool, size):
+    """Au moins size caractères de bruit tirés du pool."""
+    parts = []
+    total = 0
+    while total < size:
+        part = rng.choice(pool)
+        parts.append(part)
+        total += len(part)
+    return ''.join(parts)
+
+def page_spec(index, seed):
+    """Décrit la page index : famille, version, paramètres, crédits et taille du bruit."""
+    rng = random.Random(f'{seed}:{index}')
+    family = FAMILIES[rng.randrange(len(FAMILIES))]
+    version = f'{rng.randint(1, 9)}-{rng.randint(0, 9)}'
+    params = rng.sample(INPUT_PARAMS, rng.randint(2, 7))
+    if INPUT_PARAMS[0] not in params and rng.random() < 0.8:
+        params.insert(0, INPUT_PARAMS[0])
+    # Quelques pages très lourdes, comme les pages Mintlify avec de gros bundles
+    heavy = rng.random() < 0.02
+    return {
+        "rng": rng,
+        "family": family,
+        "version": version,
+        "guide": rng.random() < GUIDE_RATIO,
+        "params": params,
+        "required": {name for name, *_ in params if name == 'prompt' or rng.random() < 0.3},
+        "credits": rng.choice([1, 2, 4, 5, 8, 10, 12, 16, 20, 28, 32, 40, 60, 80, 120, 200]),
+        "noise_scale": rng.uniform(5, 10) if heavy else rng.uniform(0.5, 1.5),
+    }
+
+def _table(spec):
+    rows = ''.join(
+        f'<tr><td><code>{name}</code></td><td>{ptype}</td><td>{"yes" if name in spec["required"] else "no"}</td>'
+        f'<td>{description}</td><td>{"-" if name in spec["required"] else json.dumps(example)}</td></tr>\n'
+        for name, ptype, description, example in spec["params"])
+    return ('<table><thead><tr><th>Name</th><th>Type</th><th>Required</th><th>Description</th>'
+            f'<th>Default</th></tr></thead><tbody>\n{rows}</tbody></table>')
+
+def render_page(index, seed, pool, noise_size):
+    """Retourne (chemin relatif, HTML) de la page index."""
+    spec = page_spec(index, seed)
+    rng = spec["rng"]
+    folder, title, endpoint, method, model, unit = spec["family"]
+    title = title.format(v=spec["version"].replace('-', '.'))
+    name = f'{title} {index:06d}'
+    noise = _noise(rng, pool, int(noise_size * spec["noise_scale"]))
+    head_noise, body_noise = noise[:len(noise) // 3], noise[len(noise) // 3:]
+
+    parts = [
+        '<!DOCTYPE html><html lang="en" class="dark"><head><meta charSet="utf-8"/>',
+        '<meta name="viewport" content="width=device-width, initial-scale=1"/>',
+        f'<title>{name} - KIE API</title>',
+        f'<link rel="stylesheet" href="/_next/static/css/{rng.getrandbits(64):016x}.css"/>',
+        f'<script>{head_noise}</script></head><body><div id="__next">',
+        '<nav id="sidebar"><a href="/">Home</a><a href="/market">Market</a><a href="/suno-api">Suno API</a></nav>',
+        '<article id="content-area">',
+        f'<h1 id="page-title">{name}</h1>',
+    ]
+
+    if spec["guide"]:
+        parts.append(f'<p>This guide explains how to get started with {name.lower()} in your application.</p>')
+    else:
+        body = {}
+        if model:
+            body["model"] = model.format(v=spec["version"])
+        body["input"] = {param: example for param, _, _, example in spec["params"]}
+        body_json = json.dumps(body)
+        parts += [
+            f'<p>Use this endpoint to call {name} through the KIE API and retrieve the generated result.</p>',
+            _table(spec),
+            f'<pre><code class="language-bash">curl --request {method} https://api.kie.ai{endpoint} '
+            f"--header 'Authorization: Bearer &lt;token&gt;' --header 'Content-Type: application/json' "
+            f"--data '{body_json}'</code></pre>",
+            f'<h2>Request Body</h2><pre><code class="language-json">{json.dumps(body, indent=2)}</code></pre>',
+            '<h2>Response</h2><pre><code class="language-json">'
+            f'{{"code": 200, "msg": "success", "data": {{"taskId": "task_{rng.getrandbits(48):012x}"}}}}</code></pre>',
+        ]
+        if unit:
+            parts.append(f'<h2>Pricing</h2><p>Costs {spec["credits"]} credits per {unit}.</p>')
+
+    parts += [
+        '</article></div>',
+        f'<script>{body_noise}</script>',
+        '</body></html>\n',
+    ]
+    return f'{folder}/{name} - KIE API.html', ''.join(parts)
+
+def generate_corpus(output_dir, count, seed=0, noise_kb=64):
+    """Écrit count pages dans output_dir et retourne le manifeste (aussi écrit dans le dossier)."""
+    output_dir = Path(output_dir)
+    pool = noise_pool(seed)
+    noise_size = noise_kb * 1024
+    total_bytes = 0
+    guides = 0
+
+    for index in range(count):
+        relative_path, html = render_page(index, seed, pool, noise_size)
+        path = output_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = html.encode('utf-8')
+        path.write_bytes(data)
+        total_bytes += len(data)
+        guides += 'api.kie.ai' not in html
+
+    manifest = {
+        "generator": "synthetic_corpus",
+        "seed": seed,
+        "files": count,
+        "noise_kb": noise_kb,
+        "total_bytes": total_bytes,
+        "guide_pages": guides,
+    }
+    (output_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+    return manifest
+
+def parse_args(argv=None):
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Synthetic KIE API docskie corpus generator")
+    parser.add_argument('output_dir', type=Path, help="dossier du corpus généré")
+    parser.add_argument('--count', type=int, default=1000, help="nombre de pages (100 à 100000)")
+    parser.add_argument('--seed', type=int, default=0, help="seed du générateur (même seed = même corpus)")
+    parser.add_argument('--noise-kb', type=int, default=64,
+                        help="taille moyenne du JavaScript inline par page, en Ko")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fonction principale."""
+    args = parse_args(argv)
+    print(f"Generating {args.count} pages in {args.output_dir} (seed {args.seed}, ~{args.noise_kb} KB of JS per page)")
+    manifest = generate_corpus(args.output_dir, args.count, args.seed, args.noise_kb)
+    print(f"✓ {manifest['files']} pages, {manifest['total_bytes'] / 1e6:.1f} MB, "
+          f"{manifest['guide_pages']} without API reference")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Extracteur de tables HTML événementiel pour les extracteurs KIE API.
+Chaque table est parcourue une seule fois par un HTMLParser : les lignes sont émises au fil
+de l'eau avec les en-têtes de leur table, les tables imbriquées sont gérées par une pile.
+"""
+
+import re
+from collections import namedtuple
+from html.parser import HTMLParser
+
+FEED_CHUNK = 1 << 16
+
+# index : rang de la ligne dans sa table (0 = ligne d'en-têtes)
+TableRow = namedtuple('TableRow', ['index', 'headers', 'cells'])
+
+_TABLE_TAG = re.compile(r'<(/?)table[^>]*>', re.IGNORECASE)
+
+class _Table:
+    def __init__(self):
+        self.headers = None
+        self.row_index = 0
+        self.row = None
+        self.cell = None
+        self.cell_tag = None
+
+class TableParser(HTMLParser):
+    def __init__(self, on_row):
+        self.on_row = on_row
+        super().__init__(convert_charrefs=True)
+
+    def reset(self):
+        super().reset()
+        self.tables = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self.tables.append(_Table())
+        elif tag in ('script', 'style'):
+            self.skip_depth += 1
+        elif not self.tables:
+            return
+        elif tag == 'tr':
+            self._close_row(self.tables[-1])
+            self.tables[-1].row = []
+        elif tag in ('td', 'th'):
+            table = self.tables[-1]
+            self._close_cell(table)
+            if table.row is None:
+                table.row = []
+            table.cell = []
+            table.cell_tag = tag
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif not self.tables:
+            return
+        elif tag == 'table':
+            self._close_row(self.tables.pop())
+        elif tag == 'tr':
+            self._close_row(self.tables[-1])
+        elif tag in ('td', 'th'):
+            self._close_cell(self.tables[-1])
+
+    def handle_data(self, data):
+        if self.skip_depth or not self.tables:
+            return
+        cell = self.tables[-1].cell
+        if cell is not None:
+            cell.append(data)
+
+    def _close_cell(self, table):
+        if table.cell is None:
+            return
+        # Même normalisation que clean_html : espaces fusionnés, texte rogné
+        table.row.append((table.cell_tag, ' '.join(''.join(table.cell).split())))
+        table.cell = None
+
+    def _close_row(self, table):
+        self._close_cell(table)
+        if table.row is None:
+            return
+        if table.row_index == 0:
+            # En-têtes : les <th> de la première ligne, sinon ses <td>
+            headers = [text for tag, text in table.row if tag == 'th']
+            table.headers = headers or [text for _, text in table.row]
+        self.on_row(TableRow(table.row_index, table.headers, [text for _, text in table.row]))
+        table.row_index += 1
+        table.row = None
+
+def _table_spans(content):
+    """Génère les (début, fin) des tables de premier niveau de content."""
+    depth = 0
+    start = last_close = -1
+    for m in _TABLE_TAG.finditer(content):
+        if not m.group(1):
+            if depth == 0:
+                start = m.start()
+            depth += 1
+        elif depth:
+            depth -= 1
+            last_close = m.end()
+            if depth == 0:
+                yield start, last_close
+    # Table mal imbriquée : on s'arrête à son dernier </table>
+    if depth and last_close > start:
+        yield start, last_close
+
+def iter_table_rows(content):
+    """Génère les lignes (TableRow) de toutes les tables de content, dans l'ordre du document.
+
+    Seules les tables sont passées au parser, par morceaux de FEED_CHUNK caractères ;
+    la mémoire reste bornée à la table et à la ligne en cours.
+    """
+    rows = []
+    parser = TableParser(rows.append)
+    for start, end in _table_spans(content):
+        for pos in range(start, end, FEED_CHUNK):
+            parser.feed(content[pos:min(pos + FEED_CHUNK, end)])
+            yield from rows
+            rows.clear()
+        parser.close()
+        yield from rows
+        rows.clear()
+        parser.reset()
@@ -0,0 +1,54 @@
+"""Categorisation table (categorization-rules.json) pinned against recorded expected results.
+
+tests/data/categorization-expected.json was recorded from the if/elif chains the table replaced
+(enhance_api_mapping_v2.categorize_endpoint and get_capability, extract_real_params.categorize_file,
+the path rules of parse_html_docs_v2), on the repository mapping plus synthetic endpoints.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import endpoint_categories
+from endpoint_categories import RULES, endpoint_fields
+
+EXPECTED = json.loads((Path(__file__).parent / 'data' / 'categorization-expected.json').read_text(encoding='utf-8'))
+
+def mismatches(items, actual, key):
+    return [(item, item[key], value) for item, value in zip(items, actual) if item[key] != value][:5]
+
+@pytest.mark.parametrize('automaton', [False, True])
+def test_endpoint_category_and_capability(automaton):
+    endpoints = EXPECTED['endpoints']
+    categories = RULES['endpoint_category'].with_automaton() if automaton else RULES['endpoint_category']
+    capabilities = RULES['capability'].with_automaton() if automaton else RULES['capability']
+    fields = [endpoint_fields(ep) for ep in endpoints]
+    assert mismatches(endpoints, [categories.classify(*f) for f in fields], 'category') == []
+    assert mismatches(endpoints, [capabilities.classify(*f) for f in fields], 'capability') == []
+
+@pytest.mark.parametrize('use_index', [False, True])
+def test_categorize_many(use_index):
+    endpoints = EXPECTED['endpoints']
+    results = endpoint_categories.categorize_many(endpoints, use_index)
+    assert mismatches(endpoints, [category for category, _ in results], 'category') == []
+    assert mismatches(endpoints, [capability for _, capability in results], 'capability') == []
+
+def test_categorize_file():
+    files = EXPECTED['files']
+    assert mismatches(files, [endpoint_categories.categorize_file(f['path']) for f in files], 'category') == []
+
+def test_categorize_path():
+    paths = EXPECTED['paths']
+    actual = [endpoint_categories.categorize_path(p['endpoint'], p['name']) for p in paths]
+    assert mismatches(paths, actual, 'category') == []
+
+def test_index_ignored_when_rules_change(capsys):
+    assert not RULES.index_stale and RULES.model_index
+    data = json.loads(json.dumps(RULES.data))
+    rules = data['rule_sets']['endpoint_category']['rules']
+    rules[0], rules[1] = rules[1], rules[0]
+    table = endpoint_categories.RuleTable(data)
+    assert table.index_stale
+    assert table.model_index == {} and table.endpoint_index == {}
+    assert 'build-index' in capsys.readouterr().err
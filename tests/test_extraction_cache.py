@@ -0,0 +1,36 @@
+"""Extraction cache: pages skipped by the prefilter are cached, read errors are not."""
+
+import pytest
+
+import parse_api_docs_final
+import synthetic_corpus
+from extraction_cache import ExtractionCache
+
+@pytest.fixture
+def pages(tmp_path):
+    manifest = synthetic_corpus.generate_corpus(tmp_path / 'docs', 40, noise_kb=4)
+    assert manifest['guide_pages'] > 0
+    return sorted((tmp_path / 'docs').rglob('*.html'))
+
+def collect(pages, cache_file):
+    cache = ExtractionCache(cache_file, 'test')
+    result = parse_api_docs_final.collect_endpoints(pages, verbose=False, cache=cache)
+    cache.save()
+    return result, cache
+
+def test_second_run_reads_everything_from_cache(pages, tmp_path):
+    first, _ = collect(pages, tmp_path / 'cache.json')
+    second, cache = collect(pages, tmp_path / 'cache.json')
+    assert second == first
+    assert (cache.hits, cache.misses) == (len(pages), 0)
+
+def test_read_errors_are_not_cached(pages, tmp_path, monkeypatch):
+    read_page_content = parse_api_docs_final.read_page_content
+    def failing_read(html_file, *args):
+        if html_file == pages[0]:
+            raise OSError("unreadable")
+        return read_page_content(html_file, *args)
+    monkeypatch.setattr(parse_api_docs_final, 'read_page_content', failing_read)
+    _, cache = collect(pages, tmp_path / 'cache.json')
+    assert str(pages[0]) not in cache.entries
+    assert len(cache.entries) == len(pages) - 1
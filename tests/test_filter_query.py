@@ -0,0 +1,21 @@
+"""Filter expressions: invalid input raises FilterError with the position of the problem."""
+
+import pytest
+
+import filter_query
+
+@pytest.mark.parametrize('text, message', [
+    ('category = = video', 'expected a value at 11'),
+    ('colour = red', "unknown field 'colour' at 0"),
+    ('category video', "expected an operator after 'category' at 9"),
+    ('credits > cheap', 'credits must be compared to a number at 10'),
+    ('category = video sort by colour', "cannot sort by 'colour'"),
+    ('category = video limit 2.5', 'limit must be a positive integer'),
+    ('param. = 1', "missing parameter name after 'param.' at 0"),
+])
+def test_invalid_expression_raises(text, message):
+    with pytest.raises(filter_query.FilterError, match=message):
+        filter_query.parse(text)
+
+def test_parameter_predicate_parses():
+    assert filter_query.parse('param.aspect_ratio = "16:9"')
@@ -0,0 +1,82 @@
+"""Freshness of the files derived from the mapping (binary catalog, SQLite store, search index)."""
+
+import os
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+import binary_catalog
+import catalog_store
+import search_index
+import source_stamp
+
+MAPPING = Path(__file__).resolve().parent.parent / 'api-endpoints-mapping.json'
+
+ARTIFACTS = {
+    'catalog': (binary_catalog.catalog_path, binary_catalog.load_mapping, binary_catalog.is_fresh),
+    'store': (catalog_store.store_path, catalog_store.open_store, catalog_store.is_fresh),
+    'index': (search_index.index_path, search_index.open_index, search_index.is_fresh),
+}
+
+@pytest.fixture
+def mapping(tmp_path):
+    path = tmp_path / 'api-endpoints-mapping.json'
+    shutil.copy(MAPPING, path)
+    return path
+
+def build(kind, mapping):
+    path_of, load, is_fresh = ARTIFACTS[kind]
+    # binary_catalog.load_mapping returns the JSON data when it rebuilds the catalog
+    loaded = load(mapping)
+    if hasattr(loaded, 'close'):
+        loaded.close()
+    return path_of(mapping), is_fresh
+
+@pytest.mark.parametrize('kind', ARTIFACTS)
+def test_touch_keeps_artifact_fresh(kind, mapping):
+    path, is_fresh = build(kind, mapping)
+    assert is_fresh(path, mapping)
+    os.utime(mapping, ns=(0, os.stat(mapping).st_mtime_ns + 10**9))
+    assert is_fresh(path, mapping)
+
+@pytest.mark.parametrize('kind', ARTIFACTS)
+def test_edit_with_older_mtime_is_stale(kind, mapping):
+    path, is_fresh = build(kind, mapping)
+    mtime_ns = os.stat(path).st_mtime_ns
+    data = json.loads(mapping.read_text(encoding='utf-8'))
+    data['endpoints'][0]['name'] += ' (edited)'
+    mapping.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.utime(mapping, ns=(0, mtime_ns - 10**12))
+    assert not is_fresh(path, mapping)
+
+@pytest.mark.parametrize('size', [0, 16, 4096])
+@pytest.mark.parametrize('kind', ARTIFACTS)
+def test_truncated_artifact_is_rebuilt(kind, size, mapping):
+    path, is_fresh = build(kind, mapping)
+    path.write_bytes(path.read_bytes()[:size])
+    assert not is_fresh(path, mapping)
+    build(kind, mapping)
+    assert is_fresh(path, mapping)
+
+def test_index_of_endpoints_read_before_a_rewrite_stays_stale(mapping):
+    source = source_stamp.stamp(mapping)
+    endpoints = json.loads(mapping.read_text(encoding='utf-8'))['endpoints']
+    # The mapping is rewritten after the caller read it but before the index is built
+    data = json.loads(mapping.read_text(encoding='utf-8'))
+    data['endpoints'][0]['name'] += ' (edited)'
+    mapping.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+    search_index.open_index(mapping, endpoints, source).close()
+    assert not search_index.is_fresh(search_index.index_path(mapping), mapping)
+
+def test_index_of_newer_content_is_not_paired_with_old_endpoints(mapping):
+    source = source_stamp.stamp(mapping)
+    endpoints = json.loads(mapping.read_text(encoding='utf-8'))['endpoints']
+    data = json.loads(mapping.read_text(encoding='utf-8'))
+    data['endpoints'][0]['name'] = 'zzzq unique name'
+    mapping.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+    search_index.open_index(mapping).close()
+    with search_index.open_index(mapping, endpoints, source) as index:
+        assert index.source == source
+        assert not index.search('zzzq')
@@ -0,0 +1,33 @@
+"""The router (api/_router.js) and lookup_index compute the same endpoints digest."""
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import lookup_index
+
+ROUTER = Path(__file__).resolve().parent.parent / 'api' / '_router.js'
+
+SCRIPT = """
+const { endpointsDigest } = require(process.argv[1]);
+let input = '';
+process.stdin.on('data', chunk => { input += chunk; });
+process.stdin.on('end', () => { process.stdout.write(endpointsDigest(JSON.parse(input))); });
+"""
+
+ENDPOINTS = {
+    'ascii': [{'endpoint': '/api/v1/jobs/createTask', 'modelIds': ['kling/v2-1-pro']}, {'modelIds': []}],
+    'non-ascii': [{'endpoint': '/api/v1/générer', 'modelIds': ['modèle-✓', 'emoji-\U0001f600']}],
+    'delete': [{'endpoint': '/api/v1/del\x7f', 'modelIds': ['model\x7f\x80', 'tab\tcontrol\x1f']}],
+}
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="node is not installed")
+@pytest.mark.parametrize('name', ENDPOINTS)
+def test_router_digest_matches_python(name):
+    endpoints = ENDPOINTS[name]
+    result = subprocess.run(['node', '-e', SCRIPT, str(ROUTER)], input=json.dumps(endpoints),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout == lookup_index.endpoints_digest(endpoints)
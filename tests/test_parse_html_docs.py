@@ -0,0 +1,39 @@
+"""Peak memory of the streaming parser in parse_html_docs, measured with tracemalloc."""
+
+import parse_html_docs
+
+# Upper bound on the streaming parser's traced peak, whatever the page size
+STREAMING_PEAK_LIMIT = 1 << 20
+
+PARAGRAPH = '<p>Generate videos from text. This model costs 20 credits per run and supports optional fields.</p>\n'
+CODE_BLOCK = ('<pre><code>curl --request POST https://api.kie.ai/api/v1/jobs/createTask '
+              '{"model": "kling/v2-1-pro", "prompt": "a cat", "duration": 5}</code></pre>')
+
+def write_page(tmp_path, kilobytes):
+    """Page of about 2 * kilobytes of text around a single code block."""
+    body = PARAGRAPH * (kilobytes * 1024 // len(PARAGRAPH))
+    html_file = tmp_path / f'Kling {kilobytes} - KIE API.html'
+    html_file.write_text(f'<html><head><title>Kling - KIE API</title></head><body><h1>Kling</h1>'
+                         f'{body}{CODE_BLOCK}{body}</body></html>', encoding='utf-8')
+    return str(html_file)
+
+def test_streaming_matches_full_parser(tmp_path):
+    html_file = write_page(tmp_path, 16)
+    info = parse_html_docs.extract_endpoint_info_streaming(html_file)
+    assert info == parse_html_docs.extract_endpoint_info(html_file)
+    assert info['modelIds'] == ['kling/v2-1-pro']
+    assert info['pricing']['credits'] == 20
+
+def test_streaming_peak_memory_is_bounded(tmp_path):
+    small = write_page(tmp_path, 64)
+    large = write_page(tmp_path, 1024)
+
+    _, small_peak = parse_html_docs.peak_memory(parse_html_docs.extract_endpoint_info_streaming, small)
+    _, large_peak = parse_html_docs.peak_memory(parse_html_docs.extract_endpoint_info_streaming, large)
+    _, full_peak = parse_html_docs.peak_memory(parse_html_docs.extract_endpoint_info, large)
+
+    # Flat: 16 times more text, (almost) the same peak
+    assert large_peak < STREAMING_PEAK_LIMIT
+    assert large_peak < small_peak * 1.5
+    # The full parser keeps several copies of the page text
+    assert full_peak > 10 * large_peak
@@ -0,0 +1,40 @@
+"""Ranked search: the threshold walk returns the same top-k as scoring every endpoint."""
+
+import json
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import catalog_store
+import search_index
+
+MAPPING = Path(__file__).resolve().parent.parent / 'api-endpoints-mapping.json'
+
+QUERIES = search_index.BENCHMARK_QUERIES + ['kling2.1 pro', 'image image to', 'text to speech', 'zzz', '']
+
+@pytest.fixture(scope='module')
+def index(tmp_path_factory):
+    data = json.loads(MAPPING.read_text(encoding='utf-8'))
+    # Near-identical copies tie everywhere, the hardest case for the threshold walk
+    endpoints = catalog_store.scale_mapping(data, 8)['endpoints']
+    path = tmp_path_factory.mktemp('index') / 'scaled-search.idx'
+    search_index.write_index(endpoints, path)
+    with search_index.SearchIndex(path) as index:
+        yield index
+
+def exhaustive(index, query, top):
+    weights = {gram: weight for gram, weight in Counter(search_index.trigrams(query)).items() if gram in index.terms}
+    totals = {}
+    for gram, weight in weights.items():
+        for doc, score in zip(*index.postings(gram)):
+            totals[doc] = totals.get(doc, 0.0) + weight * score
+    return sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+@pytest.mark.parametrize('top', [1, 10, 50])
+@pytest.mark.parametrize('query', QUERIES)
+def test_search_matches_exhaustive_scoring(index, query, top):
+    hits = index.search(query, top)
+    expected = exhaustive(index, query, top)
+    assert [doc for doc, _ in hits] == [doc for doc, _ in expected]
+    assert [score for _, score in hits] == pytest.approx([score for _, score in expected])
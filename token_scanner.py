@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Scanner multi-motifs des extracteurs KIE API : url, méthode, modèle, crédits, curl...
+Produit des tokens typés avec leurs positions, dans l'ordre du contenu ; pour chaque kind,
+les mêmes correspondances que re.findall. Par défaut, un finditer par kind : le moteur re de
+CPython cherche les préfixes littéraux bien plus vite qu'une alternance. single_pass=True
+compile tous les motifs en une seule regex et ne parcourt le contenu qu'une fois, mais il est
+plus lent sur les pages docskie (voir benchmark).
+"""
+
+import re
+import sys
+import heapq
+import time
+from collections import namedtuple
+from pathlib import Path
+
+Token = namedtuple('Token', ['kind', 'start', 'end', 'groups'])
+
+class TokenScanner:
+    """Reconnaît une liste de specs (kind, pattern, flags, first_chars) et produit des tokens typés.
+
+    Pour chaque kind, les tokens retournés sont exactement ceux de re.findall(pattern).
+    Les kinds listés dans overlapping gardent aussi les tokens qui chevauchent le précédent :
+    ils remplacent un re.search dont seule l'existence d'une correspondance compte.
+
+    Deux modes, mêmes tokens :
+    - par défaut, un finditer par kind : le moteur re de CPython cherche les préfixes
+      littéraux (https://api..., "model"...) bien plus vite qu'une alternance, ce mode est
+      le plus rapide sur les pages docskie (voir benchmark).
+    - single_pass : une seule regex de lookaheads parcourt le contenu une fois.
+      first_chars (contenu d'une classe de caractères, '-' échappé) couvre les premiers
+      caractères possibles du motif et permet au moteur de sauter aux candidats. Quand un
+      kind correspond à une position, les kinds déclarés après lui y sont testés aussi.
+    """
+
+    def __init__(self, specs, overlapping=(), single_pass=False):
+        self.specs = list(specs)
+        self.kinds = [kind for kind, _, _, _ in self.specs]
+        self.overlapping = set(overlapping)
+        self.single_pass = single_pass
+
+        # Mode par kind : les kinds chevauchants sont enveloppés dans un lookahead
+        self._kind_regexes = []
+        for kind, pattern, flags, _ in self.specs:
+            if kind in self.overlapping:
+                self._kind_regexes.append((kind, 1, re.compile(f'(?=({pattern}))', flags)))
+            else:
+                self._kind_regexes.append((kind, 0, re.compile(pattern, flags)))
+
+        # Mode une passe : une alternance de lookaheads, un groupe englobant par kind,
+        # plus chaque motif seul pour tester les kinds suivants à une position trouvée
+        self._slots = []
+        self._slot_of_group = {}
+        self._anchored = []
+        alternatives = []
+        first_chars = []
+        group = 1
+        for kind, pattern, flags, first in self.specs:
+            regex = re.compile(pattern, flags)
+            wrapped = f'(?i:{pattern})' if flags & re.IGNORECASE else f'(?:{pattern})'
+            alternatives.append(f'(?=({wrapped}))')
+            self._slot_of_group[group] = len(self._slots)
+            self._slots.append((kind, group, regex.groups))
+            self._anchored.append((kind, regex))
+            first_chars.append(first)
+            group += 1 + regex.groups
+
+        self.regex = re.compile(f'(?=[{"".join(first_chars)}])(?:' + '|'.join(alternatives) + ')')
+
+    def _scan_single_pass(self, content):
+        last_end = {kind: 0 for kind in self.kinds if kind not in self.overlapping}
+        slots = self._slots
+        anchored = self._anchored
+
+        for m in self.regex.finditer(content):
+            # L'alternance donne le premier kind qui correspond ici ; les suivants sont testés
+            # à la même position, pour ne perdre aucun token d'un kind moins prioritaire
+            index = self._slot_of_group[m.lastindex]
+            kind, group, inner_groups = slots[index]
+            tokens = [Token(kind, m.start(group), m.end(group), m.groups()[group:group + inner_groups])]
+            position = m.start()
+            for kind, regex in anchored[index + 1:]:
+                match = regex.match(content, position)
+                if match:
+                    tokens.append(Token(kind, position, match.end(), match.groups()))
+
+            for token in tokens:
+                # Comme re.findall : pas de chevauchement entre deux tokens du même kind
+                if token.kind in last_end:
+                    if token.start < last_end[token.kind]:
+                        continue
+                    last_end[token.kind] = token.end
+                yield token
+
+    def _scan_kind(self, content, kind, group, regex):
+        for m in regex.finditer(content):
+            yield Token(kind, m.start(group), m.end(group), m.groups()[group:])
+
+    def scan(self, content):
+        """Génère les tokens de content dans l'ordre des positions."""
+        if self.single_pass:
+            return self._scan_single_pass(content)
+        return heapq.merge(*(self._scan_kind(content, kind, group, regex)
+                             for kind, group, regex in self._kind_regexes),
+                           key=lambda token: token.start)
+
+    def collect(self, content):
+        """Retourne {kind: [tokens]} pour tous les kinds déclarés."""
+        if not self.single_pass:
+            return {kind: list(self._scan_kind(content, kind, group, regex))
+                    for kind, group, regex in self._kind_regexes}
+
+        tokens = {kind: [] for kind in self.kinds}
+        for token in self._scan_single_pass(content):
+            tokens[token.kind].append(token)
+        return tokens
+
+def token_value(content, token):
+    """Valeur du token au format de re.findall (groupe unique, tuple de groupes ou texte entier)."""
+    if not token.groups:
+        return content[token.start:token.end]
+    if len(token.groups) == 1:
+        return token.groups[0]
+    return token.groups
+
+def values(content, tokens):
+    """Applique token_value à une liste de tokens."""
+    return [token_value(content, token) for token in tokens]
+
+def _time_per_page(func, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+def benchmark(html_files, scanners, repeat=5):
+    """Compare, par page, les re.findall séparés de chaque extracteur aux deux modes du scanner."""
+    pages = [Path(f).read_text(encoding='utf-8', errors='ignore') for f in html_files]
+    total_bytes = sum(len(page) for page in pages)
+
+    print(f"{'='*70}")
+    print(f"Token scanner benchmark ({len(pages)} pages, {total_bytes:,} chars)")
+    print(f"{'='*70}")
+
+    for name, scanner in scanners:
+        compiled = [re.compile(pattern, flags) for _, pattern, flags, _ in scanner.specs]
+        single_pass = TokenScanner(scanner.specs, scanner.overlapping, single_pass=True)
+        per_kind = TokenScanner(scanner.specs, scanner.overlapping)
+
+        before = _time_per_page(lambda page: [regex.findall(page) for regex in compiled], pages, repeat)
+        combined = _time_per_page(single_pass.collect, pages, repeat)
+        split = _time_per_page(per_kind.collect, pages, repeat)
+
+        print(f"{name}")
+        print(f"  Separate findall:  {len(compiled):>2} passes  {before * 1e3:8.3f} ms/page")
+        print(f"  Single pass:        1 pass    {combined * 1e3:8.3f} ms/page ({before / combined:.2f}x)")
+        print(f"  Tokens per kind:   {len(compiled):>2} passes  {split * 1e3:8.3f} ms/page ({before / split:.2f}x)")
+    print(f"{'='*70}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python token_scanner.py <docskie_dir | file.html ...>")
+        exit(1)
+
+    import extract_real_params
+    import parse_api_docs_final
+    import parse_html_docs_v2
+
+    paths = [Path(arg) for arg in sys.argv[1:]]
+    files = [f for p in paths for f in (sorted(p.rglob('*.html')) if p.is_dir() else [p])]
+    benchmark(files, [
+        ("parse_api_docs_final", parse_api_docs_final.ENDPOINT_TOKENS),
+        ("extract_real_params", extract_real_params.ENDPOINT_TOKENS),
+        ("parse_html_docs_v2", parse_html_docs_v2.ENDPOINT_TOKENS),
+    ])